@@ -1,88 +1,330 @@
 import os
-import importlib.util
+import sys
 import mimetypes
 import uuid
 import json
 import time
 import logging
-import queue
 import shutil
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from flask import Flask, Response, jsonify, render_template, request
 
+import numpy as np
+
+# The execution engine lives in the Flask-free "measnode" package; BaseNode and
+# load_node_modules are re-exported here for node modules that import from app.
+from measnode.nodes import BaseNode, load_node_modules, node_registry  # noqa: F401
+from measnode.payloads import encode_results, payload_store
+from measnode.cache import project_cache_dir, result_cache
+from measnode.metrics import encode_profiles, node_metrics
+from measnode.scheduler import current_node_id, get_workflow_plan, isolated_pool, run_plan
+from measnode.sessions import WorkflowSession, add_session, get_session, remove_session
+from measnode.sweeps import SWEEP_CHUNK_SIZE, run_sweep
+from measnode.streaming import run_stream
+from measnode.catalog import project_catalog
+from measnode.cluster import CLUSTER_ADDRESS, coordinator
+from measnode.history import run_history
+from measnode.resources import check_priority, resource_scheduler
+from measnode.storage import (
+    WorkflowConflict,
+    WorkflowPatchError,
+    check_project,
+    copy_workflow,
+    delete_workflow,
+    patch_workflow,
+    read_workflow,
+    rename_workflow,
+    valid_project_name,
+    workflow_head,
+    write_workflow,
+)
+
 app = Flask(__name__)
 
-# Global dictionary to store workflow processing generators keyed by token.
-pending_workflows = {}
+# Older node modules do "from app import BaseNode". When this file runs as a script it
+# is "__main__", so register it as "app" too instead of importing it a second time.
+if __name__ == "__main__":
+    sys.modules.setdefault("app", sys.modules[__name__])
+
+# --- Set up a global log bus and custom logging handler ---
+# Number of log records kept for subscribers of /api/logs.
+LOG_BUFFER_SIZE = int(os.environ.get("MEASNODE_LOG_BUFFER", "2000"))
 
-# --- Set up a global log queue and custom logging handler ---
-log_queue = queue.Queue()
 
+class LogBus:
+    """
+    Publish/subscribe bus for log records backed by a fixed-size ring buffer.
+    Each record is formatted and stored once; every subscriber keeps its own cursor
+    (a sequence number) into the ring, so a record reaches all open log windows.
+    Subscribers that fall more than the buffer size behind skip ahead and the
+    skipped records are counted as dropped.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._next_seq = 0  # Sequence number of the next published record.
+        self._cond = threading.Condition()
+        self._listeners = set()  # Callables invoked after each publish (used by the async server).
+        self.dropped = 0
+        self.subscribers = 0
+
+    def publish(self, entry):
+        with self._cond:
+            entry["seq"] = self._next_seq
+            self._ring[self._next_seq % self.capacity] = entry
+            self._next_seq += 1
+            self._cond.notify_all()
+            for listener in self._listeners:
+                listener()
+
+    def add_listener(self, listener):
+        with self._cond:
+            self._listeners.add(listener)
+
+    def remove_listener(self, listener):
+        with self._cond:
+            self._listeners.discard(listener)
+
+    def subscribe(self):
+        with self._cond:
+            self.subscribers += 1
+
+    def unsubscribe(self):
+        with self._cond:
+            self.subscribers -= 1
+
+    @property
+    def next_seq(self):
+        return self._next_seq
+
+    def read(self, cursor, timeout):
+        """
+        Returns (entries, new cursor, dropped count) for records published at or after
+        cursor, blocking for up to timeout seconds while there are none.
+        """
+        with self._cond:
+            if cursor >= self._next_seq:
+                self._cond.wait(timeout)
+            oldest = max(0, self._next_seq - self.capacity)
+            dropped = 0
+            if cursor < oldest:
+                dropped = oldest - cursor
+                self.dropped += dropped
+                cursor = oldest
+            entries = [self._ring[seq % self.capacity] for seq in range(cursor, self._next_seq)]
+            return entries, self._next_seq, dropped
+
+    def stats(self):
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "published": self._next_seq,
+                "buffered": min(self._next_seq, self.capacity),
+                "dropped": self.dropped,
+                "subscribers": self.subscribers,
+            }
 
-class QueueHandler(logging.Handler):
+
+log_bus = LogBus(LOG_BUFFER_SIZE)
+
+
+class LogBusHandler(logging.Handler):
     def emit(self, record):
         try:
             msg = self.format(record)
-            log_queue.put(msg)
+            if not msg.strip():
+                return
+            node_id = getattr(record, "node_id", None) or current_node_id.get()
+            log_bus.publish({"levelno": record.levelno, "node_id": node_id, "message": msg})
         except Exception:
             self.handleError(record)
 
 
 # Set up the logging system
-queue_handler = QueueHandler()
+log_bus_handler = LogBusHandler()
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-queue_handler.setFormatter(formatter)
-logging.getLogger().addHandler(queue_handler)
+log_bus_handler.setFormatter(formatter)
+logging.getLogger().addHandler(log_bus_handler)
 logging.getLogger().setLevel(logging.INFO)
 
 
-# ---------------- Base Node Class ------------------
-class BaseNode:
+# ---------------- Background Jobs ------------------
+# Number of executions that run at the same time.
+JOB_WORKERS = int(os.environ.get("MEASNODE_JOB_WORKERS", "4"))
+# Executions allowed to wait for a free worker before new ones are rejected.
+JOB_QUEUE_SIZE = int(os.environ.get("MEASNODE_JOB_QUEUE", "64"))
+# Seconds a finished job (and its event buffer) is kept for late subscribers.
+JOB_TTL = float(os.environ.get("MEASNODE_JOB_TTL", "300"))
+# Seconds between keepalive comments on idle Server-Sent Event streams.
+SSE_HEARTBEAT = float(os.environ.get("MEASNODE_SSE_HEARTBEAT", "15"))
+# Default seconds between the coalesced frames of /api/execute_progress.
+PROGRESS_INTERVAL = float(os.environ.get("MEASNODE_PROGRESS_INTERVAL", "0.1"))
+
+
+class Job:
     """
-    Base class for all nodes.
-    Each node module should subclass this.
+    A single workflow execution. The events produced by its generator are appended
+    to a buffer that any number of subscribers can read from an offset.
+    The payload of the END event is also kept on its own for /api/jobs/<token>/results.
     """
 
-    title = "Base Node"
-    category = "Uncategorized"  # New attribute for categorization.
-    inputs = []  # Example: [{"name": "input1", "type": "int"}]
-    outputs = []  # Example: [{"name": "output", "type": "int"}]
-    parameters_def = []  # Example: [{"name": "value", "type": "int", "default": 42}]
+    def __init__(self, token, generator):
+        self.token = token
+        self.generator = generator
+        self.status = "queued"  # queued -> running -> finished
+        self.events = []
+        self.end_payload = None  # JSON text of the END event
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cond = threading.Condition()
+        self._listeners = set()  # Callables invoked on new events and on finish (used by the async server).
+
+    def append(self, event):
+        with self._cond:
+            self.events.append(event)
+            if event.startswith("data: END "):
+                self.end_payload = event[len("data: END "):].strip()
+            self._cond.notify_all()
+            for listener in self._listeners:
+                listener()
+
+    def finish(self):
+        with self._cond:
+            self.status = "finished"
+            self.finished_at = time.time()
+            self._cond.notify_all()
+            for listener in self._listeners:
+                listener()
+
+    def add_listener(self, listener):
+        with self._cond:
+            self._listeners.add(listener)
+
+    def remove_listener(self, listener):
+        with self._cond:
+            self._listeners.discard(listener)
+
+    def wait_finished(self, timeout):
+        with self._cond:
+            return self._cond.wait_for(lambda: self.status == "finished", timeout)
+
+    def wait_events(self, offset, timeout):
+        """
+        Returns (events from offset on, finished) and blocks for up to timeout seconds
+        while no new events are available and the job is still running.
+        """
+        with self._cond:
+            if offset >= len(self.events) and self.status != "finished":
+                self._cond.wait(timeout)
+            return self.events[offset:], self.status == "finished"
+
+    def run(self):
+        self.status = "running"
+        try:
+            for event in self.generator:
+                self.append(event)
+        except Exception as e:
+            # Log the exception and record an END event with an error message.
+            logging.error(f"Error in execution {self.token}: {e}")
+            self.error = str(e)
+            self.append(f"data: END {json.dumps({'order': [], 'results': {}, 'error': str(e)})}\n\n")
+        finally:
+            self.generator = None
+            self.finish()
 
-    def __init__(self, node_id):
-        self.node_id = node_id
-        self.parameters = {}
-        self.input_connections = {}  # To be filled as { input_name: (source_node, "output") }
 
+class JobManager:
+    """
+    Runs executions on a bounded worker pool, independent of any SSE connection.
+    Submissions beyond the worker count plus queue size are rejected, and finished
+    jobs are evicted once their TTL has expired. Once draining (server shutdown),
+    no new jobs are accepted.
+    """
 
-# ---------------- Node Modules Loader ------------------
-def load_node_modules():
+    def __init__(self, workers, queue_size, ttl):
+        self.capacity = workers + queue_size
+        self.ttl = ttl
+        self.jobs = {}
+        self.draining = False
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="measnode-job")
+
+    def submit(self, token, generator):
+        """
+        Queues a generator of SSE events for execution. Returns the Job, or None if
+        the queue is full.
+        """
+        with self._lock:
+            self._evict_expired()
+            active = sum(1 for job in self.jobs.values() if job.status != "finished")
+            if active >= self.capacity:
+                return None
+            job = Job(token, generator)
+            self.jobs[token] = job
+        self._pool.submit(job.run)
+        return job
+
+    def get(self, token):
+        with self._lock:
+            self._evict_expired()
+            return self.jobs.get(token)
+
+    def active_jobs(self):
+        with self._lock:
+            return [job for job in self.jobs.values() if job.status != "finished"]
+
+    def drain(self, timeout):
+        """
+        Stops accepting executions and waits up to timeout seconds for the running
+        and queued ones to finish. Returns the number of jobs still unfinished.
+        """
+        self.draining = True
+        deadline = time.monotonic() + timeout
+        active = self.active_jobs()
+        while active and time.monotonic() < deadline:
+            active[0].wait_finished(deadline - time.monotonic())
+            active = self.active_jobs()
+        return len(active)
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [
+            token
+            for token, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl
+        ]
+        for token in expired:
+            del self.jobs[token]
+
+
+job_manager = JobManager(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_TTL)
+
+
+def submit_job(generator, **extra):
     """
-    Scans the 'modules' folder for Python files (ignoring __init__.py) and imports them.
-    Each module should define a class named "Node" that is a subclass of BaseNode.
-    Returns a dictionary mapping each node's title to its class.
+    Submits an execution generator and returns the JSON response for the client:
+    the stream token plus any extra fields, or 429 if the job queue is full.
     """
-    node_classes = {}
-    modules_dir = os.path.join(os.path.dirname(__file__), "modules")
-    if not os.path.exists(modules_dir):
-        print("Modules directory not found:", modules_dir)
-        return node_classes
+    if job_manager.draining:
+        generator.close()
+        return jsonify({"error": "Server is shutting down"}), 503
+    token = str(uuid.uuid4())
+    if job_manager.submit(token, generator) is None:
+        generator.close()
+        return jsonify({"error": "Too many executions queued, try again later"}), 429
+    return jsonify({"token": token, **extra})
+
 
-    for fname in os.listdir(modules_dir):
-        if fname.endswith(".py") and fname != "__init__.py":
-            mod_name = fname[:-3]
-            path = os.path.join(modules_dir, fname)
-            spec = importlib.util.spec_from_file_location(mod_name, path)
-            mod = importlib.util.module_from_spec(spec)
-            try:
-                spec.loader.exec_module(mod)
-            except Exception as e:
-                print(f"Error loading module {fname}: {e}")
-                continue
-            if hasattr(mod, "Node"):
-                cls = mod.Node
-                node_classes[cls.title] = cls
-    return node_classes
+# ---------------- Cluster Coordinator ------------------
+# With MEASNODE_CLUSTER set, nodes are dispatched to "measnode worker" processes.
+# The debug reloader runs this file in a watcher process and a serving child; only the child listens.
+if CLUSTER_ADDRESS and (__name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN")):
+    coordinator.start()
 
 
 # ---------------- API Endpoint: /api/nodes ------------------
@@ -96,20 +338,13 @@ def api_nodes():
       - parameters: the parameter definitions (from parameters_def)
       - inputs: the input definitions
       - outputs: the output definitions
+    The payload is precomputed by the node registry and tagged with an ETag,
+    so clients sending If-None-Match get a 304 when nothing changed.
     """
-    node_classes = load_node_modules()
-    definitions = []
-    for title, cls in node_classes.items():
-        definitions.append(
-            {
-                "title": title,
-                "category": getattr(cls, "category", "Uncategorized"),
-                "parameters": getattr(cls, "parameters_def", []),
-                "inputs": getattr(cls, "inputs", []),
-                "outputs": getattr(cls, "outputs", []),
-            }
-        )
-    return jsonify(definitions)
+    node_registry.refresh()
+    response = Response(node_registry.definitions_json, mimetype="application/json")
+    response.set_etag(node_registry.etag)
+    return response.make_conditional(request)
 
 
 # ---------------- API Endpoint: /api/projects (GET) ------------------
@@ -120,36 +355,49 @@ def api_get_projects():
     Each project includes:
       - name: project name (folder name)
       - workflows: array of workflow filenames
+    Served from the project catalog; supports conditional requests via ETag.
     """
-    projects = []
-    projects_dir = Path("projects")
-
-    # Create projects directory if it doesn't exist
-    projects_dir.mkdir(exist_ok=True)
-
     try:
-        # Scan each subdirectory in projects folder
-        for project_folder in projects_dir.iterdir():
-            if project_folder.is_dir():
-                workflows = []
-                # Find all .json files in the project folder
-                for workflow_file in project_folder.glob("*.json"):
-                    workflows.append(workflow_file.name)
-
-                projects.append({
-                    "name": project_folder.name,
-                    "workflows": sorted(workflows)
-                })
-
-        # Sort projects by name
-        projects.sort(key=lambda x: x["name"])
-        return jsonify(projects)
+        response = jsonify(project_catalog.projects())
+        response.set_etag(project_catalog.etag)
+        return response.make_conditional(request)
 
     except Exception as e:
         logging.error(f"Error loading projects: {e}")
         return jsonify({"error": "Failed to load projects"}), 500
 
 
+# ---------------- API Endpoint: /api/catalog (GET) ------------------
+@app.route("/api/catalog", methods=["GET"])
+def api_catalog():
+    """
+    Searches the workflows of all projects, one page at a time.
+    Query parameters:
+      - q: words that must all appear in the project name, workflow name or node types
+      - type: only workflows using this node type
+      - page: page number starting at 1 (default 1)
+      - per_page: workflows per page (default 50, at most 500)
+    Returns { total, page, per_page, workflows: [{ project, workflow, revision,
+    node_count, wire_count, node_types, mtime, size }] }.
+    """
+    try:
+        page = max(1, request.args.get("page", 1, type=int))
+        per_page = min(500, max(1, request.args.get("per_page", 50, type=int)))
+        total, workflows = project_catalog.search(
+            request.args.get("q", ""),
+            node_type=request.args.get("type") or None,
+            offset=(page - 1) * per_page,
+            limit=per_page,
+        )
+        response = jsonify({"total": total, "page": page, "per_page": per_page, "workflows": workflows})
+        response.set_etag(project_catalog.etag)
+        return response.make_conditional(request)
+
+    except Exception as e:
+        logging.error(f"Error searching catalog: {e}")
+        return jsonify({"error": "Failed to search workflows"}), 500
+
+
 # ---------------- API Endpoint: /api/projects (POST) ------------------
 @app.route("/api/projects", methods=["POST"])
 def api_create_project():
@@ -166,7 +414,7 @@ def api_create_project():
             return jsonify({"error": "Project name is required"}), 400
 
         # Validate project name (basic validation)
-        if not project_name.replace("_", "").replace("-", "").replace(" ", "").isalnum():
+        if not valid_project_name(project_name):
             return jsonify({"error": "Invalid project name"}), 400
 
         projects_dir = Path("projects")
@@ -181,6 +429,7 @@ def api_create_project():
         # Create project directory
         project_path.mkdir()
 
+        project_catalog.touch(project_name)
         logging.info(f"Created project: {project_name}")
         return jsonify({"message": "Project created successfully", "name": project_name})
 
@@ -219,8 +468,9 @@ def api_duplicate_project():
             return jsonify({"error": "Target project already exists"}), 409
 
         # Copy the entire project directory
-        shutil.copytree(source_path, target_path)
+        shutil.copytree(source_path, target_path, ignore=shutil.ignore_patterns(".history"))
 
+        project_catalog.touch(target_project)
         logging.info(f"Duplicated project: {source_project} to {target_project}")
         return jsonify({"message": "Project duplicated successfully"})
 
@@ -252,8 +502,10 @@ def api_delete_project():
             return jsonify({"error": "Project does not exist"}), 404
 
         # Delete the entire project directory
+        run_history.close(project_name)
         shutil.rmtree(project_path)
 
+        project_catalog.discard(project_name)
         logging.info(f"Deleted project: {project_name}")
         return jsonify({"message": "Project deleted successfully"})
 
@@ -280,7 +532,7 @@ def api_rename_project():
             return jsonify({"error": "Old and new project names are required"}), 400
 
         # Validate new project name
-        if not new_name.replace("_", "").replace("-", "").replace(" ", "").isalnum():
+        if not valid_project_name(new_name):
             return jsonify({"error": "Invalid project name"}), 400
 
         projects_dir = Path("projects")
@@ -296,8 +548,11 @@ def api_rename_project():
             return jsonify({"error": "A project with the new name already exists"}), 409
 
         # Rename the project directory
+        run_history.close(old_name)
         old_path.rename(new_path)
 
+        project_catalog.discard(old_name)
+        project_catalog.touch(new_name)
         logging.info(f"Renamed project: {old_name} to {new_name}")
         return jsonify({"message": "Project renamed successfully"})
 
@@ -346,11 +601,11 @@ def api_create_workflow():
             "wires": []
         }
 
-        with open(workflow_path, "w") as f:
-            json.dump(empty_workflow, f, indent=2)
+        revision, digest = write_workflow(workflow_path, empty_workflow)
 
+        project_catalog.touch(project_name, workflow_name)
         logging.info(f"Created workflow: {workflow_name} in project: {project_name}")
-        return jsonify({"message": "Workflow created successfully", "name": workflow_name})
+        return jsonify({"message": "Workflow created successfully", "name": workflow_name, "revision": revision, "hash": digest})
 
     except Exception as e:
         logging.error(f"Error creating workflow: {e}")
@@ -400,9 +655,10 @@ def api_duplicate_workflow():
         if target_path.exists():
             return jsonify({"error": "Target workflow already exists"}), 409
 
-        # Copy the workflow file
-        shutil.copy2(source_path, target_path)
+        # Copy the workflow file (with any pending journal folded in)
+        copy_workflow(source_path, target_path)
 
+        project_catalog.touch(project_name, target_workflow)
         logging.info(f"Duplicated workflow: {source_workflow} to {target_workflow}")
         return jsonify({"message": "Workflow duplicated successfully"})
 
@@ -445,9 +701,10 @@ def api_delete_workflow():
         if not workflow_path.exists():
             return jsonify({"error": "Workflow does not exist"}), 404
 
-        # Delete the workflow file
-        workflow_path.unlink()
+        # Delete the workflow file and its journal
+        delete_workflow(workflow_path)
 
+        project_catalog.discard(project_name, workflow_name)
         logging.info(f"Deleted workflow: {workflow_name} from project: {project_name}")
         return jsonify({"message": "Workflow deleted successfully"})
 
@@ -499,9 +756,11 @@ def api_rename_workflow():
         if new_path.exists():
             return jsonify({"error": "A workflow with the new name already exists"}), 409
 
-        # Rename the workflow file
-        old_path.rename(new_path)
+        # Rename the workflow file and its journal
+        rename_workflow(old_path, new_path)
 
+        project_catalog.discard(project_name, old_name)
+        project_catalog.touch(project_name, new_name)
         logging.info(f"Renamed workflow: {old_name} to {new_name}")
         return jsonify({"message": "Workflow renamed successfully"})
 
@@ -519,12 +778,16 @@ def api_save_workflow():
       - project: project name
       - workflow: workflow filename
       - data: workflow data (nodes, wires, etc.)
+      - baseRevision: optional revision the data was edited from; the save is rejected
+        with 409 if the stored workflow has been saved since
+    Returns the new revision and content hash of the workflow.
     """
     try:
         data = request.json
         project_name = data.get("project", "").strip()
         workflow_name = data.get("workflow", "").strip()
         workflow_data = data.get("data", {})
+        base_revision = data.get("baseRevision")
 
         if not project_name or not workflow_name:
             return jsonify({"error": "Project and workflow name are required"}), 400
@@ -542,24 +805,78 @@ def api_save_workflow():
 
         workflow_path = project_path / workflow_name
 
-        # Save workflow data
-        with open(workflow_path, "w") as f:
-            json.dump(workflow_data, f, indent=2)
+        # Save workflow data (atomically replaces the file)
+        revision, digest = write_workflow(workflow_path, workflow_data, base_revision=base_revision)
 
+        project_catalog.touch(project_name, workflow_name)
         logging.info(f"Saved workflow: {workflow_name} in project: {project_name}")
-        return jsonify({"message": "Workflow saved successfully"})
+        return jsonify({"message": "Workflow saved successfully", "revision": revision, "hash": digest})
 
+    except WorkflowConflict as e:
+        return jsonify({"error": str(e), "revision": e.revision, "hash": e.hash}), 409
     except Exception as e:
         logging.error(f"Error saving workflow: {e}")
         return jsonify({"error": "Failed to save workflow"}), 500
 
 
+# ---------------- API Endpoint: /api/workflows/<project>/<workflow> (PATCH) ------------------
+@app.route("/api/workflows/<project>/<workflow>", methods=["PATCH"])
+def api_patch_workflow(project, workflow):
+    """
+    Saves an incremental edit of a workflow by appending it to the workflow's journal.
+    Expects JSON payload with:
+      - ops: list of edit operations, e.g.
+          {"op": "upsert_node", "node": {...}}
+          {"op": "update_node", "id": "...", "fields": {"position": {...}}}
+          {"op": "remove_node", "id": "..."}
+          {"op": "add_wire", "wire": {...}} / {"op": "remove_wire", "wire": {...}}
+          {"op": "set", "key": "...", "value": ...}
+      - baseRevision: optional revision the edits apply to (409 if the workflow has
+        been saved since)
+    Returns the new revision and hash of the workflow.
+    """
+    try:
+        data = request.json or {}
+        ops = data.get("ops")
+
+        projects_dir = Path("projects")
+        project_path = projects_dir / project
+
+        # Check if project exists
+        if not project_path.exists():
+            return jsonify({"error": "Project does not exist"}), 404
+
+        # Add .json extension if not present
+        if not workflow.endswith(".json"):
+            workflow += ".json"
+
+        workflow_path = project_path / workflow
+
+        # Check if workflow exists
+        if not workflow_path.exists():
+            return jsonify({"error": "Workflow does not exist"}), 404
+
+        status = patch_workflow(workflow_path, ops, base_revision=data.get("baseRevision"))
+
+        project_catalog.touch(project, workflow)
+        logging.info(f"Patched workflow: {workflow} in project: {project} ({len(ops)} ops)")
+        return jsonify({"message": "Workflow saved successfully", **status})
+
+    except WorkflowConflict as e:
+        return jsonify({"error": str(e), "revision": e.revision, "hash": e.hash}), 409
+    except WorkflowPatchError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error patching workflow: {e}")
+        return jsonify({"error": "Failed to save workflow"}), 500
+
+
 # ---------------- API Endpoint: /api/workflows/<project>/<workflow> (GET) ------------------
 @app.route("/api/workflows/<project>/<workflow>", methods=["GET"])
 def api_load_workflow(project, workflow):
     """
     Loads workflow data from a file.
-    Returns the workflow JSON data.
+    Returns the workflow JSON data, including its revision and hash (also sent as ETag).
     """
     try:
         projects_dir = Path("projects")
@@ -579,12 +896,20 @@ def api_load_workflow(project, workflow):
         if not workflow_path.exists():
             return jsonify({"error": "Workflow does not exist"}), 404
 
-        # Load workflow data
-        with open(workflow_path, "r") as f:
-            workflow_data = json.load(f)
+        # Revalidation of an unchanged workflow is answered without reading it
+        _, digest = workflow_head(workflow_path)
+        if request.if_none_match.contains(digest):
+            response = Response(status=304)
+            response.set_etag(digest)
+            return response
+
+        # Load workflow data (with its journal applied)
+        workflow_data = read_workflow(workflow_path)
 
         logging.info(f"Loaded workflow: {workflow} from project: {project}")
-        return jsonify(workflow_data)
+        response = jsonify(workflow_data)
+        response.set_etag(workflow_data["hash"])
+        return response.make_conditional(request)
 
     except Exception as e:
         logging.error(f"Error loading workflow: {e}")
@@ -600,164 +925,668 @@ def api_execute():
       - id: unique node identifier
       - type: the node title (to look up the corresponding Python class)
       - parameters: parameter values (as entered by the user)
-      - connections: a mapping of input names to the source node IDs.
-
-    This endpoint instantiates the nodes, sets up connections, recursively evaluates the nodes,
-    and returns a unique token.
-    The processing will be streamed via SSE at the /api/execute_stream endpoint.
+      - connections: a mapping of input names to the source node IDs, or to
+        { "node": source node ID, "output": output name } for a specific output.
+    An optional top-level "project" name enables the project's on-disk result cache and
+    records the run in the project's history (with the optional "workflow" file name, see
+    /api/history/<project>), and "mode": "stream" runs the workflow in the streaming
+    dataflow mode (see run_stream). An optional "priority" ("high", "normal" or "low")
+    sets the priority class of the run's nodes when they wait for resources shared with
+    other runs (see /api/resources).
+
+    DONE events carry the node's profile (wall/CPU/queue time in ms, output size and
+    cache hit/miss) as JSON after the node id; END carries all profiles under "profile".
+
+    This endpoint queues a background job that runs the workflow's compiled execution plan
+    (cached by workflow hash, see get_workflow_plan) as a DAG so that independent branches
+    run concurrently, and returns
+    a unique token. The job runs whether or not a client is attached; its events can be
+    streamed via SSE at the /api/execute_stream endpoint.
     """
     workflow = request.json
-    token = str(uuid.uuid4())
+    try:
+        priority = check_priority(workflow.get("priority"))
+        check_project(workflow.get("project"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if workflow.get("mode") == "stream":
+        return submit_job(run_stream(workflow))
 
     def generate_progress():
-        nodes = {}
-        node_classes = load_node_modules()
-
-        # Instantiate nodes.
-        for node_data in workflow.get("nodes", []):
-            node_type = node_data.get("type")
-            NodeClass = node_classes.get(node_type)
-            if NodeClass:
-                node_instance = NodeClass(node_id=node_data["id"])
-                node_instance.parameters.update(node_data.get("parameters", {}))
-                nodes[node_instance.node_id] = node_instance
-
-        # Set up connections.
-        for node_data in workflow.get("nodes", []):
-            node_id = node_data.get("id")
-            node_instance = nodes.get(node_id)
-            for input_name, source_node_id in node_data.get("connections", {}).items():
-                if source_node_id in nodes:
-                    source_node = nodes[source_node_id]
-                    node_instance.input_connections[input_name] = (
-                        source_node,
-                        "output",
-                    )
-
         processing_order = []
         results = {}
-        evaluated_nodes = {}  # Cache for memoization
-
-        def evaluate_node(node, evaluated=None):
-            """
-            Recursively evaluates a node and its inputs using memoization to avoid redundant calculations.
-
-            Args:
-                node: The node to evaluate
-                evaluated: Dictionary of already evaluated nodes {node_id: result}
-
-            Returns:
-                The result of the node's execution
-            """
-            # Initialize memoization dictionary if not provided
-            if evaluated is None:
-                evaluated = {}
-
-            # If this node has already been evaluated, return the cached result
-            if node.node_id in evaluated:
-                return evaluated[node.node_id]
-
-            # Prepare inputs by evaluating input connections
-            inputs = {}
-            for inp in node.inputs:
-                name = inp["name"]
-                if name in node.input_connections:
-                    source_node, _ = node.input_connections[name]
-                    # Recursively evaluate the source node, passing the evaluation cache
-                    value = yield from evaluate_node(source_node, evaluated)
-                    inputs[name] = value
-                else:
-                    # Default value if no connection
-                    inputs[name] = 0
-
-            # Signal that we're processing this node
-            yield f"data: PROCESSING {node.node_id}\n\n"
-
-            # Execute the node's logic
-            result = node.execute(**inputs)
-
-            # Cache the result
-            evaluated[node.node_id] = result
-
-            # Add node to processing order
-            processing_order.append(node.node_id)
-
-            # Signal that node processing is complete
-            yield f"data: DONE {node.node_id}\n\n"
-
-            return result
-
-        # Find all result nodes
-        result_nodes = [node for node in nodes.values() if node.title == "Result Node"]
-
-        # Process each result node
-        for node in result_nodes:
-            gen = evaluate_node(node, evaluated_nodes)
-            try:
-                for event in gen:
-                    yield event
-            except StopIteration as e:
-                results[node.node_id] = e.value
+        evaluated_nodes = {}
+        profiles = {}
+
+        with run_history.recording(workflow, evaluated_nodes, profiles):
+            # Evaluate every Result Node together with its upstream subgraph.
+            plan = get_workflow_plan(workflow)
+            cache_dir = project_cache_dir(workflow.get("project"))
+            yield from run_plan(
+                plan, evaluated_nodes, processing_order, result_cache, cache_dir, profiles, priority, workflow.get("project")
+            )
 
         # Include results for all evaluated nodes
         for node_id, result in evaluated_nodes.items():
             results[node_id] = result
 
-        yield f"data: END {json.dumps({'order': processing_order, 'results': results})}\n\n"
+        end = {"order": processing_order, "results": encode_results(results), "profile": encode_profiles(profiles)}
+        yield f"data: END {json.dumps(end)}\n\n"
 
-    pending_workflows[token] = generate_progress()
-    return jsonify({"token": token})
+    return submit_job(generate_progress())
+
+
+# ---------------- API Endpoint: /api/sweep (POST) ------------------
+@app.route("/api/sweep", methods=["POST"])
+def api_sweep():
+    """
+    Runs a workflow over a parameter sweep as a single background job.
+    Expects JSON payload with:
+      - workflow: workflow payload (same format as /api/execute)
+      - sweeps: list of { node, parameter, values | start/stop/step | start/stop/num }
+      - mode: "grid" (default, cartesian product) or "zip"
+      - chunk: optional number of points per CHUNK event
+    Returns a token; CHUNK events with columnar results are streamed via /api/execute_stream.
+    """
+    data = request.json or {}
+    sweeps = data.get("sweeps", [])
+    mode = data.get("mode", "grid")
+    if mode not in ("grid", "zip"):
+        return jsonify({"error": "Invalid sweep mode"}), 400
+    if not sweeps or any("node" not in sweep or "parameter" not in sweep for sweep in sweeps):
+        return jsonify({"error": "Sweeps need a node and a parameter"}), 400
+    try:
+        chunk_size = max(1, int(data.get("chunk", SWEEP_CHUNK_SIZE)))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid chunk size"}), 400
+    try:
+        check_priority(data.get("workflow", {}).get("priority"))
+        check_project(data.get("workflow", {}).get("project"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return submit_job(run_sweep(data.get("workflow", {}), sweeps, mode, chunk_size))
+
+
+# ---------------- API Endpoint: /api/sessions (POST) ------------------
+@app.route("/api/sessions", methods=["POST"])
+def api_create_session():
+    """
+    Creates a stateful execution session from a full workflow payload
+    (same format as /api/execute) and schedules its first run.
+    Returns the session id and a token for /api/execute_stream.
+    """
+    try:
+        check_priority(request.json.get("priority"))
+        check_project(request.json.get("project"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        session = WorkflowSession(request.json)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error creating session: {e}")
+        return jsonify({"error": "Failed to create session"}), 500
+
+    add_session(session)
+    return submit_job(session.run(), session=session.session_id)
+
+
+# ---------------- API Endpoint: /api/sessions/<session_id>/diff (POST) ------------------
+@app.route("/api/sessions/<session_id>/diff", methods=["POST"])
+def api_session_diff(session_id):
+    """
+    Applies a graph diff to a session and schedules a run of only the invalidated nodes.
+    See WorkflowSession.apply_diff for the diff format.
+    Returns a token for /api/execute_stream and the invalidated node ids.
+    """
+    session = get_session(session_id)
+    if session is None:
+        return jsonify({"error": "Session does not exist"}), 404
+
+    diff = request.json or {}
+    try:
+        check_priority(diff.get("priority"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not session.lock.acquire(blocking=False):
+        return jsonify({"error": "Session is still executing"}), 409
+    try:
+        invalidated = session.apply_diff(diff)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error applying diff to session {session_id}: {e}")
+        return jsonify({"error": "Failed to apply diff"}), 400
+    finally:
+        session.lock.release()
+
+    return submit_job(session.run(), invalidated=invalidated)
+
+
+# ---------------- API Endpoint: /api/sessions/<session_id> (DELETE) ------------------
+@app.route("/api/sessions/<session_id>", methods=["DELETE"])
+def api_delete_session(session_id):
+    """
+    Drops a session and its cached node results.
+    """
+    session = remove_session(session_id)
+    if session is None:
+        return jsonify({"error": "Session does not exist"}), 404
+    return jsonify({"message": "Session deleted successfully"})
+
+
+# ---------------- API Endpoint: /api/cache (GET, DELETE) ------------------
+@app.route("/api/cache", methods=["GET", "DELETE"])
+def api_result_cache():
+    """
+    Returns the result cache hit/miss counters (GET) or clears the in-memory cache (DELETE).
+    """
+    if request.method == "DELETE":
+        result_cache.clear()
+        logging.info("Cleared result cache")
+    return jsonify(result_cache.stats())
 
 
 # ---------------- API Endpoint: /api/execute_stream (GET) ------------------
 @app.route("/api/execute_stream", methods=["GET"])
 def api_execute_stream():
-    token = request.args.get("token")
-    if not token or token not in pending_workflows:
-        return "Invalid token", 400
+    """
+    Streams the events of an execution job via Server-Sent Events.
+    Events are replayed from the "offset" query parameter (or the Last-Event-ID header
+    sent by a reconnecting EventSource), so any number of clients can subscribe and
+    resume. Disconnecting does not stop the job.
+    """
+    try:
+        job, offset = parse_job_stream_args(request.args, request.headers)
+    except ValueError as e:
+        return str(e), 400
 
     def stream():
-        gen = pending_workflows[token]
-        try:
-            for event in gen:
-                yield event
-        except Exception as e:
-            # Log the exception and yield an END event with an error message.
-            logging.error(f"Error in execution stream: {e}")
-            yield f"data: END {json.dumps({'order': [], 'results': {}, 'error': str(e)})}\n\n"
-        finally:
-            del pending_workflows[token]
+        position = offset
+        while True:
+            events, finished = job.wait_events(position, timeout=SSE_HEARTBEAT)
+            if events:
+                yield format_job_events(events, position)
+                position += len(events)
+            elif finished:
+                return
+            else:
+                yield ": keepalive\n\n"
 
     return Response(stream(), mimetype="text/event-stream")
 
 
+def parse_job_stream_args(args, headers):
+    """
+    Returns (job, offset) for an /api/execute_stream request; raises ValueError.
+    """
+    token = args.get("token")
+    job = job_manager.get(token) if token else None
+    if job is None:
+        raise ValueError("Invalid token")
+    last_event_id = headers.get("Last-Event-ID")
+    try:
+        offset = int(last_event_id) + 1 if last_event_id else int(args.get("offset", 0))
+    except ValueError:
+        raise ValueError("Invalid offset") from None
+    return job, offset
+
+
+def format_job_events(events, position):
+    return "".join(f"id: {position + i}\n{event}" for i, event in enumerate(events))
+
+
+# ---------------- API Endpoint: /api/execute_progress (GET) ------------------
+@app.route("/api/execute_progress", methods=["GET"])
+def api_execute_progress():
+    """
+    Streams the progress of an execution job as coalesced Server-Sent Events, for
+    graphs too large for one event per node state change.
+    Query parameters: "token", "offset" (or the Last-Event-ID header, as for
+    /api/execute_stream), "interval" (seconds between frames, default
+    MEASNODE_PROGRESS_INTERVAL) and "compress=1" to gzip the stream.
+
+    At most one frame is sent per interval. It carries everything that happened since
+    the previous one as "PROGRESS {"p": [node ids started and still running],
+    "d": [node ids done]}". Other events (CHUNK, THROUGHPUT, ...) are passed through.
+    The final frame is "END {"results": url, "error": message or null}"; the END
+    payload itself (results and profiles) is fetched from that url.
+    """
+    try:
+        job, offset, interval, compress = parse_progress_args(request.args, request.headers)
+    except ValueError as e:
+        return str(e), 400
+
+    def stream():
+        encoder = ProgressEncoder(compress)
+        position = offset
+        while True:
+            events, finished = job.wait_events(position, timeout=SSE_HEARTBEAT)
+            if events:
+                yield encoder.encode(format_progress_frame(job, events, position))
+                position += len(events)
+                if not finished:
+                    # Let the next frame's events accumulate.
+                    time.sleep(interval)
+            elif finished:
+                yield encoder.finish()
+                return
+            else:
+                yield encoder.encode(": keepalive\n\n")
+
+    response = Response(stream(), mimetype="text/event-stream")
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def parse_progress_args(args, headers):
+    """
+    Returns (job, offset, interval, compress) for an /api/execute_progress request; raises ValueError.
+    """
+    job, offset = parse_job_stream_args(args, headers)
+    try:
+        interval = min(max(float(args.get("interval", PROGRESS_INTERVAL)), 0.01), 10.0)
+    except ValueError:
+        raise ValueError("Invalid interval") from None
+    compress = args.get("compress") == "1" and "gzip" in headers.get("Accept-Encoding", "")
+    return job, offset, interval, compress
+
+
+def format_progress_frame(job, events, position):
+    """
+    Coalesces the job events from position on into SSE text: one PROGRESS message
+    with the node state changes, other events as they are and a short END message.
+    """
+    started, done, passed = {}, [], []
+    for event in events:
+        kind, _, rest = event[len("data: "):].rstrip("\n").partition(" ")
+        if kind == "PROCESSING":
+            started[rest] = True
+        elif kind == "DONE":
+            node_id = rest.partition(" ")[0]
+            started.pop(node_id, None)
+            done.append(node_id)
+        elif kind == "END":
+            end = {"results": f"/api/jobs/{job.token}/results", "error": job.error}
+            passed.append(f"data: END {json.dumps(end)}\n\n")
+        else:
+            passed.append(event)
+    messages = passed
+    if started or done:
+        messages = [f"data: PROGRESS {json.dumps({'p': list(started), 'd': done})}\n\n", *passed]
+    messages[-1] = f"id: {position + len(events) - 1}\n{messages[-1]}"
+    return "".join(messages)
+
+
+class ProgressEncoder:
+    """
+    Converts the SSE text of a progress stream to response bytes. With compress the
+    bytes form one gzip stream, flushed after every frame so that the browser can
+    decode each frame as it arrives.
+    """
+
+    def __init__(self, compress):
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(self, text):
+        if self.compressor is None:
+            return text.encode()
+        return self.compressor.compress(text.encode()) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        """
+        Returns the bytes ending the stream (the gzip trailer).
+        """
+        return b"" if self.compressor is None else self.compressor.flush()
+
+
+# ---------------- API Endpoint: /api/jobs/<token>/results (GET) ------------------
+@app.route("/api/jobs/<token>/results", methods=["GET"])
+def api_job_results(token):
+    """
+    Returns the END payload of a finished execution job (for /api/execute: order,
+    results and profile), gzipped when the client accepts it. 409 while the job runs.
+    """
+    job = job_manager.get(token)
+    if job is None:
+        return jsonify({"error": "Job does not exist"}), 404
+    if job.status != "finished" or job.end_payload is None:
+        return jsonify({"error": "Job has not finished"}), 409
+    body = job.end_payload.encode()
+    response = Response(body, mimetype="application/json")
+    if len(body) > 1024 and "gzip" in request.headers.get("Accept-Encoding", ""):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        response.set_data(compressor.compress(body) + compressor.flush())
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+# ---------------- API Endpoint: /api/jobs/<token> (GET) ------------------
+@app.route("/api/jobs/<token>", methods=["GET"])
+def api_job_status(token):
+    """
+    Returns the status of an execution job and the number of buffered events.
+    """
+    job = job_manager.get(token)
+    if job is None:
+        return jsonify({"error": "Job does not exist"}), 404
+    return jsonify({"token": job.token, "status": job.status, "events": len(job.events)})
+
+
+# ---------------- API Endpoint: /api/payloads/<payload_id> (GET) ------------------
+@app.route("/api/payloads/<payload_id>", methods=["GET"])
+def api_payload(payload_id):
+    """
+    Returns the raw bytes of a stored payload in C order; dtype and shape are sent
+    in the X-Payload-Dtype / X-Payload-Shape headers.
+    Optional query parameters "start" and "stop" select a range along the first axis.
+    """
+    try:
+        array = payload_store.load(payload_id)
+    except KeyError:
+        return jsonify({"error": "Payload does not exist"}), 404
+    if array.ndim == 0:
+        selection = array
+    else:
+        try:
+            start = int(request.args.get("start", 0))
+            stop = int(request.args.get("stop", len(array)))
+        except ValueError:
+            return jsonify({"error": "Invalid range"}), 400
+        selection = array[start:stop]
+
+    response = Response(np.ascontiguousarray(selection).tobytes(), mimetype="application/octet-stream")
+    response.headers["X-Payload-Dtype"] = array.dtype.str
+    response.headers["X-Payload-Shape"] = ",".join(str(dim) for dim in selection.shape)
+    return response
+
+
+# ---------------- API Endpoint: /api/payloads/<payload_id>/preview (GET) ------------------
+@app.route("/api/payloads/<payload_id>/preview", methods=["GET"])
+def api_payload_preview(payload_id):
+    """
+    Returns a downsampled min/max envelope of a numeric 1-D payload for plotting.
+    Query parameters: "points" (number of buckets, default 1000), "start", "stop".
+    """
+    try:
+        array = payload_store.load(payload_id)
+    except KeyError:
+        return jsonify({"error": "Payload does not exist"}), 404
+    if array.ndim != 1:
+        return jsonify({"error": "Previews are only available for 1-D payloads"}), 400
+    try:
+        points = max(1, int(request.args.get("points", 1000)))
+        start = int(request.args.get("start", 0))
+        stop = int(request.args.get("stop", len(array)))
+    except ValueError:
+        return jsonify({"error": "Invalid preview parameters"}), 400
+
+    selection = array[start:stop]
+    if len(selection) == 0:
+        return jsonify({"start": start, "step": 1, "min": [], "max": []})
+    step = -(-len(selection) // points)
+    edges = np.arange(0, len(selection), step)
+    return jsonify(
+        {
+            "start": start,
+            "step": step,
+            "min": np.minimum.reduceat(selection, edges).tolist(),
+            "max": np.maximum.reduceat(selection, edges).tolist(),
+        }
+    )
+
+
+# ---------------- API Endpoint: /api/history/<project> (GET) ------------------
+def parse_history_filters(args):
+    """
+    Returns (workflow, [(node_id, name, value)]) from the workflow and param query
+    arguments; each param is "node_id.name=value". Raises ValueError.
+    """
+    parameters = []
+    for item in args.getlist("param"):
+        key, separator, value = item.partition("=")
+        node_id, dot, name = key.rpartition(".")
+        if not separator or not dot or not node_id or not name:
+            raise ValueError(f"Invalid parameter filter {item!r} (use node_id.name=value)")
+        parameters.append((node_id, name, value))
+    return args.get("workflow") or None, parameters
+
+
+@app.route("/api/history/<project>", methods=["GET"])
+def api_history_series(project):
+    """
+    Returns recorded node results of a project as downsampled time series.
+    Query arguments:
+      - node: node id (repeatable); multi-output nodes give one series per output
+      - field: value (default), wall_ms, cpu_ms, queue_ms or output_bytes
+      - start, end: time range as Unix timestamps (default: first and last run)
+      - points: maximum number of buckets per series (default 500, max 10000)
+      - workflow: only runs of this workflow file
+      - param: node_id.name=value (repeatable), only runs with these parameter values
+    Response: { start, end, series: { node: { t, count, min, max, mean } } }, one
+    entry per bucket with t the mean time of the runs in it.
+    """
+    if not valid_project_name(project):
+        return jsonify({"error": "Invalid project name"}), 400
+    if not (Path("projects") / project).is_dir():
+        return jsonify({"error": "Project does not exist"}), 404
+    try:
+        workflow, parameters = parse_history_filters(request.args)
+        start = request.args.get("start", type=float)
+        end = request.args.get("end", type=float)
+        points = min(max(1, int(request.args.get("points", 500))), 10000)
+        series = run_history.series(
+            project,
+            request.args.getlist("node"),
+            request.args.get("field", "value"),
+            start,
+            end,
+            points,
+            workflow,
+            parameters,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error querying run history: {e}")
+        return jsonify({"error": "Failed to query run history"}), 500
+    return jsonify(series)
+
+
+# ---------------- API Endpoint: /api/history/<project>/runs (GET) ------------------
+@app.route("/api/history/<project>/runs", methods=["GET"])
+def api_history_runs(project):
+    """
+    Lists recorded runs of a project, newest first: run_id, started, elapsed,
+    workflow, graph_hash, status and error.
+    Query arguments: workflow and param (as for /api/history/<project>), limit
+    (default 100, max 1000) and before (a run_id, to fetch the next page).
+    """
+    if not valid_project_name(project):
+        return jsonify({"error": "Invalid project name"}), 400
+    if not (Path("projects") / project).is_dir():
+        return jsonify({"error": "Project does not exist"}), 404
+    try:
+        workflow, parameters = parse_history_filters(request.args)
+        before = request.args.get("before", type=int)
+        limit = min(max(1, int(request.args.get("limit", 100))), 1000)
+        runs = run_history.runs(project, workflow, parameters, before, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error listing run history: {e}")
+        return jsonify({"error": "Failed to list run history"}), 500
+    return jsonify({"runs": runs})
+
+
+# ---------------- API Endpoint: /api/history/<project>/runs/<run_id> (GET) ------------------
+@app.route("/api/history/<project>/runs/<int:run_id>", methods=["GET"])
+def api_history_run(project, run_id):
+    """
+    Returns one recorded run with its per-node values and timings and the
+    parameters of its graph.
+    """
+    if not valid_project_name(project):
+        return jsonify({"error": "Invalid project name"}), 400
+    try:
+        run = run_history.run(project, run_id)
+    except Exception as e:
+        logging.error(f"Error reading run history: {e}")
+        return jsonify({"error": "Failed to read run history"}), 500
+    if run is None:
+        return jsonify({"error": "Run does not exist"}), 404
+    return jsonify(run)
+
+
+# ---------------- API Endpoint: /api/metrics (GET) ------------------
+@app.route("/api/metrics", methods=["GET"])
+def api_metrics():
+    """
+    Returns per node type execution counters and wall/queue time histograms in the
+    Prometheus text format, together with the result cache, log bus, isolated
+    worker pool, cluster and run history counters and the use of and queue wait
+    for each resource.
+    """
+    cache = result_cache.stats()
+    logs = log_bus.stats()
+    isolated = isolated_pool.stats()
+    cluster = coordinator.status()
+    history = run_history.stats()
+    resources = resource_scheduler.stats()["resources"]
+    lines = [
+        "# TYPE measnode_result_cache_hits_total counter",
+        f"measnode_result_cache_hits_total {cache['hits']}",
+        "# TYPE measnode_result_cache_misses_total counter",
+        f"measnode_result_cache_misses_total {cache['misses']}",
+        "# TYPE measnode_result_cache_entries gauge",
+        f"measnode_result_cache_entries {cache['entries']}",
+        "# TYPE measnode_log_records_dropped_total counter",
+        f"measnode_log_records_dropped_total {logs['dropped']}",
+        "# TYPE measnode_isolated_worker_restarts_total counter",
+        f"measnode_isolated_worker_restarts_total {isolated['restarts']}",
+        "# TYPE measnode_cluster_workers gauge",
+        f"measnode_cluster_workers {len(cluster['workers'])}",
+        "# TYPE measnode_cluster_workers_lost_total counter",
+        f"measnode_cluster_workers_lost_total {cluster['lost']}",
+        "# TYPE measnode_cluster_redispatched_total counter",
+        f"measnode_cluster_redispatched_total {cluster['redispatched']}",
+        "# TYPE measnode_history_runs_written_total counter",
+        f"measnode_history_runs_written_total {history['written']}",
+        "# TYPE measnode_history_runs_dropped_total counter",
+        f"measnode_history_runs_dropped_total {history['dropped']}",
+    ]
+    for name, metric, kind in (
+        ("capacity", "measnode_resource_capacity", "gauge"),
+        ("in_use", "measnode_resource_in_use", "gauge"),
+        ("waiting", "measnode_resource_waiting", "gauge"),
+        ("acquired", "measnode_resource_acquired_total", "counter"),
+        ("wait_s", "measnode_resource_wait_seconds_total", "counter"),
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{resource={json.dumps(resource)}}} {stats[name]}' for resource, stats in resources.items())
+    body = node_metrics.render() + "\n".join(lines) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+# ---------------- API Endpoint: /api/cluster (GET) ------------------
+@app.route("/api/cluster", methods=["GET"])
+def api_cluster():
+    """
+    Returns the cluster coordinator's address (null without MEASNODE_CLUSTER), the
+    connected workers with their node types, resources, slots and running/completed
+    node counts, and how many workers were lost and nodes re-dispatched.
+    """
+    return jsonify(coordinator.status())
+
+
+# ---------------- API Endpoint: /api/resources (GET) ------------------
+@app.route("/api/resources", methods=["GET"])
+def api_resources():
+    """
+    Returns the state of the resource scheduler: for each resource its capacity, the
+    units in use, the executions waiting for it, how many acquired it and their total
+    and longest queue wait in seconds ("executor" and "isolated" are the local pool
+    slots); the waiting executions per priority class and per project, and the
+    running ones per project.
+    """
+    return jsonify(resource_scheduler.stats())
+
+
 # ---------------- API Endpoint: /api/logs ------------------
 @app.route("/api/logs")
 def stream_logs():
     """
-    Streams actual log messages from the global log queue via Server-Sent Events.
-    When no log message is available or the message is empty, a comment line is sent
-    so that no visible log line is added to the log window.
+    Streams log messages from the global log bus via Server-Sent Events.
+    Every connected client receives every message. Optional query parameters:
+      - level: minimum level name (e.g. "WARNING")
+      - node: only messages logged while this node id was executing
+      - since: sequence number to start from (default: only new messages);
+        a reconnecting EventSource resumes from its Last-Event-ID instead.
+    When no log message is available, a comment line is sent as keepalive so that
+    no visible log line is added to the log window.
     """
+    try:
+        min_level, node_filter, cursor = parse_log_stream_args(request.args, request.headers)
+    except ValueError as e:
+        return str(e), 400
 
     def generate_logs():
-        while True:
-            try:
-                # Wait for up to 1 second for a log message.
-                msg = log_queue.get(timeout=1)
-                # Only yield a log message if it is not empty.
-                if msg.strip():
-                    yield f"data: {msg}\n\n"
-                else:
-                    # Yield a comment line which the client can ignore.
-                    yield ": keepalive\n\n"
-            except queue.Empty:
-                # When timeout occurs, send a keepalive comment.
-                yield ": keepalive\n\n"
+        nonlocal cursor
+        log_bus.subscribe()
+        try:
+            while True:
+                entries, cursor, dropped = log_bus.read(cursor, timeout=SSE_HEARTBEAT)
+                text = format_log_events(entries, dropped, min_level, node_filter)
+                # Without messages, yield a comment line which the client can ignore.
+                yield text or ": keepalive\n\n"
+        finally:
+            log_bus.unsubscribe()
 
     return Response(generate_logs(), mimetype="text/event-stream")
 
 
+def parse_log_stream_args(args, headers):
+    """
+    Returns (min_level, node_filter, cursor) for an /api/logs request; raises ValueError.
+    """
+    min_level = logging.getLevelName(args.get("level", "NOTSET").upper())
+    if not isinstance(min_level, int):
+        raise ValueError("Invalid level")
+    last_event_id = headers.get("Last-Event-ID")
+    try:
+        cursor = int(last_event_id) + 1 if last_event_id else int(args.get("since", log_bus.next_seq))
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
+    return min_level, args.get("node"), cursor
+
+
+def format_log_events(entries, dropped, min_level, node_filter):
+    """
+    Returns the SSE text for a batch of log bus entries ("" if none pass the filters).
+    """
+    parts = [f"data: [{dropped} log messages dropped]\n\n"] if dropped else []
+    for entry in entries:
+        if entry["levelno"] < min_level:
+            continue
+        if node_filter and entry["node_id"] != node_filter:
+            continue
+        parts.append(f"id: {entry['seq']}\ndata: {entry['message']}\n\n")
+    return "".join(parts)
+
+
+# ---------------- API Endpoint: /api/logs/stats (GET) ------------------
+@app.route("/api/logs/stats", methods=["GET"])
+def api_log_stats():
+    """
+    Returns log bus counters: buffer capacity, published and dropped messages,
+    and the number of connected subscribers.
+    """
+    return jsonify(log_bus.stats())
+
+
 # ---------------- Main Page Route ------------------
 @app.route("/")
 def index():
@@ -767,5 +1596,6 @@ def index():
 
 
 # ---------------- Main Entry Point ------------------
+# Development server with the reloader; run "measnode serve" for production use.
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
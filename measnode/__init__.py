@@ -0,0 +1,43 @@
+"""
+MeasNode execution engine, usable without the web UI.
+
+Submodules are imported on first attribute access, so "import measnode" (and
+"from measnode import BaseNode" in node modules) stays cheap and never imports Flask.
+"""
+
+import importlib
+
+# { public name: module that defines it }
+_EXPORTS = {
+    "BaseNode": "measnode.nodes",
+    "NodeRegistry": "measnode.nodes",
+    "load_node_modules": "measnode.nodes",
+    "node_registry": "measnode.nodes",
+    "result_cache": "measnode.cache",
+    "get_workflow_plan": "measnode.scheduler",
+    "run_plan": "measnode.scheduler",
+    "WorkflowSession": "measnode.sessions",
+    "run_sweep": "measnode.sweeps",
+    "run_stream": "measnode.streaming",
+    "read_workflow": "measnode.storage",
+    "write_workflow": "measnode.storage",
+    "patch_workflow": "measnode.storage",
+    "project_catalog": "measnode.catalog",
+    "run_history": "measnode.history",
+    "resource_scheduler": "measnode.resources",
+    "workflow_from_document": "measnode.runner",
+    "run_workflow": "measnode.runner",
+    "run_workflow_file": "measnode.runner",
+    "run_workflow_files": "measnode.runner",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'measnode' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
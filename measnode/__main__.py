@@ -0,0 +1,5 @@
+import sys
+
+from measnode.cli import main
+
+sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Benchmark suite: synthetic workflows for measuring the execution engine.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import platform
+import statistics
+import contextlib
+import tracemalloc
+
+from measnode.nodes import NODE_MODULES_DIR, NodeRegistry, load_node_modules
+from measnode.scheduler import EXECUTOR_KIND, ExecutionPlan, build_workflow_nodes, run_plan
+
+
+# ---------------- Synthetic Workflows ------------------
+# All graphs are built from the bundled Integer, BasicMath and Result nodes.
+
+
+def _node(node_id, node_type, parameters=None, connections=None):
+    return {
+        "id": node_id,
+        "type": node_type,
+        "parameters": parameters or {},
+        "connections": connections or {},
+    }
+
+
+def _add(node_id, a, b, operation="add"):
+    return _node(node_id, "BasicMath Node", {"operation": operation}, {"a": a, "b": b})
+
+
+def chain_workflow(size):
+    """
+    A single path of size BasicMath nodes: nothing can run in parallel,
+    so the run time is the scheduler's per-node latency.
+    """
+    nodes = [_node("n0", "Integer Node", {"value": "1"})]
+    previous = "n0"
+    for i in range(1, size + 1):
+        nodes.append(_add(f"n{i}", previous, "n0"))
+        previous = f"n{i}"
+    nodes.append(_node("result", "Result Node", connections={"input": previous}))
+    return {"nodes": nodes}
+
+
+def fanout_workflow(size):
+    """
+    One source feeding size independent BasicMath nodes, each with its own Result node.
+    """
+    nodes = [_node("n0", "Integer Node", {"value": "1"})]
+    for i in range(1, size + 1):
+        nodes.append(_add(f"n{i}", "n0", "n0"))
+        nodes.append(_node(f"r{i}", "Result Node", connections={"input": f"n{i}"}))
+    return {"nodes": nodes}
+
+
+def diamond_workflow(size):
+    """
+    size diamonds in series: each top node fans out to two nodes that join again.
+    """
+    nodes = [_node("top0", "Integer Node", {"value": "1"})]
+    top = "top0"
+    for i in range(1, size + 1):
+        nodes.append(_add(f"left{i}", top, top))
+        nodes.append(_add(f"right{i}", top, top, "subtract"))
+        nodes.append(_add(f"top{i}", f"left{i}", f"right{i}"))
+        top = f"top{i}"
+    nodes.append(_node("result", "Result Node", connections={"input": top}))
+    return {"nodes": nodes}
+
+
+def random_workflow(size, seed=0):
+    """
+    A random DAG of about size nodes: a tenth are Integer sources, the rest BasicMath
+    nodes reading two random earlier nodes; every node without dependents gets a Result node.
+    """
+    rng = random.Random(seed)
+    sources = max(1, size // 10)
+    nodes = [_node(f"n{i}", "Integer Node", {"value": str(rng.randint(0, 9))}) for i in range(sources)]
+    used = set()
+    for i in range(sources, size):
+        a, b = f"n{rng.randrange(i)}", f"n{rng.randrange(i)}"
+        used.update((a, b))
+        nodes.append(_add(f"n{i}", a, b, rng.choice(["add", "subtract"])))
+    sinks = [node["id"] for node in nodes if node["id"] not in used]
+    nodes.extend(_node(f"r_{sink}", "Result Node", connections={"input": sink}) for sink in sinks)
+    return {"nodes": nodes}
+
+
+GRAPHS = {
+    "chain": chain_workflow,
+    "fanout": fanout_workflow,
+    "diamond": diamond_workflow,
+    "random": random_workflow,
+}
+
+DEFAULT_CASES = [("chain", 1000), ("fanout", 1000), ("diamond", 500), ("random", 10000)]
+
+
+# ---------------- Measurements ------------------
+@contextlib.contextmanager
+def sleeps_stubbed():
+    """
+    Makes asyncio.sleep() and time.sleep() return immediately (coroutines still yield
+    to the event loop once), so benchmarks measure the engine instead of the
+    artificial delays in the demo nodes.
+    """
+    real_async_sleep, real_sleep = asyncio.sleep, time.sleep
+
+    async def no_async_sleep(delay, result=None):
+        return await real_async_sleep(0, result)
+
+    asyncio.sleep = no_async_sleep
+    time.sleep = lambda delay: None
+    try:
+        yield
+    finally:
+        asyncio.sleep, time.sleep = real_async_sleep, real_sleep
+
+
+def measure_module_load():
+    """
+    Returns the seconds needed to import all node modules into a fresh registry.
+    """
+    registry = NodeRegistry(NODE_MODULES_DIR)
+    start = time.perf_counter()
+    registry.refresh(force=True)
+    return time.perf_counter() - start
+
+
+def _compile(workflow):
+    nodes = build_workflow_nodes(workflow["nodes"], load_node_modules())
+    targets = [node.node_id for node in nodes.values() if node.title == "Result Node"]
+    return ExecutionPlan(nodes, targets)
+
+
+def _run(plan):
+    evaluated = {}
+    for _ in run_plan(plan, evaluated, []):
+        pass
+    return evaluated
+
+
+def bench_engine(workflow, repeat):
+    """
+    Measures plan compilation, execution (without the result cache) and the
+    peak memory allocated while executing.
+    """
+    start = time.perf_counter()
+    plan = _compile(workflow)
+    compile_s = time.perf_counter() - start
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(plan)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        _run(plan)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    run_s = statistics.median(times)
+    return {
+        "compile_s": round(compile_s, 6),
+        "run_s": round(run_s, 6),
+        "run_min_s": round(min(times), 6),
+        "per_node_us": round(run_s / len(plan.nodes) * 1e6, 2),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def bench_api(workflow, repeat):
+    """
+    Measures /api/execute plus /api/execute_stream end to end through the Flask app:
+    the time until the first SSE event and until the END event arrive.
+    """
+    from app import app  # Imported lazily: the rest of the benchmark does not need Flask.
+    from measnode.cache import result_cache
+
+    logging.getLogger().setLevel(logging.WARNING)
+    client = app.test_client()
+    first_events, ends = [], []
+    for _ in range(repeat):
+        result_cache.clear()
+        start = time.perf_counter()
+        token = client.post("/api/execute", json=workflow).get_json()["token"]
+        response = client.get(f"/api/execute_stream?token={token}", buffered=False)
+        first_event = None
+        try:
+            for chunk in response.response:
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                if b"data: END" in (chunk if isinstance(chunk, bytes) else chunk.encode()):
+                    break
+        finally:
+            response.close()
+        ends.append(time.perf_counter() - start)
+        first_events.append(first_event)
+    return {
+        "api_first_event_s": round(statistics.median(first_events), 6),
+        "api_end_s": round(statistics.median(ends), 6),
+    }
+
+
+def run_benchmarks(cases=DEFAULT_CASES, repeat=3, api=False):
+    """
+    Runs each (graph, size) case and returns a JSON-ready report.
+    """
+    report = {
+        "python": platform.python_version(),
+        "executor": EXECUTOR_KIND,
+        "cpus": os.cpu_count(),
+        "module_load_s": round(measure_module_load(), 6),
+        "cases": [],
+    }
+    with sleeps_stubbed():
+        for graph, size in cases:
+            workflow = GRAPHS[graph](size)
+            result = {"graph": graph, "size": size, "nodes": len(workflow["nodes"])}
+            result.update(bench_engine(workflow, repeat))
+            if api:
+                result.update(bench_api(workflow, repeat))
+            report["cases"].append(result)
+    return report
+
+
+# ---------------- Baseline Comparison ------------------
+# Metrics where larger values are worse.
+COMPARED_METRICS = ["compile_s", "run_s", "per_node_us", "peak_mem_kb", "api_first_event_s", "api_end_s"]
+
+
+def compare_reports(baseline, current, tolerance=0.1):
+    """
+    Compares a report against a baseline report. Returns a list of changes
+    { graph, size, metric, baseline, current, change } where change is the relative
+    difference; "regression" is set on metrics more than tolerance worse.
+    """
+    changes = []
+
+    def compare(graph, size, metric, old, new):
+        if old is None or new is None:
+            return
+        change = (new - old) / old if old else 0.0
+        changes.append(
+            {
+                "graph": graph,
+                "size": size,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regression": change > tolerance,
+            }
+        )
+
+    compare(None, None, "module_load_s", baseline.get("module_load_s"), current.get("module_load_s"))
+    baseline_cases = {(case["graph"], case["size"]): case for case in baseline.get("cases", [])}
+    for case in current["cases"]:
+        old_case = baseline_cases.get((case["graph"], case["size"]))
+        if old_case is None:
+            continue
+        for metric in COMPARED_METRICS:
+            compare(case["graph"], case["size"], metric, old_case.get(metric), case.get(metric))
+    return changes
+
+
+def parse_cases(text):
+    """
+    Parses "chain:1000,random:10000" into [("chain", 1000), ("random", 10000)].
+    """
+    cases = []
+    for item in text.split(","):
+        graph, _, size = item.strip().partition(":")
+        if graph not in GRAPHS:
+            raise ValueError(f"Unknown graph '{graph}' (expected one of {', '.join(GRAPHS)})")
+        cases.append((graph, int(size) if size else 1000))
+    return cases
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
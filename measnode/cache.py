@@ -0,0 +1,162 @@
+"""
+Content-addressed cache of node results.
+"""
+
+import os
+import hashlib
+import uuid
+import json
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from measnode.nodes import node_registry
+from measnode.payloads import PayloadHandle, resolve_payloads
+from measnode.storage import valid_project_name
+
+
+# ---------------- Result Cache ------------------
+# Maximum number of node results kept in memory across executions.
+RESULT_CACHE_ENTRIES = int(os.environ.get("MEASNODE_CACHE_ENTRIES", "1024"))
+# Set to "1" to also persist results under projects/<project>/.cache.
+RESULT_CACHE_DISK = os.environ.get("MEASNODE_CACHE_DISK", "0") == "1"
+
+
+def value_digest(value):
+    """
+    Returns a stable sha256 hex digest of a node input/output value.
+    JSON-serializable values are hashed from their canonical JSON form, NumPy arrays from
+    their raw buffer, payload handles from their id, anything else via pickle.
+    """
+    if isinstance(value, PayloadHandle):
+        return hashlib.sha256(f"payload:{value.payload_id}".encode()).hexdigest()
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        digest = hashlib.sha256(f"{value.dtype.str}:{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).data)
+        return digest.hexdigest()
+    try:
+        data = json.dumps(value, sort_keys=True).encode()
+    except (TypeError, ValueError):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha256(data).hexdigest()
+
+
+def node_cache_key(node, input_digests):
+    """
+    Builds the content address of a node execution from its type, parameters,
+    module source hash and the digests of its input values.
+    """
+    key = {
+        "type": node.title,
+        "parameters": node.parameters,
+        "source": node_registry.source_hashes.get(node.title, ""),
+        "inputs": input_digests,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Cross-execution cache of node results keyed by node_cache_key().
+    Results live in a bounded LRU in memory and, optionally, as pickle files in a
+    per-project directory so they survive server restarts.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # { key: (result, output digest) }
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, disk_dir=None):
+        """
+        Returns (result, output digest) for a key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if disk_dir is not None:
+            path = Path(disk_dir) / f"{key}.pkl"
+            try:
+                with open(path, "rb") as f:
+                    entry = pickle.load(f)
+            except FileNotFoundError:
+                entry = None
+            except Exception as e:
+                logging.warning(f"Ignoring unreadable cache file {path}: {e}")
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, entry, disk_dir=None):
+        """
+        Stores (result, output digest) for a key in memory and, if given, on disk.
+        Payload handles are written to disk as the arrays they refer to, because
+        payload files do not outlive their TTL.
+        """
+        self._remember(key, entry)
+        if disk_dir is not None:
+            disk_dir = Path(disk_dir)
+            try:
+                disk_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = disk_dir / f"{key}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, "wb") as f:
+                    result, digest = entry
+                    pickle.dump((resolve_payloads(result), digest), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, disk_dir / f"{key}.pkl")
+            except Exception as e:
+                logging.warning(f"Could not write cache file for {key}: {e}")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+result_cache = ResultCache(RESULT_CACHE_ENTRIES)
+
+
+def project_cache_dir(project_name):
+    """
+    Returns the on-disk cache directory for a project, or None if the disk tier is off
+    or the project does not exist.
+    """
+    if not RESULT_CACHE_DISK or not valid_project_name(project_name):
+        return None
+    project_path = Path("projects") / project_name
+    if not project_path.is_dir():
+        return None
+    return project_path / ".cache"
@@ -0,0 +1,253 @@
+"""
+In-memory catalog of the projects and workflows under projects/, with per-workflow metadata.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from pathlib import Path
+
+from measnode.storage import read_workflow, workflow_signature
+
+
+# ---------------- Project Catalog ------------------
+# Seconds between checks of the project folders for changes made outside the API
+# (0 disables the watcher; the API endpoints keep the catalog current either way).
+CATALOG_WATCH_INTERVAL = float(os.environ.get("MEASNODE_CATALOG_WATCH_INTERVAL", "5"))
+
+
+class WorkflowEntry:
+    __slots__ = ("name", "signature", "revision", "node_count", "wire_count", "node_types", "mtime", "size", "stale")
+
+    def __init__(self, name):
+        self.name = name
+        self.signature = None  # workflow_signature() of the file when last read
+        self.revision = 0
+        self.node_count = 0
+        self.wire_count = 0
+        self.node_types = []
+        self.mtime = 0.0
+        self.size = 0
+        self.stale = True
+
+    def as_dict(self, project):
+        return {
+            "project": project,
+            "workflow": self.name,
+            "revision": self.revision,
+            "node_count": self.node_count,
+            "wire_count": self.wire_count,
+            "node_types": self.node_types,
+            "mtime": self.mtime,
+            "size": self.size,
+        }
+
+
+class ProjectCatalog:
+    """
+    Keeps the project/workflow listing in memory so requests no longer walk the
+    projects folder. Endpoints that change files call touch()/discard() (cheap: entries
+    are only marked stale and re-read on the next listing); a background thread picks
+    up changes made outside the API by polling folder mtimes, which change whenever a
+    file is added, removed, renamed or atomically replaced.
+    Every change increments version, which the listing endpoints use as their ETag.
+    """
+
+    def __init__(self, projects_dir, watch_interval=CATALOG_WATCH_INTERVAL):
+        self.projects_dir = Path(projects_dir)
+        self.watch_interval = watch_interval
+        self._lock = threading.RLock()
+        self._projects = None  # { project: { workflow: WorkflowEntry } }, None until first scan
+        self._folder_mtimes = {}  # { project or "": folder mtime_ns at the last scan }
+        self._watcher = None
+        self._boot = uuid.uuid4().hex[:8]
+        self.version = 0
+
+    @property
+    def etag(self):
+        return f"{self._boot}-{self.version}"
+
+    # ---- Updates ----
+    def _scan_project(self, project):
+        folder = self.projects_dir / project
+        try:
+            self._folder_mtimes[project] = folder.stat().st_mtime_ns
+            names = {path.name for path in folder.glob("*.json")}
+        except FileNotFoundError:
+            self._projects.pop(project, None)
+            self._folder_mtimes.pop(project, None)
+            return
+        entries = self._projects.setdefault(project, {})
+        for name in set(entries) - names:
+            del entries[name]
+        for name in names:
+            entry = entries.get(name)
+            if entry is None:
+                entries[name] = WorkflowEntry(name)
+            elif not entry.stale:
+                try:
+                    entry.stale = workflow_signature(folder / name) != entry.signature
+                except FileNotFoundError:
+                    del entries[name]
+
+    def scan(self):
+        """
+        Rebuilds the catalog from the projects folder.
+        """
+        with self._lock:
+            self.projects_dir.mkdir(exist_ok=True)
+            self._projects = {}
+            self._folder_mtimes = {"": self.projects_dir.stat().st_mtime_ns}
+            for folder in self.projects_dir.iterdir():
+                if folder.is_dir():
+                    self._scan_project(folder.name)
+            self.version += 1
+
+    def _ensure_loaded(self):
+        if self._projects is None:
+            self.scan()
+        if self.watch_interval > 0 and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="measnode-catalog", daemon=True)
+            self._watcher.start()
+
+    def touch(self, project, workflow=None):
+        """
+        Records that a workflow (or, without workflow, a whole project folder) was
+        created or changed.
+        """
+        with self._lock:
+            if self._projects is None:
+                return
+            if workflow is None:
+                self._scan_project(project)
+            else:
+                entries = self._projects.setdefault(project, {})
+                entry = entries.get(workflow)
+                if entry is None:
+                    entry = entries[workflow] = WorkflowEntry(workflow)
+                entry.stale = True
+            self.version += 1
+
+    def discard(self, project, workflow=None):
+        """
+        Records that a workflow (or, without workflow, a whole project) was removed.
+        """
+        with self._lock:
+            if self._projects is None:
+                return
+            if workflow is None:
+                self._projects.pop(project, None)
+                self._folder_mtimes.pop(project, None)
+            else:
+                self._projects.get(project, {}).pop(workflow, None)
+            self.version += 1
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"Error watching projects folder: {e}")
+
+    def check(self):
+        """
+        Rescans project folders whose mtime changed since the last scan.
+        """
+        with self._lock:
+            if self._projects is None:
+                return
+            changed = False
+            root_mtime = self.projects_dir.stat().st_mtime_ns
+            if root_mtime != self._folder_mtimes.get(""):
+                self._folder_mtimes[""] = root_mtime
+                folders = {folder.name for folder in self.projects_dir.iterdir() if folder.is_dir()}
+                for project in set(self._projects) - folders:
+                    self.discard(project)
+                for project in folders - set(self._projects):
+                    self._scan_project(project)
+                changed = True
+            for project in list(self._projects):
+                try:
+                    mtime = (self.projects_dir / project).stat().st_mtime_ns
+                except FileNotFoundError:
+                    mtime = None
+                if mtime != self._folder_mtimes.get(project):
+                    self._scan_project(project)
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def _refresh(self, project, entry):
+        """
+        Re-reads the metadata of a stale entry. Returns False if the file is gone.
+        """
+        if not entry.stale:
+            return True
+        path = self.projects_dir / project / entry.name
+        try:
+            signature = workflow_signature(path)
+            document = read_workflow(path)
+        except FileNotFoundError:
+            self._projects.get(project, {}).pop(entry.name, None)
+            return False
+        except Exception as e:
+            logging.error(f"Error reading workflow {path}: {e}")
+            signature, document = workflow_signature(path), {}
+        nodes = document.get("nodes", [])
+        entry.signature = signature
+        entry.revision = document.get("revision", 0)
+        entry.node_count = len(nodes)
+        entry.wire_count = len(document.get("wires", []))
+        entry.node_types = sorted({node.get("type") for node in nodes if node.get("type")})
+        entry.mtime = max(signature[0], signature[2]) / 1e9
+        entry.size = signature[1] + signature[3]
+        entry.stale = False
+        return True
+
+    # ---- Queries ----
+    def projects(self):
+        """
+        Returns [{ name, workflows: [filename, ...] }] sorted by name, the payload of /api/projects.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return [
+                {"name": project, "workflows": sorted(entries)}
+                for project, entries in sorted(self._projects.items())
+            ]
+
+    def search(self, query="", node_type=None, offset=0, limit=50):
+        """
+        Returns (total, [workflow metadata]) for the workflows whose project name,
+        workflow name or node types contain every word of query (case-insensitive)
+        and, if node_type is given, that use that node type.
+        """
+        words = query.lower().split()
+        with self._lock:
+            self._ensure_loaded()
+            matches = []
+            for project, entries in sorted(self._projects.items()):
+                for name in sorted(entries):
+                    entry = entries[name]
+                    # Metadata is only needed up front when filtering on it.
+                    if (words or node_type) and not self._refresh(project, entry):
+                        continue
+                    if node_type and node_type not in entry.node_types:
+                        continue
+                    if words:
+                        text = " ".join([project, name, *entry.node_types]).lower()
+                        if not all(word in text for word in words):
+                            continue
+                    matches.append((project, entry))
+            page = [
+                entry.as_dict(project)
+                for project, entry in matches[offset:offset + limit]
+                if self._refresh(project, entry)
+            ]
+            return len(matches), page
+
+
+project_catalog = ProjectCatalog(Path("projects"))
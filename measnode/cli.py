@@ -0,0 +1,344 @@
+"""
+Command line interface: "measnode run" executes saved workflows without the web server,
+"measnode serve" runs the production web server and "measnode worker" runs nodes for
+either of them on other processes or hosts.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from pathlib import Path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="measnode", description="Run MeasNode workflows headless.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser(
+        "run",
+        help="Execute workflow files and print one JSON line per workflow.",
+        description=(
+            "Executes saved workflows in-process and prints one JSON line per workflow "
+            '({"workflow", "status", "elapsed", "order", "results"} or "error"). '
+            "Paths that do not exist are also looked up under ./projects, so "
+            '"measnode run mathtest/add.json" works from the repository root.'
+        ),
+    )
+    run.add_argument("workflows", nargs="+", help="Workflow JSON files (project/workflow.json).")
+    run.add_argument("-j", "--jobs", type=int, default=4, help="Number of workflows run at the same time.")
+    run.add_argument(
+        "--executor",
+        choices=["thread", "process", "async"],
+        help="Pool used for node execution (default: MEASNODE_EXECUTOR or thread).",
+    )
+    run.add_argument("--workers", type=int, help="Pool size (default: MEASNODE_WORKERS or 8).")
+    run.add_argument("--modules", help="Folder with node modules (default: MEASNODE_MODULES or ./modules).")
+    run.add_argument("--events", action="store_true", help="Also print PROCESSING/DONE events as JSON lines.")
+    run.add_argument(
+        "--cluster",
+        help="Dispatch nodes to workers connecting to this address (tcp://host:port or unix:///path).",
+    )
+    run.add_argument(
+        "--local-workers", type=int, default=0, help="Start this many workers on this machine (requires --cluster)."
+    )
+    run.add_argument(
+        "--wait-workers",
+        type=int,
+        default=0,
+        help="Wait (up to 30 s) for this many workers before running (default: --local-workers).",
+    )
+    run.add_argument("-v", "--verbose", action="store_true", help="Log node output to stderr.")
+
+    bench = commands.add_parser(
+        "bench",
+        help="Benchmark the engine on synthetic workflows.",
+        description=(
+            "Runs synthetic chain, fan-out, diamond and random DAG workflows built from the "
+            "bundled nodes (with their sleeps stubbed out) and prints one JSON line per case. "
+            "With --baseline, prints the change of every metric against a saved report and "
+            "exits with status 1 if any metric regressed by more than --tolerance."
+        ),
+    )
+    bench.add_argument(
+        "--cases",
+        default="chain:1000,fanout:1000,diamond:500,random:10000",
+        help="Comma-separated graph:size list (graphs: chain, fanout, diamond, random).",
+    )
+    bench.add_argument("--repeat", type=int, default=3, help="Timed runs per case (the median is reported).")
+    bench.add_argument("--api", action="store_true", help="Also measure /api/execute plus its SSE stream.")
+    bench.add_argument("--save", help="Write the report to this JSON file.")
+    bench.add_argument("--baseline", help="Compare against a report written by --save.")
+    bench.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative slowdown (default 0.1).")
+    bench.add_argument(
+        "--executor",
+        choices=["thread", "process", "async"],
+        help="Pool used for node execution (default: MEASNODE_EXECUTOR or thread).",
+    )
+    bench.add_argument("--workers", type=int, help="Pool size (default: MEASNODE_WORKERS or 8).")
+
+    serve = commands.add_parser(
+        "serve",
+        help="Run the production web server (requires the server extra: pip install 'measnode[server]').",
+        description=(
+            "Serves the editor and API with uvicorn. Log and execution streams run on the "
+            "event loop, so open streams do not occupy threads. On SIGINT/SIGTERM new "
+            "executions are refused and running ones get --drain-timeout seconds to finish. "
+            "Executions, sessions and payloads live in the server process, so the server "
+            "runs as a single process; scale with --threads and --job-workers."
+        ),
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default 127.0.0.1).")
+    serve.add_argument("--port", type=int, default=5000, help="Port to listen on (default 5000).")
+    serve.add_argument(
+        "--threads", type=int, help="Threads for ordinary requests (default: MEASNODE_SERVER_THREADS or 16)."
+    )
+    serve.add_argument(
+        "--job-workers", type=int, help="Executions run at the same time (default: MEASNODE_JOB_WORKERS or 4)."
+    )
+    serve.add_argument(
+        "--drain-timeout",
+        type=float,
+        help="Seconds to wait for running executions on shutdown (default: MEASNODE_DRAIN_TIMEOUT or 60).",
+    )
+    serve.add_argument(
+        "--heartbeat",
+        type=float,
+        help="Seconds between keepalives on idle streams (default: MEASNODE_SSE_HEARTBEAT or 15).",
+    )
+    serve.add_argument(
+        "--executor",
+        choices=["thread", "process", "async"],
+        help="Pool used for node execution (default: MEASNODE_EXECUTOR or thread).",
+    )
+    serve.add_argument("--workers", type=int, help="Pool size (default: MEASNODE_WORKERS or 8).")
+    serve.add_argument("--modules", help="Folder with node modules (default: MEASNODE_MODULES or ./modules).")
+    serve.add_argument(
+        "--cluster",
+        help="Dispatch nodes to workers connecting to this address (default: MEASNODE_CLUSTER).",
+    )
+
+    worker = commands.add_parser(
+        "worker",
+        help="Run nodes for a server or run started with --cluster.",
+        description=(
+            "Connects to a coordinator (measnode serve/run --cluster), advertises the node "
+            "types in its modules folder and its resources, and runs the nodes it is sent. "
+            "Reconnects when the coordinator restarts. Set MEASNODE_CLUSTER_KEY on both sides "
+            "unless the address is a Unix socket (workers started with --local-workers inherit it)."
+        ),
+    )
+    worker.add_argument(
+        "--connect", default=os.environ.get("MEASNODE_CLUSTER"), help="Coordinator address (default: MEASNODE_CLUSTER)."
+    )
+    worker.add_argument("--name", help="Name shown in /api/cluster (default: host-pid).")
+    worker.add_argument("--slots", type=int, default=4, help="Nodes run at the same time (default 4).")
+    worker.add_argument(
+        "--resource",
+        action="append",
+        default=[],
+        metavar="NAME=COUNT",
+        help="Resource this worker provides, e.g. scope=1 (repeatable).",
+    )
+    worker.add_argument("--count", type=int, default=1, help="Start this many worker processes (default 1).")
+    worker.add_argument(
+        "--executor",
+        choices=["thread", "process", "async"],
+        help="Pool used for node execution (default: MEASNODE_EXECUTOR or thread).",
+    )
+    worker.add_argument("--workers", type=int, help="Pool size (default: MEASNODE_WORKERS or 8).")
+    worker.add_argument("--modules", help="Folder with node modules (default: MEASNODE_MODULES or ./modules).")
+    worker.add_argument("-v", "--verbose", action="store_true", help="Log node output to stderr.")
+    return parser
+
+
+def resolve_workflow_path(name):
+    path = Path(name)
+    if not path.exists() and (Path("projects") / path).exists():
+        return Path("projects") / path
+    return path
+
+
+def apply_engine_options(args):
+    # The engine reads its configuration from the environment at import time,
+    # so apply the options before importing it.
+    if args.executor:
+        os.environ["MEASNODE_EXECUTOR"] = args.executor
+    if args.workers:
+        os.environ["MEASNODE_WORKERS"] = str(args.workers)
+    if getattr(args, "modules", None):
+        os.environ["MEASNODE_MODULES"] = os.path.abspath(args.modules)
+
+
+def parse_resources(items):
+    resources = {}
+    for item in items:
+        name, _, count = item.partition("=")
+        try:
+            resources[name.strip()] = int(count) if count else 1
+        except ValueError:
+            raise ValueError(f"invalid resource {item!r} (use NAME=COUNT)") from None
+        if not name.strip():
+            raise ValueError(f"invalid resource {item!r} (use NAME=COUNT)")
+    return resources
+
+
+def write_json_line(record):
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def run_command(args):
+    apply_engine_options(args)
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    if args.cluster:
+        os.environ["MEASNODE_CLUSTER"] = args.cluster
+    elif args.local_workers:
+        print("measnode run: --local-workers requires --cluster", file=sys.stderr)
+        return 2
+
+    from measnode.runner import run_workflow_files
+    from measnode.history import run_history
+
+    coordinator, local_workers = None, []
+    if args.cluster:
+        from measnode import cluster
+
+        coordinator = cluster.coordinator
+        try:
+            coordinator.start()
+        except (OSError, ValueError) as e:
+            print(f"measnode run: cannot listen on {args.cluster}: {e}", file=sys.stderr)
+            return 2
+        local_workers = cluster.start_local_workers(args.cluster, args.local_workers)
+        wait_workers = args.wait_workers or args.local_workers
+        if wait_workers and not coordinator.wait_for_workers(wait_workers, timeout=30):
+            print(f"measnode run: fewer than {wait_workers} workers connected", file=sys.stderr)
+
+    write_lock = threading.Lock()
+
+    def write(record):
+        with write_lock:
+            write_json_line(record)
+
+    on_event = None
+    if args.events:
+        def on_event(workflow, event, node_id, profile):
+            record = {"workflow": workflow, "event": event, "node": node_id}
+            if profile is not None:
+                record["profile"] = profile
+            write(record)
+
+    paths = [resolve_workflow_path(name) for name in args.workflows]
+    failed = 0
+    try:
+        for record in run_workflow_files(paths, args.jobs, on_event):
+            failed += record["status"] != "ok"
+            write(record)
+    finally:
+        run_history.flush()
+        if coordinator is not None:
+            coordinator.stop()
+        for process in local_workers:
+            process.terminate()
+            process.wait()
+    return 1 if failed else 0
+
+
+def bench_command(args):
+    apply_engine_options(args)
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
+
+    from measnode import bench
+
+    try:
+        cases = bench.parse_cases(args.cases)
+    except ValueError as e:
+        print(f"measnode bench: {e}", file=sys.stderr)
+        return 2
+    report = bench.run_benchmarks(cases, max(1, args.repeat), args.api)
+    for case in report["cases"]:
+        write_json_line({"module_load_s": report["module_load_s"], **case})
+    if args.save:
+        bench.write_report(report, args.save)
+    if args.baseline:
+        changes = bench.compare_reports(bench.load_report(args.baseline), report, args.tolerance)
+        for change in changes:
+            write_json_line(change)
+        if any(change["regression"] for change in changes):
+            return 1
+    return 0
+
+
+def serve_command(args):
+    apply_engine_options(args)
+    for option, variable in [
+        ("threads", "MEASNODE_SERVER_THREADS"),
+        ("job_workers", "MEASNODE_JOB_WORKERS"),
+        ("drain_timeout", "MEASNODE_DRAIN_TIMEOUT"),
+        ("heartbeat", "MEASNODE_SSE_HEARTBEAT"),
+        ("cluster", "MEASNODE_CLUSTER"),
+    ]:
+        if getattr(args, option) is not None:
+            os.environ[variable] = str(getattr(args, option))
+
+    from measnode import server
+
+    return server.serve(args.host, args.port, server.SERVER_THREADS, server.DRAIN_TIMEOUT)
+
+
+def worker_command(args):
+    apply_engine_options(args)
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    if not args.connect:
+        print("measnode worker: no coordinator address (use --connect or MEASNODE_CLUSTER)", file=sys.stderr)
+        return 2
+    try:
+        resources = parse_resources(args.resource)
+    except ValueError as e:
+        print(f"measnode worker: {e}", file=sys.stderr)
+        return 2
+
+    from measnode import cluster
+
+    if args.count > 1:
+        processes = cluster.start_local_workers(args.connect, args.count, args.slots, resources)
+        try:
+            for process in processes:
+                process.wait()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+        return 0
+    try:
+        cluster.ClusterWorker(args.connect, args.name, args.slots, resources).run()
+    except ValueError as e:
+        print(f"measnode worker: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run_command(args)
+    if args.command == "bench":
+        return bench_command(args)
+    if args.command == "serve":
+        return serve_command(args)
+    if args.command == "worker":
+        return worker_command(args)
+    return 2
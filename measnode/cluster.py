@@ -0,0 +1,581 @@
+"""
+Distributed execution: a coordinator in the server process dispatches nodes to
+"measnode worker" processes connected over TCP or Unix sockets.
+"""
+
+import os
+import sys
+import time
+import uuid
+import socket
+import secrets
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+
+from measnode.nodes import load_node_modules, node_registry
+from measnode.payloads import resolve_payloads
+from measnode.metrics import NodeProfile, output_size
+from measnode.scheduler import set_remote_executor, submit_local
+
+
+# ---------------- Cluster Settings ------------------
+# Address the coordinator listens on and workers connect to:
+# "tcp://host:port" or "unix:///path/to/socket". Empty runs without workers.
+CLUSTER_ADDRESS = os.environ.get("MEASNODE_CLUSTER", "")
+# The shared secret for the connection handshake is read from MEASNODE_CLUSTER_KEY.
+# Messages are pickled, so every TCP address needs one, loopback included (any local
+# user could connect); a coordinator without one generates a random key for the run,
+# which the workers it starts itself inherit. Unix sockets fall back to a fixed key.
+# Seconds between worker heartbeats; a worker silent for WORKER_TIMEOUT seconds is dropped.
+HEARTBEAT_INTERVAL = float(os.environ.get("MEASNODE_WORKER_HEARTBEAT", "2"))
+WORKER_TIMEOUT = float(os.environ.get("MEASNODE_WORKER_TIMEOUT", "10"))
+# Inputs at least this large are sent by reference to a worker that already holds them.
+REF_MIN_BYTES = int(os.environ.get("MEASNODE_CLUSTER_REF_BYTES", str(64 * 1024)))
+# Large outputs each worker keeps for its later tasks (and the coordinator keeps track of).
+WORKER_STORE_ITEMS = int(os.environ.get("MEASNODE_WORKER_STORE_ITEMS", "256"))
+# Workers a node is dispatched to before it fails because they were all lost.
+MAX_ATTEMPTS = int(os.environ.get("MEASNODE_CLUSTER_ATTEMPTS", "3"))
+
+
+class WorkerLost(Exception):
+    pass
+
+
+class RemoteNodeError(Exception):
+    pass
+
+
+def parse_address(address):
+    """
+    Returns (address, family) for multiprocessing.connection from a
+    "tcp://host:port" or "unix:///path" address.
+    """
+    if address.startswith("unix://"):
+        return address[len("unix://"):], "AF_UNIX"
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        if host and port.isdigit():
+            return (host.strip("[]"), int(port)), "AF_INET6" if ":" in host else "AF_INET"
+    raise ValueError(f"Invalid cluster address {address!r} (use tcp://host:port or unix:///path)")
+
+
+def auth_key(address):
+    _, family = parse_address(address)
+    key = os.environ.get("MEASNODE_CLUSTER_KEY")
+    if key:
+        return key.encode()
+    if family == "AF_UNIX":
+        return b"measnode"
+    raise ValueError("MEASNODE_CLUSTER_KEY must be set for tcp:// cluster addresses")
+
+
+def node_resources(node):
+    return getattr(node, "resources", None) or {}
+
+
+class StoredOutput:
+    """
+    Reference to (one output of) a result kept by the worker that produced it.
+    """
+
+    __slots__ = ("task_id", "key")
+
+    def __init__(self, task_id, key=None):
+        self.task_id = task_id
+        self.key = key
+
+
+class MissingOutput(Exception):
+    pass
+
+
+# ---------------- Coordinator ------------------
+class RemoteTask:
+    __slots__ = ("task_id", "node", "parameters", "inputs", "future", "profile", "attempts", "sent_at", "worker")
+
+    def __init__(self, node, inputs, profile):
+        self.task_id = uuid.uuid4().hex
+        self.node = node
+        self.parameters = dict(node.parameters)
+        self.inputs = inputs
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+        self.profile = profile
+        self.attempts = 0
+        self.sent_at = None
+        self.worker = None
+
+
+class WorkerHandle:
+    """
+    A connected worker: what it advertised in its hello message and the tasks it is running.
+    """
+
+    def __init__(self, conn, hello):
+        self.worker_id = uuid.uuid4().hex[:8]
+        self.conn = conn
+        self.name = str(hello.get("name") or self.worker_id)
+        self.host = hello.get("host")
+        self.pid = hello.get("pid")
+        self.node_types = dict(hello.get("node_types", {}))  # { node type: source hash }
+        self.resources = dict(hello.get("resources", {}))
+        self.slots = max(1, int(hello.get("slots", 1)))
+        self.inflight = {}  # { task_id: RemoteTask }
+        self.completed = 0
+        self.failed = 0
+        self.connected_at = time.time()
+        self.last_seen = time.monotonic()
+        self._send_lock = threading.Lock()
+
+    def can_run(self, node):
+        # The worker's module must be the same version as the coordinator's.
+        source_hash = self.node_types.get(node.title)
+        return source_hash is not None and source_hash == node_registry.source_hashes.get(node.title) and all(
+            self.resources.get(name, 0) >= units for name, units in node_resources(node).items()
+        )
+
+    def load(self):
+        return len(self.inflight) / self.slots
+
+    def send(self, message):
+        with self._send_lock:
+            self.conn.send(message)
+
+    def as_dict(self):
+        return {
+            "id": self.worker_id,
+            "name": self.name,
+            "host": self.host,
+            "pid": self.pid,
+            "node_types": sorted(self.node_types),
+            "resources": self.resources,
+            "slots": self.slots,
+            "running": len(self.inflight),
+            "completed": self.completed,
+            "failed": self.failed,
+            "connected_at": self.connected_at,
+            "last_seen_s": round(time.monotonic() - self.last_seen, 3),
+        }
+
+
+class Coordinator:
+    """
+    Accepts worker connections and runs nodes on them for the scheduler (it is
+    registered with set_remote_executor). A node goes to a worker that advertises
+    its type and resources; among those, the worker already holding the most bytes
+    of the node's inputs wins (those inputs are then sent as references instead of
+    values), so chains of nodes over large data stay on one worker. Ties go to the
+    least loaded worker. Nodes no worker can run execute locally.
+    When a worker disconnects or stops sending heartbeats, its running nodes are
+    dispatched again to the remaining workers (or run locally if none is left).
+    """
+
+    def __init__(self, address=CLUSTER_ADDRESS):
+        self.address = address
+        self.workers = {}  # { worker_id: WorkerHandle }
+        self.lost = 0
+        self.redispatched = 0
+        self._lock = threading.Lock()
+        self._joined = threading.Condition(self._lock)
+        self._listener = None
+        # { id(value): (value, worker_id, StoredOutput) } for large values held by workers.
+        self._locations = OrderedDict()
+
+    @property
+    def active(self):
+        return self._listener is not None
+
+    def start(self):
+        """
+        Starts listening for workers and registers the coordinator with the scheduler.
+        """
+        if self._listener is not None:
+            return
+        address, family = parse_address(self.address)
+        if family == "AF_UNIX" and os.path.exists(address):
+            os.unlink(address)
+        if family != "AF_UNIX" and not os.environ.get("MEASNODE_CLUSTER_KEY"):
+            # Set in the environment so that start_local_workers() children use it too.
+            os.environ["MEASNODE_CLUSTER_KEY"] = secrets.token_hex(32)
+            logging.warning(
+                "MEASNODE_CLUSTER_KEY is not set; generated a key for this run. "
+                "Only workers started by this process can connect."
+            )
+        self._listener = Listener(address, family, authkey=auth_key(self.address))
+        threading.Thread(target=self._accept, args=(self._listener,), name="measnode-cluster", daemon=True).start()
+        threading.Thread(target=self._monitor, name="measnode-cluster-monitor", daemon=True).start()
+        set_remote_executor(self)
+        logging.info(f"Cluster coordinator listening on {self.address}")
+
+    def stop(self):
+        """
+        Stops accepting workers and disconnects the connected ones; nodes run locally again.
+        """
+        set_remote_executor(None)
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        with self._lock:
+            workers = list(self.workers.values())
+        for worker in workers:
+            self._lose(worker, "coordinator stopped")
+
+    def wait_for_workers(self, count, timeout=None):
+        """
+        Blocks until at least count workers are connected. Returns whether they are.
+        """
+        with self._joined:
+            return self._joined.wait_for(lambda: len(self.workers) >= count, timeout)
+
+    # ---- Connections ----
+    def _accept(self, listener):
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError as e:
+                if self._listener is not listener:
+                    return
+                logging.error(f"Error accepting cluster worker: {e}")
+                continue
+            except Exception as e:
+                # Failed handshake (wrong key) or a client that is not a worker.
+                logging.warning(f"Rejected cluster connection: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), name="measnode-cluster-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            if not conn.poll(WORKER_TIMEOUT):
+                raise EOFError("no hello message")
+            kind, hello = conn.recv()
+            if kind != "hello":
+                raise EOFError(f"unexpected message {kind!r}")
+        except Exception as e:
+            logging.warning(f"Cluster worker failed to register: {e}")
+            conn.close()
+            return
+        worker = WorkerHandle(conn, hello)
+        with self._joined:
+            self.workers[worker.worker_id] = worker
+            self._joined.notify_all()
+        logging.info(
+            f"Cluster worker {worker.name} joined ({len(worker.node_types)} node types, "
+            f"{worker.slots} slots, resources {worker.resources})"
+        )
+        reason = "disconnected"
+        try:
+            while True:
+                message = conn.recv()
+                worker.last_seen = time.monotonic()
+                kind = message[0]
+                if kind == "done":
+                    self._complete(worker, *message[1:])
+                elif kind == "error":
+                    self._fail(worker, *message[1:])
+                elif kind == "missing":
+                    self._resend(worker, message[1])
+        except (EOFError, OSError):
+            pass
+        except Exception as e:
+            reason = f"protocol error: {e}"
+        self._lose(worker, reason)
+
+    def _monitor(self):
+        while self._listener is not None:
+            time.sleep(HEARTBEAT_INTERVAL)
+            deadline = time.monotonic() - WORKER_TIMEOUT
+            with self._lock:
+                silent = [worker for worker in self.workers.values() if worker.last_seen < deadline]
+            for worker in silent:
+                self._lose(worker, f"no heartbeat for {WORKER_TIMEOUT:g} s")
+
+    def _lose(self, worker, reason):
+        with self._lock:
+            if self.workers.pop(worker.worker_id, None) is None:
+                return
+            tasks = list(worker.inflight.values())
+            worker.inflight.clear()
+            for key, (_, worker_id, _) in list(self._locations.items()):
+                if worker_id == worker.worker_id:
+                    del self._locations[key]
+            self.lost += 1
+        try:
+            worker.conn.close()
+        except OSError:
+            pass
+        logging.warning(f"Cluster worker {worker.name} lost ({reason}); re-dispatching {len(tasks)} node(s)")
+        for task in tasks:
+            if task.attempts >= MAX_ATTEMPTS:
+                task.future.set_exception(
+                    WorkerLost(f"Node {task.node.node_id} was lost with {task.attempts} workers ({reason})")
+                )
+                continue
+            with self._lock:
+                self.redispatched += 1
+            self._dispatch(task)
+
+    # ---- Dispatch ----
+    def submit(self, node, inputs, profile=None):
+        """
+        Dispatches a node to a worker and returns a future for its result, or
+        returns None if no connected worker can run it.
+        """
+        with self._lock:
+            if not any(worker.can_run(node) for worker in self.workers.values()):
+                return None
+        inputs = {name: resolve_payloads(value) for name, value in inputs.items()}
+        task = RemoteTask(node, inputs, profile)
+        self._dispatch(task)
+        return task.future
+
+    def _held_bytes(self, worker, inputs):
+        held = 0
+        for value in inputs.values():
+            location = self._locations.get(id(value))
+            if location is not None and location[0] is value and location[1] == worker.worker_id:
+                held += output_size(value)
+        return held
+
+    def _dispatch(self, task):
+        with self._lock:
+            candidates = [worker for worker in self.workers.values() if worker.can_run(task.node)]
+            if not candidates:
+                worker = None
+            else:
+                worker = max(candidates, key=lambda w: (self._held_bytes(w, task.inputs), -w.load()))
+                worker.inflight[task.task_id] = task
+                task.worker = worker
+                task.attempts += 1
+                inputs = self._message_inputs(worker, task.inputs)
+        if worker is None:
+            self._run_locally(task)
+            return
+        task.sent_at = time.perf_counter()
+        try:
+            worker.send(("run", task.task_id, task.node.title, task.node.node_id, task.parameters, inputs))
+        except (OSError, ValueError) as e:
+            self._lose(worker, f"send failed: {e}")
+        except Exception as e:
+            # The inputs could not be pickled; no other worker would do better.
+            with self._lock:
+                worker.inflight.pop(task.task_id, None)
+            task.future.set_exception(RemoteNodeError(f"Cannot send node {task.node.node_id}: {e}"))
+
+    def _message_inputs(self, worker, inputs):
+        # Called with the lock held.
+        message = {}
+        for name, value in inputs.items():
+            location = self._locations.get(id(value))
+            if location is not None and location[0] is value and location[1] == worker.worker_id:
+                self._locations.move_to_end(id(value))
+                message[name] = location[2]
+            else:
+                message[name] = value
+        return message
+
+    def _resend(self, worker, task_id):
+        # The worker no longer holds a referenced output: send the values themselves.
+        with self._lock:
+            task = worker.inflight.get(task_id)
+            if task is None:
+                return
+            for value in task.inputs.values():
+                location = self._locations.get(id(value))
+                if location is not None and location[0] is value and location[1] == worker.worker_id:
+                    del self._locations[id(value)]
+        try:
+            worker.send(("run", task.task_id, task.node.title, task.node.node_id, task.parameters, task.inputs))
+        except (OSError, ValueError) as e:
+            self._lose(worker, f"send failed: {e}")
+
+    def _run_locally(self, task):
+        def relay(local_future):
+            try:
+                task.future.set_result(local_future.result())
+            except BaseException as e:
+                task.future.set_exception(e)
+
+        submit_local(task.node, task.inputs, task.profile).add_done_callback(relay)
+
+    # ---- Results ----
+    def _remember(self, worker, task_id, result):
+        # Called with the lock held. Mirrors what the worker keeps (see ClusterWorker._store).
+        if output_size(result) < REF_MIN_BYTES:
+            return
+        items = result.items() if isinstance(result, dict) else [(None, result)]
+        for key, value in items:
+            if output_size(value) >= REF_MIN_BYTES:
+                self._locations[id(value)] = (value, worker.worker_id, StoredOutput(task_id, key))
+        while len(self._locations) > WORKER_STORE_ITEMS * max(1, len(self.workers)):
+            self._locations.popitem(last=False)
+
+    def _complete(self, worker, task_id, result, timing):
+        with self._lock:
+            task = worker.inflight.pop(task_id, None)
+            if task is None:
+                return
+            worker.completed += 1
+            self._remember(worker, task_id, result)
+        if task.profile is not None:
+            # Worker clocks are not comparable; count everything but the run itself as queueing.
+            _, task.profile.wall_s, task.profile.cpu_s = timing
+            task.profile.queue_s = max(0.0, time.perf_counter() - task.sent_at - task.profile.wall_s)
+        task.future.set_result(result)
+
+    def _fail(self, worker, task_id, error):
+        with self._lock:
+            task = worker.inflight.pop(task_id, None)
+            if task is None:
+                return
+            worker.failed += 1
+        task.future.set_exception(RemoteNodeError(f"{error} (on worker {worker.name})"))
+
+    def status(self):
+        with self._lock:
+            return {
+                "address": self.address if self.active else None,
+                "workers": [worker.as_dict() for worker in self.workers.values()],
+                "lost": self.lost,
+                "redispatched": self.redispatched,
+            }
+
+
+coordinator = Coordinator()
+
+
+# ---------------- Worker ------------------
+class ClusterWorker:
+    """
+    The "measnode worker" process: connects to a coordinator, advertises the node
+    types found in its modules folder and its resources, then runs the nodes it is
+    sent on up to slots threads (through the same executors as the server, so
+    "process" nodes still run isolated). Reconnects when the connection drops.
+    """
+
+    def __init__(self, address, name=None, slots=4, resources=None):
+        self.address = address
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.slots = max(1, slots)
+        self.resources = dict(resources or {})
+        self._pool = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="measnode-worker")
+        self._store = OrderedDict()  # { task_id: large result } for StoredOutput references
+        self._store_lock = threading.Lock()
+        self._conn = None
+        self._send_lock = threading.Lock()
+
+    def run(self, retry_interval=1.0):
+        address, family = parse_address(self.address)
+        key = auth_key(self.address)
+        waiting = False
+        while True:
+            try:
+                conn = Client(address, family, authkey=key)
+            except (OSError, EOFError) as e:
+                if not waiting:
+                    logging.warning(f"Waiting for coordinator at {self.address}: {e}")
+                    waiting = True
+                time.sleep(retry_interval)
+                continue
+            waiting = False
+            logging.info(f"Worker {self.name} connected to {self.address}")
+            self._serve(conn)
+            logging.warning(f"Worker {self.name} lost its connection; reconnecting")
+            with self._store_lock:
+                self._store.clear()
+
+    def _serve(self, conn):
+        node_classes = load_node_modules()
+        self._conn = conn
+        stopped = threading.Event()
+        try:
+            self._send(("hello", {
+                "name": self.name,
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "node_types": {title: node_registry.source_hashes.get(title) for title in node_classes},
+                "resources": self.resources,
+                "slots": self.slots,
+            }))
+            threading.Thread(target=self._heartbeat, args=(conn, stopped), daemon=True).start()
+            while True:
+                kind, *args = conn.recv()
+                if kind == "run":
+                    self._pool.submit(self._run, *args)
+        except (EOFError, OSError):
+            pass
+        finally:
+            stopped.set()
+            conn.close()
+
+    def _send(self, message):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def _heartbeat(self, conn, stopped):
+        while not stopped.wait(HEARTBEAT_INTERVAL):
+            try:
+                with self._send_lock:
+                    conn.send(("heartbeat",))
+            except (OSError, ValueError):
+                return
+
+    def _resolve(self, value):
+        if not isinstance(value, StoredOutput):
+            return value
+        with self._store_lock:
+            if value.task_id not in self._store:
+                raise MissingOutput(value.task_id)
+            self._store.move_to_end(value.task_id)
+            result = self._store[value.task_id]
+        return result if value.key is None else result[value.key]
+
+    def _store_result(self, task_id, result):
+        if output_size(result) < REF_MIN_BYTES:
+            return
+        with self._store_lock:
+            self._store[task_id] = result
+            while len(self._store) > WORKER_STORE_ITEMS:
+                self._store.popitem(last=False)
+
+    def _run(self, task_id, node_type, node_id, parameters, inputs):
+        try:
+            inputs = {name: self._resolve(value) for name, value in inputs.items()}
+            node = load_node_modules()[node_type](node_id=node_id)
+            node.parameters.update(parameters)
+            profile = NodeProfile(node_type)
+            result = resolve_payloads(submit_local(node, inputs, profile).result())
+            self._store_result(task_id, result)
+            reply = ("done", task_id, result, (profile.queue_s, profile.wall_s, profile.cpu_s))
+        except MissingOutput:
+            reply = ("missing", task_id)
+        except Exception as e:
+            logging.error(f"Node {node_id} failed on worker {self.name}: {e}")
+            reply = ("error", task_id, f"{type(e).__name__}: {e}")
+        try:
+            self._send(reply)
+        except OSError:
+            pass  # Connection lost; the coordinator dispatches the node again.
+        except Exception as e:
+            # The result could not be pickled.
+            self._send(("error", task_id, f"Cannot send the result of node {node_id}: {e}"))
+
+
+def start_local_workers(address, count, slots=4, resources=None):
+    """
+    Starts count "measnode worker" processes connected to address and returns their
+    Popen objects; a stand-in cluster on one machine. The workers inherit the
+    environment, so MEASNODE_MODULES, the executor settings and the cluster key
+    (generated by Coordinator.start() if none is set) apply to them too.
+    """
+    processes = []
+    for index in range(count):
+        command = [sys.executable, "-m", "measnode", "worker", "--connect", address, "--slots", str(slots)]
+        command += ["--name", f"{socket.gethostname()}-{index + 1}"]
+        for name, units in (resources or {}).items():
+            command += ["--resource", f"{name}={units}"]
+        processes.append(subprocess.Popen(command))
+    return processes
@@ -0,0 +1,422 @@
+"""
+Run history: every execution's per-node results, timings and parameters, stored per
+project in SQLite (projects/<project>/.history/runs.sqlite) and queried as downsampled series.
+"""
+
+import os
+import json
+import time
+import queue
+import hashlib
+import logging
+import numbers
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from measnode.payloads import PayloadHandle
+from measnode.storage import valid_project_name
+
+
+# ---------------- Run History ------------------
+# Set MEASNODE_HISTORY=0 to stop recording executions.
+HISTORY_ENABLED = os.environ.get("MEASNODE_HISTORY", "1") != "0"
+# Runs are written in one transaction per batch: when this many are queued, or
+# HISTORY_FLUSH_INTERVAL seconds after the first one, whichever comes first.
+HISTORY_BATCH = int(os.environ.get("MEASNODE_HISTORY_BATCH", "200"))
+HISTORY_FLUSH_INTERVAL = float(os.environ.get("MEASNODE_HISTORY_FLUSH_INTERVAL", "1"))
+# Runs waiting to be written; further runs are dropped (and counted) while the queue is full.
+HISTORY_QUEUE_SIZE = int(os.environ.get("MEASNODE_HISTORY_QUEUE", "10000"))
+
+# Columns of node_results that can be queried as a series.
+SERIES_FIELDS = ("value", "wall_ms", "cpu_ms", "queue_ms", "output_bytes")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS graphs (
+    graph_id INTEGER PRIMARY KEY,
+    graph_hash TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    graph_id INTEGER NOT NULL,
+    node_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (graph_id, node_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS parameters_by_value ON parameters (node_id, name, value);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    elapsed REAL,
+    workflow TEXT,
+    graph_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (started);
+CREATE INDEX IF NOT EXISTS runs_by_workflow ON runs (workflow, started);
+CREATE TABLE IF NOT EXISTS node_results (
+    run_id INTEGER NOT NULL,
+    node_id TEXT NOT NULL,
+    output TEXT NOT NULL,
+    started REAL NOT NULL,
+    graph_id INTEGER NOT NULL,
+    node_type TEXT,
+    value REAL,
+    wall_ms REAL,
+    cpu_ms REAL,
+    queue_ms REAL,
+    output_bytes INTEGER,
+    cache TEXT
+);
+CREATE INDEX IF NOT EXISTS node_results_series ON node_results (node_id, output, started);
+CREATE INDEX IF NOT EXISTS node_results_by_run ON node_results (run_id);
+"""
+
+
+def graph_hash(workflow):
+    """
+    Hash of a workflow's graph (nodes, parameters and connections), shared by all
+    runs of the same graph whatever the file it was saved in.
+    """
+    return hashlib.sha256(json.dumps(workflow.get("nodes", []), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def scalar_value(value):
+    """
+    Returns a node result as a float for the value column, or None for results that
+    are not a single number (arrays, strings, integers too large for a float).
+    """
+    if hasattr(value, "ndim") and getattr(value, "ndim", None) == 0:
+        value = value.item()
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return None
+    try:
+        return float(value)
+    except OverflowError:
+        return None
+
+
+class RunRecord:
+    __slots__ = ("project", "workflow", "graph_hash", "parameters", "started", "elapsed", "status", "error", "rows")
+
+    def __init__(self, project, workflow, started, elapsed, status, error, evaluated, profiles):
+        self.project = project
+        self.workflow = workflow.get("workflow")
+        self.graph_hash = graph_hash(workflow)
+        self.parameters = [
+            (str(node["id"]), str(name), json.dumps(value) if not isinstance(value, str) else value)
+            for node in workflow.get("nodes", [])
+            for name, value in node.get("parameters", {}).items()
+        ]
+        self.started = started
+        self.elapsed = elapsed
+        self.status = status
+        self.error = error
+        # One row per node output: (node_id, output, node_type, value, wall, cpu, queue, bytes, cache).
+        self.rows = []
+        for node_id, result in evaluated.items():
+            profile = profiles.get(node_id)
+            timing = (
+                (profile.node_type, profile.wall_s * 1000, profile.cpu_s * 1000, profile.queue_s * 1000,
+                 profile.output_bytes, profile.cache)
+                if profile is not None
+                else (None, None, None, None, None, None)
+            )
+            outputs = result.items() if isinstance(result, dict) else [("", result)]
+            for output, value in outputs:
+                if isinstance(value, PayloadHandle):
+                    value = None
+                node_type, *measures = timing
+                self.rows.append((str(node_id), str(output), node_type, scalar_value(value), *measures))
+
+
+class RunHistory:
+    """
+    Appends executions to one SQLite database per project. record() only queues the
+    run; a writer thread inserts queued runs in batches (one transaction and a few
+    executemany calls per project), so recording never slows down an execution.
+    Results are stored one row per node output with the run's start time next to
+    them and an index on (node, output, time), so a series query reads a single
+    index range and aggregates it inside SQLite without loading the runs.
+    Parameters are stored once per distinct graph and runs refer to the graph.
+    """
+
+    def __init__(self, projects_dir, enabled=HISTORY_ENABLED):
+        self.projects_dir = Path(projects_dir)
+        self.enabled = enabled
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=HISTORY_QUEUE_SIZE)
+        self._writer = None
+        self._lock = threading.Lock()  # Guards the writer's connections.
+        self._connections = {}  # { project: sqlite3.Connection } owned by the writer
+
+    def database_path(self, project):
+        return self.projects_dir / project / ".history" / "runs.sqlite"
+
+    # ---- Recording ----
+    def record(self, project, workflow, evaluated, profiles, started, elapsed, status="ok", error=None):
+        """
+        Queues an execution for the project's history. evaluated and profiles are
+        the dictionaries filled by run_plan; started is a time.time() timestamp.
+        """
+        if not self.enabled or not valid_project_name(project) or not (self.projects_dir / project).is_dir():
+            return
+        try:
+            self._queue.put_nowait(
+                RunRecord(project, workflow, started, elapsed, status, error, evaluated, profiles)
+            )
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="measnode-history", daemon=True)
+                    self._writer.start()
+
+    @contextmanager
+    def recording(self, workflow, evaluated, profiles):
+        """
+        Context manager that records the execution running in its block in the history
+        of workflow's project: with the contents of evaluated and profiles when the block
+        ends, and with status "error" and the message if it raised.
+        """
+        started = time.time()
+        try:
+            yield
+        except Exception as e:
+            self.record(
+                workflow.get("project"), workflow, evaluated, profiles, started, time.time() - started, "error", str(e)
+            )
+            raise
+        self.record(workflow.get("project"), workflow, evaluated, profiles, started, time.time() - started)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + HISTORY_FLUSH_INTERVAL
+            while len(batch) < HISTORY_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        by_project = {}
+        for record in batch:
+            by_project.setdefault(record.project, []).append(record)
+        with self._lock:
+            for project, records in by_project.items():
+                try:
+                    self._write_project(project, records)
+                    self.written += len(records)
+                except Exception as e:
+                    logging.error(f"Error writing run history of project {project}: {e}")
+                    self._close(project)
+
+    def _connection(self, project):
+        conn = self._connections.get(project)
+        if conn is None:
+            path = self.database_path(project)
+            path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._connections[project] = conn
+        return conn
+
+    def _write_project(self, project, records):
+        if not (self.projects_dir / project).is_dir():
+            return  # Deleted while the runs were queued.
+        conn = self._connection(project)
+        with conn:
+            graph_ids = {}
+            for record in records:
+                if record.graph_hash in graph_ids:
+                    continue
+                row = conn.execute("SELECT graph_id FROM graphs WHERE graph_hash = ?", (record.graph_hash,)).fetchone()
+                if row is None:
+                    graph_id = conn.execute("INSERT INTO graphs (graph_hash) VALUES (?)", (record.graph_hash,)).lastrowid
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO parameters VALUES (?, ?, ?, ?)",
+                        [(graph_id, *parameter) for parameter in record.parameters],
+                    )
+                else:
+                    graph_id = row[0]
+                graph_ids[record.graph_hash] = graph_id
+            for record in records:
+                graph_id = graph_ids[record.graph_hash]
+                run_id = conn.execute(
+                    "INSERT INTO runs (started, elapsed, workflow, graph_id, status, error) VALUES (?, ?, ?, ?, ?, ?)",
+                    (record.started, record.elapsed, record.workflow, graph_id, record.status, record.error),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO node_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (run_id, node_id, output, record.started, graph_id, *rest)
+                        for node_id, output, *rest in record.rows
+                    ],
+                )
+
+    def _close(self, project):
+        conn = self._connections.pop(project, None)
+        if conn is not None:
+            conn.close()
+
+    def close(self, project):
+        """
+        Closes the project's database, before its folder is renamed or deleted.
+        """
+        with self._lock:
+            self._close(project)
+
+    def flush(self, timeout=10.0):
+        """
+        Waits until the queued runs are written (for tests and the command line).
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    # ---- Queries ----
+    def _read(self, project):
+        if not valid_project_name(project):
+            return None
+        path = self.database_path(project)
+        if not path.is_file():
+            return None
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _filters(workflow, parameters, table):
+        """
+        Returns (SQL conditions, arguments) restricting table to runs of workflow whose
+        graph has every (node_id, name, value) of parameters.
+        """
+        conditions, arguments = [], []
+        if workflow:
+            conditions.append(f"{table}.run_id IN (SELECT run_id FROM runs WHERE workflow = ?)")
+            arguments.append(workflow)
+        for node_id, name, value in parameters:
+            conditions.append(
+                f"{table}.graph_id IN (SELECT graph_id FROM parameters WHERE node_id = ? AND name = ? AND value = ?)"
+            )
+            arguments += [node_id, name, value]
+        return conditions, arguments
+
+    def series(self, project, nodes, field="value", start=None, end=None, points=500, workflow=None, parameters=()):
+        """
+        Returns { "start", "end", "series": { node_id or node_id.output: { "t", "count",
+        "min", "max", "mean" } } } for the given nodes between start and end
+        (time.time() timestamps, defaulting to the first and last run), aggregated
+        into at most points buckets. parameters is a list of (node_id, name, value)
+        filters; runs of graphs with other parameter values are left out.
+        """
+        if field not in SERIES_FIELDS:
+            raise ValueError(f"Unknown field {field!r}")
+        conn = self._read(project)
+        if conn is None:
+            return {"start": start, "end": end, "series": {}}
+        try:
+            if start is None or end is None:
+                first, last = conn.execute("SELECT MIN(started), MAX(started) FROM runs").fetchone()
+                start = first if start is None else start
+                end = last if end is None else end
+            if start is None or end is None or not nodes:
+                return {"start": start, "end": end, "series": {}}
+            width = max((end - start) / max(1, points), 1e-6)
+            conditions, arguments = self._filters(workflow, parameters, "node_results")
+            conditions += [
+                f"node_results.node_id IN ({', '.join('?' * len(nodes))})",
+                "node_results.started >= ?",
+                "node_results.started <= ?",
+            ]
+            # The last bucket is closed, so runs at exactly end fall into it.
+            arguments = [start, width, max(1, points) - 1, *arguments, *nodes, start, end]
+            sql = (
+                f"SELECT node_id, output, MIN(CAST((started - ?) / ? AS INTEGER), ?) AS bucket, AVG(started) AS t, "
+                f"COUNT({field}) AS count, MIN({field}) AS min, MAX({field}) AS max, AVG({field}) AS mean "
+                f"FROM node_results WHERE {' AND '.join(conditions)} "
+                f"GROUP BY node_id, output, bucket ORDER BY node_id, output, bucket"
+            )
+            series = {}
+            for row in conn.execute(sql, arguments):
+                key = row["node_id"] if not row["output"] else f"{row['node_id']}.{row['output']}"
+                column = series.setdefault(key, {"t": [], "count": [], "min": [], "max": [], "mean": []})
+                for name in column:
+                    column[name].append(row[name])
+            return {"start": start, "end": end, "series": series}
+        finally:
+            conn.close()
+
+    def runs(self, project, workflow=None, parameters=(), before=None, limit=100):
+        """
+        Returns the newest runs (before the run id before, if given), newest first,
+        without their node results.
+        """
+        conn = self._read(project)
+        if conn is None:
+            return []
+        try:
+            conditions, arguments = self._filters(workflow, parameters, "runs")
+            if before is not None:
+                conditions.append("runs.run_id < ?")
+                arguments.append(before)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            rows = conn.execute(
+                f"SELECT runs.*, graphs.graph_hash FROM runs JOIN graphs USING (graph_id) {where} "
+                f"ORDER BY runs.run_id DESC LIMIT ?",
+                [*arguments, limit],
+            )
+            return [{key: row[key] for key in row.keys() if key != "graph_id"} for row in rows]
+        finally:
+            conn.close()
+
+    def run(self, project, run_id):
+        """
+        Returns one run with its node results and parameters, or None.
+        """
+        conn = self._read(project)
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT runs.*, graphs.graph_hash FROM runs JOIN graphs USING (graph_id) WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            run = {key: row[key] for key in row.keys() if key != "graph_id"}
+            run["nodes"] = {}
+            for result in conn.execute(
+                "SELECT node_id, output, node_type, value, wall_ms, cpu_ms, queue_ms, output_bytes, cache "
+                "FROM node_results WHERE run_id = ?",
+                (run_id,),
+            ):
+                key = result["node_id"] if not result["output"] else f"{result['node_id']}.{result['output']}"
+                run["nodes"][key] = {name: result[name] for name in result.keys() if name not in ("node_id", "output")}
+            run["parameters"] = {}
+            for parameter in conn.execute(
+                "SELECT node_id, name, value FROM parameters WHERE graph_id = ?", (row["graph_id"],)
+            ):
+                run["parameters"].setdefault(parameter["node_id"], {})[parameter["name"]] = parameter["value"]
+            return run
+        finally:
+            conn.close()
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+
+run_history = RunHistory(Path("projects"))
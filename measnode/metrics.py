@@ -0,0 +1,206 @@
+"""
+Per-node execution profiles and their aggregation into Prometheus metrics.
+"""
+
+import sys
+import json
+import time
+import threading
+
+import numpy as np
+
+from measnode.payloads import PayloadHandle
+
+
+# ---------------- Node Profiles ------------------
+class NodeProfile:
+    """
+    Timing of a single node execution, filled in by the executor wrappers.
+    queue_s is the time between submission and the start of execute(), cpu_s the
+    CPU time of the thread (or coroutine steps, or worker process) running it.
+    cache is "hit", "miss", "skip" (node not cacheable or no cache in use) or
+    "folded" (value computed when the plan was compiled, see fold_constants).
+    """
+
+    __slots__ = ("node_type", "cache", "submitted", "started", "queue_s", "wall_s", "cpu_s", "output_bytes")
+
+    def __init__(self, node_type, cache="skip"):
+        self.node_type = node_type
+        self.cache = cache
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.queue_s = 0.0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.output_bytes = 0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.queue_s = self.started - self.submitted
+
+    def stop(self):
+        self.wall_s = time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            "type": self.node_type,
+            "wall_ms": round(self.wall_s * 1000, 3),
+            "cpu_ms": round(self.cpu_s * 1000, 3),
+            "queue_ms": round(self.queue_s * 1000, 3),
+            "output_bytes": self.output_bytes,
+            "cache": self.cache,
+        }
+
+    def as_json(self):
+        # Formatted by hand: this runs for every node, and json.dumps is several times slower.
+        type_json = _type_json.get(self.node_type)
+        if type_json is None:
+            type_json = _type_json[self.node_type] = json.dumps(self.node_type)
+        return (
+            f'{{"type": {type_json}, "wall_ms": {self.wall_s * 1000:.3f}, "cpu_ms": {self.cpu_s * 1000:.3f}, '
+            f'"queue_ms": {self.queue_s * 1000:.3f}, "output_bytes": {self.output_bytes}, "cache": "{self.cache}"}}'
+        )
+
+
+_type_json = {}  # { node type: node type as a JSON string }
+
+
+def encode_profiles(profiles):
+    return {node_id: profile.as_dict() for node_id, profile in profiles.items()}
+
+
+def output_size(value):
+    """
+    Returns a cheap estimate of the size of a node result in bytes: the buffer size
+    of arrays and payloads, the shallow size of anything else.
+    """
+    if isinstance(value, dict):
+        return sum(output_size(item) for item in value.values())
+    if isinstance(value, PayloadHandle):
+        count = 1
+        for dim in value.shape:
+            count *= dim
+        return count * np.dtype(value.dtype).itemsize
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+# ---------------- Node Metrics ------------------
+# Upper bounds (in seconds) of the duration histogram buckets.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf.
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+
+
+class NodeTypeMetrics:
+    def __init__(self):
+        self.executions = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cpu_seconds = 0.0
+        self.output_bytes = 0
+        self.wall = Histogram(DURATION_BUCKETS)
+        self.queue = Histogram(DURATION_BUCKETS)
+
+
+class NodeMetrics:
+    """
+    Process-wide aggregation of node profiles per node type, rendered in the
+    Prometheus text exposition format by /api/metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types = {}  # { node type: NodeTypeMetrics }
+
+    def _metrics(self, node_type):
+        metrics = self._types.get(node_type)
+        if metrics is None:
+            metrics = self._types[node_type] = NodeTypeMetrics()
+        return metrics
+
+    def observe(self, profile):
+        with self._lock:
+            metrics = self._metrics(profile.node_type)
+            if profile.cache == "hit":
+                metrics.cache_hits += 1
+                return
+            if profile.cache == "miss":
+                metrics.cache_misses += 1
+            metrics.executions += 1
+            metrics.cpu_seconds += profile.cpu_s
+            metrics.output_bytes += profile.output_bytes
+            metrics.wall.observe(profile.wall_s)
+            metrics.queue.observe(profile.queue_s)
+
+    def observe_error(self, node_type):
+        with self._lock:
+            self._metrics(node_type).errors += 1
+
+    def clear(self):
+        with self._lock:
+            self._types.clear()
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text format.
+        """
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def label(node_type):
+            escaped = node_type.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return f'type="{escaped}"'
+
+        with self._lock:
+            types = sorted(self._types.items())
+            counters = [
+                ("measnode_node_executions_total", "Node executions (cache hits excluded).", "executions"),
+                ("measnode_node_errors_total", "Node executions that raised an exception.", "errors"),
+                ("measnode_node_cache_hits_total", "Node results served from the result cache.", "cache_hits"),
+                ("measnode_node_cache_misses_total", "Cacheable node executions not found in the cache.", "cache_misses"),
+                ("measnode_node_cpu_seconds_total", "CPU time spent in node execution.", "cpu_seconds"),
+                ("measnode_node_output_bytes_total", "Estimated size of node results.", "output_bytes"),
+            ]
+            for name, help_text, attribute in counters:
+                family(name, "counter", help_text)
+                for node_type, metrics in types:
+                    lines.append(f"{name}{{{label(node_type)}}} {getattr(metrics, attribute)}")
+
+            histograms = [
+                ("measnode_node_wall_seconds", "Wall-clock duration of node execution.", "wall"),
+                ("measnode_node_queue_seconds", "Time nodes waited for a free worker.", "queue"),
+            ]
+            for name, help_text, attribute in histograms:
+                family(name, "histogram", help_text)
+                for node_type, metrics in types:
+                    histogram = getattr(metrics, attribute)
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{label(node_type)},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{label(node_type)}}} {histogram.total}")
+                    lines.append(f"{name}_count{{{label(node_type)}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+node_metrics = NodeMetrics()
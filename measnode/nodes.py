@@ -0,0 +1,174 @@
+"""
+Node base class and the registry of node modules.
+"""
+
+import os
+import hashlib
+import importlib.util
+import json
+import time
+import threading
+
+from measnode.resources import resource_scheduler
+
+
+# ---------------- Base Node Class ------------------
+class BaseNode:
+    """
+    Base class for all nodes.
+    Each node module should subclass this and implement execute(**inputs),
+    either as a regular method or as "async def execute" for I/O-bound nodes.
+    Nodes may also implement execute_batch(**inputs) (sync or async) for parameter
+    sweeps: inputs and swept parameters are then NumPy arrays covering many points.
+    Source nodes may implement execute_stream(), returning an iterator of chunks,
+    for the streaming execution mode.
+    """
+
+    title = "Base Node"
+    category = "Uncategorized"  # New attribute for categorization.
+    inputs = []  # Example: [{"name": "input1", "type": "int"}]
+    outputs = []  # Example: [{"name": "output", "type": "int"}]; with several outputs
+    # execute() returns a dict { output_name: value }.
+    parameters_def = []  # Example: [{"name": "value", "type": "int", "default": 42}]
+    # Values are coerced to their "type" before execution; "output": True marks a
+    # parameter that execute() fills in, which is left as it is.
+    cacheable = True  # Set to False for side-effecting nodes that must always execute.
+    # Set to True only for sync nodes whose outputs depend only on the parameters and
+    # inputs (no sleeps, I/O or clock): with MEASNODE_FOLD=1, pure nodes fed only by
+    # constants are evaluated once, one at a time, when the plan is compiled.
+    pure = False
+    # Where execute() runs: "inline" (in the scheduler thread, for trivial sync nodes),
+    # "thread", or "process" (isolated worker pool, for CPU-heavy or crash-prone nodes).
+    # None follows MEASNODE_EXECUTOR.
+    execution = None
+    timeout = None  # Time limit in seconds for "process" nodes; None uses MEASNODE_NODE_TIMEOUT.
+    # Named resources the node needs, e.g. {"scope": 1}. Executions from all workflows
+    # wait for each other only when a resource is at capacity (see ResourceScheduler).
+    # In a cluster it is only dispatched to workers advertising at least these amounts.
+    resources = {}
+    # Capacities of resources this node type provides, e.g. {"scope": 1} for an
+    # instrument that takes one command at a time. MEASNODE_RESOURCES overrides them;
+    # resources declared nowhere have capacity 1.
+    resource_capacities = {}
+
+    def __init__(self, node_id):
+        self.node_id = node_id
+        self.parameters = {}
+        self.input_connections = {}  # To be filled as { input_name: (source_node, output_name) }
+
+
+# ---------------- Node Modules Loader ------------------
+class NodeRegistry:
+    """
+    Process-wide cache of the node classes defined in the 'modules' folder.
+    Each module is imported once and only re-imported when its file mtime changes,
+    so requests no longer pay for executing every module on each call.
+    The /api/nodes payload is precomputed together with an ETag.
+    """
+
+    def __init__(self, modules_dir, check_interval=1.0):
+        self.modules_dir = modules_dir
+        self.check_interval = check_interval  # Minimum seconds between mtime scans.
+        self._lock = threading.Lock()
+        self._modules = {}  # { filename: (mtime, NodeClass or None, source hash) }
+        self._last_check = None
+        self.node_classes = {}
+        self.source_hashes = {}  # { node title: sha256 of the module source }
+        self.definitions_json = "[]"
+        self.etag = ""
+        self.version = 0  # Incremented whenever a module is (re)loaded or removed.
+
+    def _load_module(self, fname):
+        mod_name = fname[:-3]
+        path = os.path.join(self.modules_dir, fname)
+        with open(path, "rb") as f:
+            source_hash = hashlib.sha256(f.read()).hexdigest()
+        spec = importlib.util.spec_from_file_location(mod_name, path)
+        mod = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(mod)
+        except Exception as e:
+            print(f"Error loading module {fname}: {e}")
+            return None, source_hash
+        return getattr(mod, "Node", None), source_hash
+
+    def refresh(self, force=False):
+        """
+        Re-imports modules whose files were added or modified since the last scan
+        and drops modules whose files were removed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            if not os.path.exists(self.modules_dir):
+                print("Modules directory not found:", self.modules_dir)
+                current = {}
+            else:
+                current = {
+                    fname: os.stat(os.path.join(self.modules_dir, fname)).st_mtime_ns
+                    for fname in sorted(os.listdir(self.modules_dir))
+                    if fname.endswith(".py") and fname != "__init__.py"
+                }
+
+            changed = current.keys() != self._modules.keys()
+            for fname, mtime in current.items():
+                cached = self._modules.get(fname)
+                if cached is None or cached[0] != mtime:
+                    self._modules[fname] = (mtime, *self._load_module(fname))
+                    changed = True
+            for fname in set(self._modules) - set(current):
+                del self._modules[fname]
+
+            if changed or not self.etag:
+                self._rebuild()
+
+    def _rebuild(self):
+        node_classes = {}
+        source_hashes = {}
+        for fname in sorted(self._modules):
+            _, cls, source_hash = self._modules[fname]
+            if cls is not None:
+                node_classes[cls.title] = cls
+                source_hashes[cls.title] = source_hash
+        definitions = [
+            {
+                "title": title,
+                "category": getattr(cls, "category", "Uncategorized"),
+                "parameters": getattr(cls, "parameters_def", []),
+                "inputs": getattr(cls, "inputs", []),
+                "outputs": getattr(cls, "outputs", []),
+            }
+            for title, cls in node_classes.items()
+        ]
+        capacities = {}
+        for cls in node_classes.values():
+            for name, capacity in getattr(cls, "resource_capacities", {}).items():
+                capacities[name] = max(capacities.get(name, 0), capacity)
+        resource_scheduler.declare(capacities)
+        self.node_classes = node_classes
+        self.source_hashes = source_hashes
+        self.version += 1
+        self.definitions_json = json.dumps(definitions)
+        self.etag = hashlib.sha1(self.definitions_json.encode()).hexdigest()
+
+
+# Folder with the node modules; defaults to "modules" next to this package.
+NODE_MODULES_DIR = os.environ.get(
+    "MEASNODE_MODULES", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modules")
+)
+
+node_registry = NodeRegistry(NODE_MODULES_DIR)
+
+
+def load_node_modules():
+    """
+    Returns a dictionary mapping each node's title to its class.
+    Each module in the 'modules' folder should define a class named "Node" that is a
+    subclass of BaseNode. Modules are served from the cached node registry and only
+    re-imported when their file changes.
+    """
+    node_registry.refresh()
+    return dict(node_registry.node_classes)
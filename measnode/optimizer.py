@@ -0,0 +1,168 @@
+"""
+Plan-time optimizations applied to a workflow before it reaches the scheduler:
+dead-node pruning, cycle detection, parameter coercion and constant folding.
+"""
+
+import os
+import inspect
+import logging
+
+from measnode.metrics import output_size
+
+
+# ---------------- Plan Optimizer ------------------
+# Set MEASNODE_OPTIMIZE=0 to compile workflows as posted (no pruning, coercion or folding).
+OPTIMIZE_PLANS = os.environ.get("MEASNODE_OPTIMIZE", "1") != "0"
+# Set MEASNODE_FOLD=1 to evaluate pure nodes fed only by constants while compiling. Off by
+# default: folded nodes run one at a time, outside the result cache and without events.
+FOLD_CONSTANTS = os.environ.get("MEASNODE_FOLD", "0") == "1"
+# Folded values larger than this are not kept in the plan (plans stay in memory while cached).
+FOLD_MAX_BYTES = int(os.environ.get("MEASNODE_FOLD_MAX_BYTES", str(1024 * 1024)))
+
+
+def connection_source(source):
+    # Same entry formats as scheduler.parse_connection: "node_id" or {"node", "output"}.
+    return source.get("node") if isinstance(source, dict) else source
+
+
+def live_nodes(node_list, node_classes, target_type="Result Node"):
+    """
+    Returns the entries of node_list that can reach a node of target_type, in their
+    original order. Nodes of unknown type are dropped as well, like build_workflow_nodes does.
+    """
+    known = {node["id"]: node for node in node_list if node.get("type") in node_classes}
+    stack = [node_id for node_id, node in known.items() if node["type"] == target_type]
+    live = set()
+    while stack:
+        node_id = stack.pop()
+        if node_id in live:
+            continue
+        live.add(node_id)
+        for source in known[node_id].get("connections", {}).values():
+            source_id = connection_source(source)
+            if source_id in known and source_id not in live:
+                stack.append(source_id)
+    return [node for node in node_list if node.get("id") in live]
+
+
+def check_cycles(node_list):
+    """
+    Raises ValueError naming the nodes on a cycle if the connections of node_list
+    contain one. Connections to nodes outside node_list are ignored.
+    """
+    sources = {
+        node["id"]: [connection_source(source) for source in node.get("connections", {}).values()]
+        for node in node_list
+    }
+    state = {}  # node_id -> "visiting" | "done"
+    for start in sources:
+        if start in state:
+            continue
+        path = [start]
+        stack = [iter(sources[start])]
+        state[start] = "visiting"
+        while stack:
+            source_id = next(stack[-1], None)
+            if source_id is None:
+                state[path.pop()] = "done"
+                stack.pop()
+            elif source_id not in sources or state.get(source_id) == "done":
+                continue
+            elif state.get(source_id) == "visiting":
+                cycle = path[path.index(source_id):] + [source_id]
+                raise ValueError(f"Workflow contains a cycle: {' <- '.join(map(str, cycle))}")
+            else:
+                state[source_id] = "visiting"
+                path.append(source_id)
+                stack.append(iter(sources[source_id]))
+
+
+def coerce_parameter(definition, value):
+    """
+    Converts a parameter value as entered in the editor (usually a string) to the
+    type declared in parameters_def. Raises ValueError if it does not fit.
+    """
+    kind = definition.get("type")
+    if kind == "int":
+        if isinstance(value, bool):
+            raise ValueError(f"expected an integer, got {value!r}")
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str):
+            try:
+                return int(value.strip())
+            except ValueError:
+                pass
+        # Whole numbers written as floats ("42.0", 1e3) are accepted as well.
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"expected an integer, got {value!r}") from None
+        if not number.is_integer():
+            raise ValueError(f"expected an integer, got {value!r}")
+        return int(number)
+    if kind == "float":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"expected a number, got {value!r}") from None
+    if kind == "dropdown":
+        options = definition.get("options", [])
+        if value not in options:
+            raise ValueError(f"expected one of {', '.join(map(str, options))}, got {value!r}")
+        return value
+    if kind == "text":
+        return str(value)
+    return value
+
+
+def coerce_parameters(node):
+    """
+    Coerces a node's parameters in place against its parameters_def.
+    Parameters declared with "output": True are written by execute() and left as they are.
+    """
+    for definition in node.parameters_def:
+        name = definition.get("name")
+        if definition.get("output") or name not in node.parameters:
+            continue
+        try:
+            node.parameters[name] = coerce_parameter(definition, node.parameters[name])
+        except ValueError as e:
+            raise ValueError(f"Invalid parameter {name!r} of {node.title} {node.node_id}: {e}") from None
+
+
+def fold_constants(plan, evaluate):
+    """
+    Evaluates the pure nodes of a compiled plan whose inputs do not depend on any
+    impure node, and returns { node_id: value } for them. evaluate(node, inputs) runs
+    one node and returns its result, waiting for it ("process" nodes run on the
+    isolated pool, coroutine nodes are never folded). Targets are never folded either, so every run still
+    executes (and reports) its Result Nodes. A node that fails, or whose result is
+    larger than FOLD_MAX_BYTES, is left to run normally, together with its dependents.
+    """
+    constants = {}
+    folded = [False] * len(plan.slots)
+    targets = set(plan.targets)
+    for slot, node in enumerate(plan.slots):
+        node_id = plan.node_ids[slot]
+        if node_id in targets or not getattr(node, "pure", False) or not node.cacheable:
+            continue
+        if inspect.iscoroutinefunction(node.execute):
+            continue
+        if not all(folded[source] for source in plan.sources[slot]):
+            continue
+        # Unconnected inputs default to 0, as in run_plan.
+        inputs = {}
+        for name, source, key in plan.inputs[slot]:
+            value = constants[plan.node_ids[source]] if source >= 0 else 0
+            inputs[name] = value if key is None or source < 0 else value[key]
+        try:
+            value = evaluate(node, inputs)
+        except Exception as e:
+            logging.info(f"Not folding {node.title} {node_id}: {e}")
+            continue
+        if output_size(value) > FOLD_MAX_BYTES:
+            continue
+        constants[node_id] = value
+        folded[slot] = True
+    return constants
@@ -0,0 +1,176 @@
+"""
+Memory-mapped store for large array payloads.
+"""
+
+import os
+import uuid
+import weakref
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+# ---------------- Payload Store ------------------
+# Results at least this large (in bytes) are kept as memory-mapped files and passed by handle.
+PAYLOAD_THRESHOLD = int(os.environ.get("MEASNODE_PAYLOAD_THRESHOLD", str(1 << 20)))
+# Directory shared by the server and process-pool workers for payload files.
+PAYLOAD_DIR = os.environ.get("MEASNODE_PAYLOAD_DIR", os.path.join(tempfile.gettempdir(), "measnode-payloads"))
+# Seconds a payload file is kept after it was written.
+PAYLOAD_TTL = float(os.environ.get("MEASNODE_PAYLOAD_TTL", "3600"))
+
+
+class PayloadHandle:
+    """
+    Reference to a large NumPy result stored in the payload store.
+    Handles are tiny to pickle and to JSON-encode, so large buffers cross process
+    boundaries and reach the browser by reference instead of by value.
+    """
+
+    __slots__ = ("payload_id", "dtype", "shape")
+
+    def __init__(self, payload_id, dtype, shape):
+        self.payload_id = payload_id
+        self.dtype = dtype
+        self.shape = tuple(shape)
+
+    def __getstate__(self):
+        return (self.payload_id, self.dtype, self.shape)
+
+    def __setstate__(self, state):
+        self.payload_id, self.dtype, self.shape = state
+
+    def describe(self):
+        return {"$payload": self.payload_id, "dtype": self.dtype, "shape": list(self.shape)}
+
+
+class PayloadStore:
+    """
+    Stores large NumPy arrays as .npy files that are memory-mapped on load, so
+    readers in any process share the pages instead of copying the data.
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self._last_cleanup = 0.0
+        self._mapped = {}  # { id(array): (weakref to a loaded array, handle) }
+
+    def _path(self, payload_id):
+        if not payload_id.isalnum():
+            raise KeyError(payload_id)
+        return self.directory / f"{payload_id}.npy"
+
+    def put(self, array):
+        """
+        Writes an array to the store and returns its PayloadHandle.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._cleanup()
+        payload_id = uuid.uuid4().hex
+        tmp_path = self.directory / f"{payload_id}.tmp.npy"
+        mapped = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=array.dtype, shape=array.shape)
+        mapped[...] = array
+        mapped.flush()
+        del mapped
+        os.replace(tmp_path, self._path(payload_id))
+        return PayloadHandle(payload_id, array.dtype.str, array.shape)
+
+    def load(self, handle):
+        """
+        Returns a read-only memory-mapped array for a handle (or payload id).
+        Raises KeyError if the payload does not exist or has expired.
+        """
+        payload_id = handle.payload_id if isinstance(handle, PayloadHandle) else handle
+        try:
+            array = np.load(self._path(payload_id), mmap_mode="r")
+        except FileNotFoundError:
+            raise KeyError(payload_id) from None
+        key = id(array)
+        self._mapped[key] = (
+            weakref.ref(array, lambda _: self._mapped.pop(key, None)),
+            PayloadHandle(payload_id, array.dtype.str, array.shape),
+        )
+        return array
+
+    def handle_for(self, array):
+        """
+        Returns the handle of an array previously returned by load(), or None.
+        Lets a node pass a loaded payload through without storing a copy.
+        """
+        entry = self._mapped.get(id(array))
+        if entry is not None and entry[0]() is array:
+            return entry[1]
+        return None
+
+    def _cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+        for path in self.directory.glob("*.npy"):
+            try:
+                if now - path.stat().st_mtime > self.ttl:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+payload_store = PayloadStore(PAYLOAD_DIR, PAYLOAD_TTL)
+
+
+def is_large_array(value):
+    return isinstance(value, np.ndarray) and value.dtype != object and value.nbytes >= PAYLOAD_THRESHOLD
+
+
+def store_large_payloads(value):
+    """
+    Replaces large arrays in a node result (or a multi-output dict) with handles.
+    Used by process-pool workers so results return by reference, not by pickle.
+    """
+    if isinstance(value, dict):
+        return {name: store_large_payloads(item) for name, item in value.items()}
+    if is_large_array(value):
+        return payload_store.handle_for(value) or payload_store.put(value)
+    return value
+
+
+def resolve_payloads(value):
+    """
+    Replaces payload handles in a value (or a multi-output dict) with memory-mapped arrays.
+    """
+    if isinstance(value, PayloadHandle):
+        return payload_store.load(value)
+    if isinstance(value, dict) and any(isinstance(item, PayloadHandle) for item in value.values()):
+        return {name: resolve_payloads(item) for name, item in value.items()}
+    return value
+
+
+def encode_result(value, stored=None):
+    """
+    Converts a node result into something json.dumps can encode. Large arrays are
+    moved to the payload store and encoded as handles for /api/payloads; small arrays
+    and NumPy scalars become plain lists and numbers. "stored" maps id(array) to the
+    handle of arrays already stored, so an array shared by several nodes is written once.
+    """
+    if stored is None:
+        stored = {}
+    if isinstance(value, dict):
+        return {name: encode_result(item, stored) for name, item in value.items()}
+    if isinstance(value, PayloadHandle):
+        return value.describe()
+    if isinstance(value, np.ndarray):
+        if is_large_array(value):
+            if id(value) not in stored:
+                stored[id(value)] = store_large_payloads(value)
+            return stored[id(value)].describe()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def encode_results(results):
+    stored = {}
+    return {node_id: encode_result(value, stored) for node_id, value in results.items()}
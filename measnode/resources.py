@@ -0,0 +1,327 @@
+"""
+Resource-aware admission of node executions across all concurrently running
+workflows: named resources with capacities, priority classes and fair share per project.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+
+
+def parse_capacities(text):
+    """
+    Parses "name=count,name=count" into { name: count }; a name without a count has capacity 1.
+    """
+    capacities = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        name, _, count = item.partition("=")
+        try:
+            capacities[name.strip()] = int(count) if count else 1
+        except ValueError:
+            raise ValueError(f"Invalid resource capacity {item!r}, expected name=count") from None
+    return capacities
+
+
+# ---------------- Resource Scheduler ------------------
+# Capacities of named resources, e.g. "scope=1,dmm=2". They take precedence over the
+# capacities declared by node classes; resources declared nowhere have capacity 1.
+RESOURCE_CAPACITIES = parse_capacities(os.environ.get("MEASNODE_RESOURCES", ""))
+# Priority classes, most urgent first. Waiting nodes of a higher class always start first.
+PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+
+def check_priority(priority):
+    """
+    Returns the priority class of a workflow payload's "priority" (DEFAULT_PRIORITY
+    when missing); raises ValueError for an unknown class.
+    """
+    if priority is None:
+        return DEFAULT_PRIORITY
+    if priority not in PRIORITIES:
+        raise ValueError(f"Invalid priority {priority!r}, expected one of {', '.join(PRIORITIES)}")
+    return priority
+
+
+class ResourceRequest:
+    """
+    A node execution waiting for (or holding) its resources. dispatch() starts it
+    and returns the future of the execution; future is the one handed to the caller
+    while it waits (None if the resources were free right away).
+    """
+
+    __slots__ = ("needs", "dispatch", "priority", "project", "seq", "queued_at", "future")
+
+    def __init__(self, needs, dispatch, priority, project, seq):
+        self.needs = needs
+        self.dispatch = dispatch
+        self.priority = priority
+        self.project = project
+        self.seq = seq
+        self.queued_at = time.perf_counter()
+        self.future = None
+
+
+class ResourceStats:
+    """
+    Counters of one resource: executions that acquired it and the time they waited for it.
+    """
+
+    __slots__ = ("acquired", "wait_s", "max_wait_s")
+
+    def __init__(self):
+        self.acquired = 0
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def observe(self, wait):
+        self.acquired += 1
+        self.wait_s += wait
+        self.max_wait_s = max(self.max_wait_s, wait)
+
+
+class ResourceScheduler:
+    """
+    Global scheduler for node executions that need named resources (see
+    BaseNode.resources), shared by all workflows running in the process. Nodes are
+    interleaved freely and only wait when a resource they need is at capacity.
+
+    Waiting nodes are queued per (priority class, project, set of resources), each
+    queue in submission order. Whenever resources are released, the queue heads are
+    considered by priority class, then by the number of executions their project is
+    holding, then by when their project last started one (so that projects take turns
+    on a busy resource), then by age.
+    A head that does not fit reserves the resources it is short of, so lower-ranked
+    nodes cannot starve it by taking every unit that frees up.
+    """
+
+    def __init__(self, capacities=None):
+        self.configured = dict(capacities or {})
+        self.declared = {}  # { resource: capacity declared by node classes }
+        self.in_use = {}  # { resource: units held }
+        self.held = {}  # { project: executions holding resources }
+        self.last_start = {}  # { project: value of _starts when it last started an execution }
+        self.queues = {}  # { (priority rank, project, needs key): deque of ResourceRequest }
+        self.stats_by_resource = {}  # { resource: ResourceStats }
+        self.waiting = 0
+        self._seq = 0
+        self._starts = 0
+        self._lock = threading.Lock()
+
+    def declare(self, capacities):
+        """
+        Replaces the resource capacities declared by the node classes (the largest
+        resource_capacities entry of each resource), when the node modules change.
+        """
+        with self._lock:
+            self.declared = dict(capacities)
+            started = self._take()
+        self._start(started)
+
+    def set_capacity(self, name, capacity):
+        """
+        Sets (or with None, resets) the configured capacity of a resource.
+        """
+        with self._lock:
+            if capacity is None:
+                self.configured.pop(name, None)
+            else:
+                self.configured[name] = capacity
+            started = self._take()
+        self._start(started)
+
+    def capacity(self, name):
+        capacity = self.configured.get(name)
+        if capacity is None:
+            capacity = self.declared.get(name, 1)
+        return capacity
+
+    def submit(self, needs, dispatch, priority=None, project=None):
+        """
+        Runs dispatch() once the resources in needs ({ name: units }) are available and
+        returns a future for its result. Cancelling the future while it waits withdraws it.
+        """
+        rank = PRIORITIES.index(check_priority(priority))
+        with self._lock:
+            for name, units in needs.items():
+                if units > self.capacity(name):
+                    raise ValueError(f"Node needs {units} units of {name!r}, which has capacity {self.capacity(name)}")
+            self._seq += 1
+            request = ResourceRequest(needs, dispatch, rank, project, self._seq)
+            if not self.queues and self._fits(needs):
+                # Nothing is waiting: start right away and hand out the execution's own future.
+                self._acquire(request)
+            else:
+                request.future = Future()
+                key = (rank, project, tuple(sorted(needs.items())))
+                self.queues.setdefault(key, deque()).append(request)
+                self.waiting += 1
+                # A request that does not fit now cannot make any other one start.
+                started = self._take() if self._fits(needs) else []
+        if request.future is None:
+            try:
+                execution = dispatch()
+            except BaseException:
+                self._release(request)
+                raise
+            execution.add_done_callback(lambda execution: self._release(request))
+            return execution
+        self._start(started)
+        return request.future
+
+    @contextmanager
+    def hold(self, needs, priority=None, project=None):
+        """
+        Context manager that waits in the queue like submit() and holds the resources
+        in needs for the duration of its block, for work that runs in the calling thread.
+        """
+        if not needs:
+            yield
+            return
+        acquired = threading.Event()
+        released = Future()
+        released.set_running_or_notify_cancel()
+
+        def dispatch():
+            acquired.set()
+            return released
+
+        self.submit(needs, dispatch, priority, project)
+        acquired.wait()
+        try:
+            yield
+        finally:
+            released.set_result(None)
+
+    def _fits(self, needs):
+        return all(self.in_use.get(name, 0) + units <= self.capacity(name) for name, units in needs.items())
+
+    def _order(self, key):
+        rank, project, _ = key
+        return rank, self.held.get(project, 0), self.last_start.get(project, 0), self.queues[key][0].seq
+
+    def _take(self):
+        """
+        Removes the requests that can start now from the queues and acquires their
+        resources; returns them in start order. Called with the lock held.
+        """
+        started = []
+        if len(self.queues) == 1:
+            # A single queue (the common case) is simply drained in order.
+            key, queue = next(iter(self.queues.items()))
+            while queue and (self._fits(queue[0].needs) or queue[0].future.cancelled()):
+                request = queue.popleft()
+                self.waiting -= 1
+                if request.future.set_running_or_notify_cancel():
+                    self._acquire(request)
+                    started.append(request)
+            if not queue:
+                del self.queues[key]
+            return started
+        while self.queues:
+            blocked = set()
+            chosen = None
+            for key in sorted(self.queues, key=self._order):
+                request = self.queues[key][0]
+                if blocked.intersection(request.needs):
+                    continue
+                if self._fits(request.needs) or request.future.cancelled():
+                    chosen = key
+                    break
+                blocked.update(
+                    name for name, units in request.needs.items() if self.in_use.get(name, 0) + units > self.capacity(name)
+                )
+            if chosen is None:
+                break
+            queue = self.queues[chosen]
+            request = queue.popleft()
+            if not queue:
+                del self.queues[chosen]
+            self.waiting -= 1
+            if not request.future.set_running_or_notify_cancel():
+                continue  # Cancelled while waiting.
+            self._acquire(request)
+            started.append(request)
+        return started
+
+    def _acquire(self, request):
+        wait = time.perf_counter() - request.queued_at
+        for name, units in request.needs.items():
+            self.in_use[name] = self.in_use.get(name, 0) + units
+            stats = self.stats_by_resource.get(name)
+            if stats is None:
+                stats = self.stats_by_resource[name] = ResourceStats()
+            stats.observe(wait)
+        self.held[request.project] = self.held.get(request.project, 0) + 1
+        self._starts += 1
+        self.last_start[request.project] = self._starts
+
+    def _start(self, requests):
+        # Called without the lock: dispatch() may run a node inline and release right away.
+        for request in requests:
+            try:
+                execution = request.dispatch()
+            except BaseException as e:
+                self._release(request)
+                request.future.set_exception(e)
+                continue
+            execution.add_done_callback(lambda execution, request=request: self._finish(request, execution))
+
+    def _finish(self, request, execution):
+        self._release(request)
+        try:
+            request.future.set_result(execution.result())
+        except BaseException as e:
+            request.future.set_exception(e)
+
+    def _release(self, request):
+        with self._lock:
+            for name, units in request.needs.items():
+                self.in_use[name] -= units
+            self.held[request.project] -= 1
+            if not self.held[request.project]:
+                del self.held[request.project]
+            started = self._take()
+        self._start(started)
+
+    def stats(self):
+        """
+        Returns { resource: {capacity, in_use, waiting, acquired, wait_s, max_wait_s} },
+        the number of waiting executions per priority class and per project, and the
+        number of running ones per project ("" for runs without a project).
+        """
+        with self._lock:
+            waiting = {}
+            by_priority = dict.fromkeys(PRIORITIES, 0)
+            by_project = {}
+            for (rank, project, _), queue in self.queues.items():
+                by_priority[PRIORITIES[rank]] += len(queue)
+                by_project[project or ""] = by_project.get(project or "", 0) + len(queue)
+                for request in queue:
+                    for name in request.needs:
+                        waiting[name] = waiting.get(name, 0) + 1
+            names = set(self.configured) | set(self.declared) | set(self.in_use) | set(self.stats_by_resource)
+            resources = {}
+            for name in sorted(names):
+                stats = self.stats_by_resource.get(name) or ResourceStats()
+                resources[name] = {
+                    "capacity": self.capacity(name),
+                    "in_use": self.in_use.get(name, 0),
+                    "waiting": waiting.get(name, 0),
+                    "acquired": stats.acquired,
+                    "wait_s": round(stats.wait_s, 6),
+                    "max_wait_s": round(stats.max_wait_s, 6),
+                }
+            return {
+                "resources": resources,
+                "waiting": {"priority": by_priority, "project": by_project},
+                "running": {project or "": count for project, count in self.held.items()},
+            }
+
+
+resource_scheduler = ResourceScheduler(RESOURCE_CAPACITIES)
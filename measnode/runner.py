@@ -0,0 +1,119 @@
+"""
+In-process workflow runner used by the command line interface and by batch jobs.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from measnode.payloads import encode_results
+from measnode.cache import project_cache_dir, result_cache
+from measnode.metrics import encode_profiles
+from measnode.scheduler import get_workflow_plan, run_plan
+from measnode.storage import read_workflow
+from measnode.history import run_history
+
+
+def workflow_from_document(document, project=None):
+    """
+    Converts a saved workflow document (nodes plus "wires", as stored under
+    projects/<project>/) into the execution payload accepted by /api/execute.
+    Nodes that already carry "connections" are passed through unchanged.
+    """
+    connections = {}
+    for wire in document.get("wires", []):
+        connections.setdefault(wire["toNode"], {})[wire["toAnchor"]] = {
+            "node": wire["fromNode"],
+            "output": wire["fromAnchor"],
+        }
+    nodes = [
+        {
+            "id": node["id"],
+            "type": node["type"],
+            "parameters": node.get("parameters", {}),
+            "connections": node.get("connections") or connections.get(node["id"], {}),
+        }
+        for node in document.get("nodes", [])
+    ]
+    return {"project": project, "nodes": nodes}
+
+
+def run_workflow(workflow, on_event=None):
+    """
+    Executes a workflow payload in-process and returns {"order": [...], "results": {...},
+    "profile": {...}} with the same JSON-ready content as the END event of /api/execute.
+    on_event, if given, is called with (event, node_id, profile) for each PROCESSING/DONE
+    event; profile is None for PROCESSING.
+    Runs with a "project" are recorded in that project's run history.
+    """
+    evaluated = {}
+    processing_order = []
+    profiles = {}
+    with run_history.recording(workflow, evaluated, profiles):
+        plan = get_workflow_plan(workflow)
+        cache_dir = project_cache_dir(workflow.get("project"))
+        for message in run_plan(
+            plan,
+            evaluated,
+            processing_order,
+            result_cache,
+            cache_dir,
+            profiles,
+            workflow.get("priority"),
+            workflow.get("project"),
+        ):
+            if on_event is not None:
+                event, _, rest = message[len("data: ") :].strip().partition(" ")
+                node_id, _, profile = rest.partition(" ")
+                on_event(event, node_id, json.loads(profile) if profile else None)
+    return {"order": processing_order, "results": encode_results(evaluated), "profile": encode_profiles(profiles)}
+
+
+def run_workflow_file(path, on_event=None):
+    """
+    Loads and executes a saved workflow file. The name of the folder containing the
+    file is used as the project (for the project's on-disk result cache).
+    Returns a JSON-ready record with the outcome and the elapsed time.
+    """
+    path = Path(path)
+    start = time.perf_counter()
+    try:
+        document = read_workflow(path)
+        workflow = workflow_from_document(document, project=path.parent.name)
+        workflow["workflow"] = path.name
+        outcome = run_workflow(workflow, on_event)
+    except Exception as e:
+        return {
+            "workflow": str(path),
+            "status": "error",
+            "error": str(e),
+            "elapsed": round(time.perf_counter() - start, 6),
+        }
+    return {
+        "workflow": str(path),
+        "status": "ok",
+        "elapsed": round(time.perf_counter() - start, 6),
+        **outcome,
+    }
+
+
+def run_workflow_files(paths, jobs=4, on_event=None):
+    """
+    Executes several workflow files concurrently (up to jobs at a time) and yields
+    their records in completion order. Node executions of all workflows share the
+    scheduler's pool; jobs only bounds how many workflows are in flight.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [
+            pool.submit(run_workflow_file, path, _bind_event(on_event, path))
+            for path in paths
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _bind_event(on_event, path):
+    if on_event is None:
+        return None
+    return lambda event, node_id, profile: on_event(str(path), event, node_id, profile)
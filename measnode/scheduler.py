@@ -0,0 +1,819 @@
+"""
+Execution plans and the scheduler that runs them on the shared pools.
+"""
+
+import os
+import asyncio
+import inspect
+import copy
+import hashlib
+import contextvars
+import json
+import time
+import queue
+import types
+import functools
+import threading
+import multiprocessing
+from collections import deque, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are then not enforced.
+    resource = None
+
+from measnode.nodes import load_node_modules, node_registry
+from measnode.payloads import resolve_payloads, store_large_payloads
+from measnode.cache import node_cache_key, value_digest
+from measnode.metrics import NodeProfile, node_metrics, output_size
+from measnode.optimizer import (
+    FOLD_CONSTANTS,
+    OPTIMIZE_PLANS,
+    check_cycles,
+    coerce_parameters,
+    fold_constants,
+    live_nodes,
+)
+from measnode.resources import RESOURCE_CAPACITIES, resource_scheduler
+
+
+# ---------------- Execution Scheduler ------------------
+# Pool used to run node.execute() calls: "thread" (default), "process" or "async".
+# Coroutine nodes (async def execute) always run on the shared event loop; with
+# "async" sync nodes are offloaded from that loop to its thread pool as well.
+EXECUTOR_KIND = os.environ.get("MEASNODE_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(os.environ.get("MEASNODE_WORKERS", "8"))
+
+# Id of the node whose execute() is running in the current thread or task.
+current_node_id = contextvars.ContextVar("current_node_id", default=None)
+
+_executor = None
+_thread_executor = None
+_executor_lock = threading.Lock()
+
+# Node classes loaded inside a process-pool worker (populated on first use).
+_worker_node_classes = None
+
+
+class AsyncRunner:
+    """
+    Runs an asyncio event loop in a daemon thread.
+    Coroutine nodes are scheduled on it, so hundreds of concurrent waits across all
+    workflows share a single thread instead of each holding a pool worker.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(
+                    ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="measnode-offload")
+                )
+                threading.Thread(target=loop.run_forever, name="measnode-async", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro):
+        """
+        Schedules a coroutine on the loop and returns a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop())
+
+
+async_runner = AsyncRunner(EXECUTOR_WORKERS)
+
+
+def get_executor():
+    """
+    Returns the process-wide executor used by the scheduler for sync nodes,
+    creating it on first use. Returns None in "async" mode.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if EXECUTOR_KIND == "async":
+                return None
+            if EXECUTOR_KIND == "process":
+                _executor = ProcessPoolExecutor(max_workers=EXECUTOR_WORKERS)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="measnode")
+        return _executor
+
+
+def get_thread_executor():
+    """
+    Returns a thread pool for "thread" class nodes when the shared executor is a
+    process pool, creating it on first use.
+    """
+    global _thread_executor
+    with _executor_lock:
+        if _thread_executor is None:
+            _thread_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="measnode")
+        return _thread_executor
+
+
+def _execute_in_worker(node_type, node_id, parameters, inputs, submitted_at=None):
+    """
+    Runs a single node inside a process-pool worker.
+    Node classes come from dynamically loaded modules and cannot be pickled,
+    so the worker rebuilds the node from its type and parameters.
+    With submitted_at (a time.time() timestamp) the worker profiles the execution
+    and returns (result, (queue seconds, wall seconds, CPU seconds)).
+    """
+    started_at = time.time()
+    started, cpu = time.perf_counter(), time.process_time()
+    global _worker_node_classes
+    if _worker_node_classes is None:
+        _worker_node_classes = load_node_modules()
+    node = _worker_node_classes[node_type](node_id=node_id)
+    node.parameters.update(parameters)
+    inputs = {name: resolve_payloads(value) for name, value in inputs.items()}
+    if inspect.iscoroutinefunction(node.execute):
+        result = asyncio.run(node.execute(**inputs))
+    else:
+        result = node.execute(**inputs)
+    result = store_large_payloads(result)
+    if submitted_at is None:
+        return result
+    timing = (max(0.0, started_at - submitted_at), time.perf_counter() - started, time.process_time() - cpu)
+    return result, timing
+
+
+def _call_in_node_context(node_id, func, inputs, profile=None):
+    """
+    Calls func(**inputs) with current_node_id set, so log records carry the node id,
+    and records its timing in profile if given.
+    """
+    token = current_node_id.set(node_id)
+    if profile is not None:
+        profile.start()
+        cpu = time.thread_time()
+    try:
+        return func(**inputs)
+    finally:
+        if profile is not None:
+            profile.cpu_s = time.thread_time() - cpu
+            profile.stop()
+        current_node_id.reset(token)
+
+
+@types.coroutine
+def _cpu_timed(coro, profile):
+    """
+    Drives coro step by step and adds the CPU time of each step to profile.cpu_s,
+    so time spent in other tasks on the shared event loop is not counted.
+    """
+    send, error = None, None
+    while True:
+        cpu = time.thread_time()
+        try:
+            yielded = coro.send(send) if error is None else coro.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            profile.cpu_s += time.thread_time() - cpu
+        try:
+            send, error = (yield yielded), None
+        except BaseException as e:
+            send, error = None, e
+
+
+async def _await_in_node_context(node_id, coro, profile=None):
+    # Each task runs in its own context copy, so the value does not leak.
+    current_node_id.set(node_id)
+    if profile is None:
+        return await coro
+    profile.start()
+    try:
+        return await _cpu_timed(coro, profile)
+    finally:
+        profile.stop()
+
+
+def _submit_to_process(submit, node, inputs, profile):
+    """
+    Submits a node to a process pool through submit(*args), which runs
+    _execute_in_worker(*args) in a worker. With a profile, the worker reports its
+    timing alongside the result; the returned future resolves to the result only.
+    """
+    args = (node.title, node.node_id, dict(node.parameters), inputs)
+    if profile is None:
+        return submit(*args)
+
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def relay(worker_future):
+        try:
+            result, (profile.queue_s, profile.wall_s, profile.cpu_s) = worker_future.result()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    # Measured from the profile's creation, so a wait for resources counts as queue time.
+    submit(*args, time.time() - (time.perf_counter() - profile.submitted)).add_done_callback(relay)
+    return future
+
+
+def _run_inline(node, inputs, profile):
+    """
+    Runs a sync node in the calling (scheduler) thread and returns a completed future.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+    try:
+        future.set_result(_call_in_node_context(node.node_id, node.execute, inputs, profile))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+# Executor for remote workers (see measnode.cluster.Coordinator), None when running standalone.
+_remote_executor = None
+
+
+def set_remote_executor(executor):
+    """
+    Registers an object whose submit(node, inputs, profile) dispatches a node to a
+    remote worker and returns a future, or returns None to run the node locally.
+    """
+    global _remote_executor
+    _remote_executor = executor
+
+
+def node_resources(node):
+    """
+    Returns the resources a node execution holds while it runs: the node's declared
+    resources plus a slot of the local pool it will occupy ("executor" for sync nodes
+    on the shared executor, "isolated" for process nodes), so that the resource
+    scheduler rather than the pool's FIFO queue decides which workflow goes next.
+    Pool slots are left to the workers when a remote executor is registered.
+    """
+    needs = dict(getattr(node, "resources", None) or {})
+    execution = getattr(node, "execution", None)
+    if _remote_executor is not None or execution == "inline" or inspect.iscoroutinefunction(node.execute):
+        return needs
+    if execution == "process":
+        needs["isolated"] = needs.get("isolated", 0) + 1
+    else:
+        needs["executor"] = needs.get("executor", 0) + 1
+    return needs
+
+
+def submit_node(node, inputs, profile=None, priority=None, project=None):
+    """
+    Submits node.execute(**inputs) for execution and returns the future. Nodes that
+    need resources (see node_resources) wait in the global resource scheduler until
+    they are available, ordered by priority class and fair share of the project.
+    When a remote executor is registered, every node that is not "inline" is offered
+    to it first; nodes it declines run locally (see submit_local).
+    """
+    needs = node_resources(node)
+    if needs:
+        return resource_scheduler.submit(needs, lambda: dispatch_node(node, inputs, profile), priority, project)
+    return dispatch_node(node, inputs, profile)
+
+
+def dispatch_node(node, inputs, profile=None):
+    if _remote_executor is not None and getattr(node, "execution", None) != "inline":
+        future = _remote_executor.submit(node, inputs, profile)
+        if future is not None:
+            return future
+    return submit_local(node, inputs, profile)
+
+
+def submit_local(node, inputs, profile=None):
+    """
+    Submits node.execute(**inputs) to the shared executor and returns the future.
+    Coroutine nodes run on the shared event loop (or inside the process worker in
+    "process" mode); in "async" mode sync nodes are offloaded to the loop's threads.
+    A node's "execution" class overrides the executor: "process" nodes run on the
+    isolated worker pool, "thread" nodes on threads and sync "inline" nodes directly
+    in the calling thread.
+    If a NodeProfile is given, the execution's queue wait, wall and CPU time are recorded in it.
+    """
+    execution = getattr(node, "execution", None)
+    if execution == "process":
+        submit = functools.partial(isolated_pool.submit, _execute_in_worker, timeout=node_timeout(node))
+        return _submit_to_process(submit, node, inputs, profile)
+    executor = get_executor()
+    if isinstance(executor, ProcessPoolExecutor):
+        if execution is None:
+            return _submit_to_process(functools.partial(executor.submit, _execute_in_worker), node, inputs, profile)
+        executor = get_thread_executor()
+    inputs = {name: resolve_payloads(value) for name, value in inputs.items()}
+    if execution == "inline" and not inspect.iscoroutinefunction(node.execute):
+        return _run_inline(node, inputs, profile)
+    if inspect.iscoroutinefunction(node.execute):
+        return async_runner.submit(_await_in_node_context(node.node_id, node.execute(**inputs), profile))
+    if executor is None:
+        return async_runner.submit(
+            asyncio.to_thread(_call_in_node_context, node.node_id, node.execute, inputs, profile)
+        )
+    return executor.submit(_call_in_node_context, node.node_id, node.execute, inputs, profile)
+
+
+def node_sources(node):
+    """
+    Returns the ids of the nodes feeding the declared inputs of a node.
+    """
+    sources = []
+    for inp in node.inputs:
+        connection = node.input_connections.get(inp["name"])
+        if connection and connection[0].node_id not in sources:
+            sources.append(connection[0].node_id)
+    return sources
+
+
+def parse_connection(source):
+    """
+    Returns (source node id, output name or None) for a workflow connection entry.
+    Entries are either a source node id or { "node": source node id, "output": name }.
+    """
+    if isinstance(source, dict):
+        return source.get("node"), source.get("output")
+    return source, None
+
+
+def output_key(source_node, output):
+    """
+    Returns the key selecting a wire's value from the source node's result,
+    or None when the source has a single output and its result is the value itself.
+    """
+    if len(source_node.outputs) > 1:
+        return output
+    return None
+
+
+def pick_output(result, key):
+    """
+    Selects one output from a node result without copying it.
+    """
+    return result if key is None else result[key]
+
+
+def connect_node(node, connections, nodes):
+    """
+    Sets up a node's input connections from a { input_name: connection entry } mapping
+    (see parse_connection). Connections without an output name use the source's first output.
+    """
+    node.input_connections = {}
+    for input_name, source in connections.items():
+        source_node_id, output = parse_connection(source)
+        if source_node_id in nodes:
+            source_node = nodes[source_node_id]
+            if output is None:
+                output = source_node.outputs[0]["name"] if source_node.outputs else "output"
+            node.input_connections[input_name] = (source_node, output)
+
+
+def build_workflow_nodes(node_list, node_classes):
+    """
+    Instantiates the nodes of a workflow payload and sets up their connections.
+    Nodes with an unknown type are skipped. Returns { node_id: node }.
+    """
+    nodes = {}
+    for node_data in node_list:
+        NodeClass = node_classes.get(node_data.get("type"))
+        if NodeClass:
+            node_instance = NodeClass(node_id=node_data["id"])
+            node_instance.parameters.update(node_data.get("parameters", {}))
+            nodes[node_instance.node_id] = node_instance
+
+    for node_data in node_list:
+        node_instance = nodes.get(node_data.get("id"))
+        if node_instance:
+            connect_node(node_instance, node_data.get("connections", {}), nodes)
+    return nodes
+
+
+def topological_order(nodes, targets):
+    """
+    Returns the ids of the target nodes and all of their ancestors in dependency order.
+    Raises ValueError if the graph contains a cycle.
+    """
+    order = []
+    state = {}  # node_id -> "visiting" | "done"
+    for target in targets:
+        stack = [(target, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            if expanded:
+                state[node_id] = "done"
+                order.append(node_id)
+                continue
+            if state.get(node_id) == "done":
+                continue
+            if state.get(node_id) == "visiting":
+                raise ValueError(f"Workflow contains a cycle through node {node_id}")
+            state[node_id] = "visiting"
+            stack.append((node_id, True))
+            for source_id in reversed(node_sources(nodes[node_id])):
+                if state.get(source_id) == "visiting":
+                    raise ValueError(f"Workflow contains a cycle through node {source_id}")
+                if state.get(source_id) != "done":
+                    stack.append((source_id, False))
+    return order
+
+
+class ExecutionPlan:
+    """
+    Flat, index-based form of a workflow, compiled once and reused across runs.
+    Slots hold the target nodes and their ancestors in topological order; for slot i:
+      - node_ids[i], slots[i]: the node id and its instance
+      - inputs[i]: tuple of (input name, source slot or -1 when unconnected, output key)
+        where the output key selects a value from a multi-output source (see output_key)
+      - sources[i]: distinct source slots
+      - dependents[i]: slots consuming the output of slot i
+    constants holds { node_id: value } for nodes folded at compile time (see
+    fold_constants); run_plan reports them as done without executing them.
+    Cached plans are shared by concurrent runs, so each run executes a checkout().
+    """
+
+    def __init__(self, nodes, targets):
+        self.nodes = nodes
+        self.targets = list(targets)
+        self.constants = {}
+        self.node_ids = topological_order(nodes, targets)
+        index = {node_id: slot for slot, node_id in enumerate(self.node_ids)}
+        self.slots = [nodes[node_id] for node_id in self.node_ids]
+        self.inputs = []
+        self.sources = []
+        self.dependents = [[] for _ in self.slots]
+        for slot, node in enumerate(self.slots):
+            slot_inputs = []
+            for inp in node.inputs:
+                connection = node.input_connections.get(inp["name"])
+                if connection:
+                    source_node, output = connection
+                    slot_inputs.append((inp["name"], index[source_node.node_id], output_key(source_node, output)))
+                else:
+                    slot_inputs.append((inp["name"], -1, None))
+            self.inputs.append(tuple(slot_inputs))
+            sources = sorted({source for _, source, _ in slot_inputs if source >= 0})
+            self.sources.append(sources)
+            for source in sources:
+                self.dependents[source].append(slot)
+
+    def checkout(self):
+        """
+        Returns a copy of the plan with fresh node instances (same types, parameters
+        and connections), so that state a node keeps on itself during a run (such as
+        the result parameter of Result Nodes) is never shared between runs. The
+        index-based structure and the folded constants are shared.
+        """
+        plan = copy.copy(self)
+        plan.nodes = {}
+        for node_id, node in self.nodes.items():
+            instance = type(node)(node_id=node_id)
+            instance.parameters.update(node.parameters)
+            plan.nodes[node_id] = instance
+        for node_id, node in self.nodes.items():
+            plan.nodes[node_id].input_connections = {
+                name: (plan.nodes[source.node_id], output) for name, (source, output) in node.input_connections.items()
+            }
+        plan.slots = [plan.nodes[node_id] for node_id in self.node_ids]
+        return plan
+
+
+# Maximum number of compiled plans kept; the least recently used one is dropped first.
+MAX_PLANS = int(os.environ.get("MEASNODE_MAX_PLANS", "64"))
+
+_plan_cache = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def compile_plan(node_list, node_classes, fold=False):
+    """
+    Instantiates the nodes of a workflow payload and compiles the plan targeting every
+    Result Node, optimized as described in get_workflow_plan unless MEASNODE_OPTIMIZE=0.
+    With fold, constants are folded into the plan (callers check MEASNODE_FOLD).
+    Raises ValueError for cycles and invalid parameters.
+    """
+    if OPTIMIZE_PLANS:
+        node_list = live_nodes(node_list, node_classes)
+        check_cycles(node_list)
+    nodes = build_workflow_nodes(node_list, node_classes)
+    if OPTIMIZE_PLANS:
+        for node in nodes.values():
+            coerce_parameters(node)
+    result_nodes = [node.node_id for node in nodes.values() if node.title == "Result Node"]
+    plan = ExecutionPlan(nodes, result_nodes)
+    if fold:
+        plan.constants = fold_constants(plan, _fold_node)
+    return plan
+
+
+def _fold_node(node, inputs):
+    # "process" nodes are evaluated on the isolated pool, within their time limit.
+    if getattr(node, "execution", None) == "process":
+        return submit_local(node, inputs).result()
+    return _call_in_node_context(node.node_id, node.execute, inputs)
+
+
+def get_workflow_plan(workflow, fold=True):
+    """
+    Returns the execution plan for a workflow payload, compiling it only if the same
+    graph (nodes, parameters and connections) has not been compiled for the current
+    set of node modules. The plan targets every Result Node. The cache keeps the
+    compiled plan; every call returns a checkout() with its own node instances.
+
+    Unless MEASNODE_OPTIMIZE=0, the graph is optimized while compiling: nodes that
+    cannot reach a Result Node are never instantiated, cycles are reported before
+    anything runs and parameters are coerced to their declared types (raising
+    ValueError for invalid values). With MEASNODE_FOLD=1 (and fold, which sweeps turn
+    off because they override parameters per point), pure nodes that depend only on
+    constants are also evaluated once and stored in the plan.
+    """
+    node_classes = load_node_modules()
+    fold = fold and OPTIMIZE_PLANS and FOLD_CONSTANTS
+    key = hashlib.sha256(
+        f"{node_registry.version}:{fold}:{json.dumps(workflow.get('nodes', []), sort_keys=True)}".encode()
+    ).hexdigest()
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan.checkout()
+
+    plan = compile_plan(workflow.get("nodes", []), node_classes, fold)
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        while len(_plan_cache) > MAX_PLANS:
+            _plan_cache.popitem(last=False)
+    return plan.checkout()
+
+
+def run_plan(plan, evaluated, processing_order, cache=None, cache_dir=None, profiles=None, priority=None, project=None):
+    """
+    Runs a compiled execution plan as a DAG.
+
+    Every node whose inputs are ready is submitted to the shared executor at once,
+    so independent branches run concurrently and wall-clock time follows the
+    critical path. Yields PROCESSING/DONE SSE events as nodes start and finish;
+    DONE carries the node's profile (wall/CPU/queue time, output size, cache status)
+    as JSON after the node id; its queue time includes any wait for resources.
+    Profiles are also aggregated in node_metrics.
+    Nodes folded into plan.constants complete immediately with cache status "folded".
+    When a result cache is given, cacheable nodes whose type, parameters, source and
+    inputs are unchanged are resolved from it without executing, so only the dirty
+    subgraph runs.
+
+    Args:
+        plan: ExecutionPlan to run
+        evaluated: Dictionary filled with {node_id: result}; nodes already present are not re-run
+        processing_order: List filled with node ids in completion order
+        cache: Optional ResultCache shared across executions
+        cache_dir: Optional on-disk directory for the cache
+        profiles: Optional dictionary filled with {node_id: NodeProfile}
+        priority: Priority class of the run's nodes in the resource scheduler (see PRIORITIES)
+        project: Project the run's nodes are accounted to for fair share
+    """
+    count = len(plan.slots)
+    values = [None] * count
+    done = [False] * count
+    for slot, node_id in enumerate(plan.node_ids):
+        if node_id in evaluated:
+            values[slot] = evaluated[node_id]
+            done[slot] = True
+    waiting = [sum(1 for source in plan.sources[slot] if not done[source]) for slot in range(count)]
+    ready = deque(slot for slot in range(count) if not done[slot] and waiting[slot] == 0)
+    running = {}
+    digests = [None] * count  # Digest of each slot's output, when known.
+    cache_keys = {}  # { slot: cache key } for slots submitted with caching
+
+    def done_event(slot, profile, result):
+        profile.output_bytes = output_size(result)
+        node_metrics.observe(profile)
+        if profiles is not None:
+            profiles[plan.node_ids[slot]] = profile
+        return f"data: DONE {plan.node_ids[slot]} {profile.as_json()}\n\n"
+
+    def finish(slot, result):
+        values[slot] = result
+        done[slot] = True
+        evaluated[plan.node_ids[slot]] = result
+        processing_order.append(plan.node_ids[slot])
+        for dependent in plan.dependents[slot]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0 and not done[dependent]:
+                ready.append(dependent)
+
+    try:
+        while ready or running:
+            while ready:
+                slot = ready.popleft()
+                node = plan.slots[slot]
+                node_id = plan.node_ids[slot]
+                if node_id in plan.constants:
+                    # Evaluated when the plan was compiled.
+                    finish(slot, plan.constants[node_id])
+                    yield done_event(slot, NodeProfile(node.title, "folded"), plan.constants[node_id])
+                    continue
+
+                # Unconnected inputs default to 0.
+                inputs = {
+                    name: pick_output(values[source], key) if source >= 0 else 0
+                    for name, source, key in plan.inputs[slot]
+                }
+
+                if cache is not None and node.cacheable:
+                    input_digests = {
+                        name: digests[source]
+                        if source >= 0 and key is None and digests[source] is not None
+                        else value_digest(inputs[name])
+                        for name, source, key in plan.inputs[slot]
+                    }
+                    key = node_cache_key(node, input_digests)
+                    entry = cache.get(key, cache_dir)
+                    if entry is not None:
+                        digests[slot] = entry[1]
+                        finish(slot, entry[0])
+                        yield done_event(slot, NodeProfile(node.title, "hit"), entry[0])
+                        continue
+                    cache_keys[slot] = key
+
+                yield f"data: PROCESSING {node_id}\n\n"
+                profile = NodeProfile(node.title, "miss" if slot in cache_keys else "skip")
+                running[submit_node(node, inputs, profile, priority, project)] = (slot, profile)
+
+            if not running:
+                break
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                slot, profile = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    node_metrics.observe_error(profile.node_type)
+                    raise
+                if slot in cache_keys:
+                    digests[slot] = value_digest(result)
+                    cache.put(cache_keys[slot], (result, digests[slot]), cache_dir)
+                finish(slot, result)
+                yield done_event(slot, profile, result)
+    finally:
+        for future in running:
+            future.cancel()
+
+
+def schedule_nodes(nodes, targets, evaluated, processing_order, cache=None, cache_dir=None):
+    """
+    Compiles a one-off plan for the target nodes and everything upstream of them
+    and runs it with run_plan(). Takes the same arguments, with nodes being
+    { node_id: node } and targets the node ids that must be evaluated.
+    """
+    yield from run_plan(ExecutionPlan(nodes, targets), evaluated, processing_order, cache, cache_dir)
+
+
+# ---------------- Isolated Process Pool ------------------
+# Workers for nodes with execution = "process" (defaults to the number of CPUs).
+ISOLATED_WORKERS = int(os.environ.get("MEASNODE_ISOLATED_WORKERS", str(os.cpu_count() or 2)))
+# Default time limit in seconds for a process-class node; 0 disables it.
+NODE_TIMEOUT = float(os.environ.get("MEASNODE_NODE_TIMEOUT", "0"))
+# Address-space limit in MiB for each isolated worker; 0 disables it.
+NODE_MEMORY_LIMIT_MB = int(os.environ.get("MEASNODE_NODE_MEMORY_MB", "0"))
+
+
+class NodeTimeout(Exception):
+    pass
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+def node_timeout(node):
+    """
+    Returns the time limit for a process-class node: its "timeout" attribute, or
+    MEASNODE_NODE_TIMEOUT. None means no limit.
+    """
+    timeout = getattr(node, "timeout", None)
+    if timeout is None:
+        timeout = NODE_TIMEOUT
+    return timeout or None
+
+
+def _isolated_worker_main(conn, memory_limit_mb):
+    """
+    Main loop of an isolated worker: applies the memory limit, preloads the node
+    modules and then runs (fn, args) tasks received over conn until it is closed.
+    """
+    global _worker_node_classes
+    _worker_node_classes = load_node_modules()
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            reply = (True, fn(*args))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # The result or exception could not be pickled.
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class IsolatedPool:
+    """
+    Warm pool of worker processes for CPU-heavy or crash-prone nodes.
+    Unlike ProcessPoolExecutor, each task is bounded by its own timeout, and a worker
+    that times out, crashes or exceeds its memory limit is replaced by a new one
+    without affecting the tasks running on the other workers.
+    Workers are started with "spawn", so they never inherit the server's threads or locks.
+    """
+
+    def __init__(self, workers, memory_limit_mb):
+        self.workers = workers
+        self.memory_limit_mb = memory_limit_mb
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.SimpleQueue()
+        self._dispatcher = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _start(self):
+        with self._lock:
+            if self._dispatcher is None:
+                for _ in range(self.workers):
+                    self._idle.put(self._spawn())
+                # One dispatcher thread per worker, so a worker is always idle for it.
+                self._dispatcher = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="measnode-isolated")
+            return self._dispatcher
+
+    def _spawn(self):
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_isolated_worker_main,
+            args=(child_conn, self.memory_limit_mb),
+            name="measnode-isolated",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return process, conn
+
+    def _replace(self, worker):
+        process, conn = worker
+        if process.is_alive():
+            process.kill()
+        process.join()
+        conn.close()
+        with self._lock:
+            self.restarts += 1
+        return self._spawn()
+
+    def _run(self, fn, args, timeout):
+        worker = self._idle.get()
+        process, conn = worker
+        try:
+            conn.send((fn, args))
+            if not conn.poll(timeout):
+                worker = self._replace(worker)
+                raise NodeTimeout(f"Node exceeded its time limit of {timeout} s")
+            ok, value = conn.recv()
+        except (EOFError, OSError):
+            process.join(1)
+            exitcode = process.exitcode
+            worker = self._replace(worker)
+            raise WorkerCrashed(f"Worker process exited unexpectedly (exit code {exitcode})") from None
+        finally:
+            self._idle.put(worker)
+        if not ok:
+            raise value
+        return value
+
+    def submit(self, fn, *args, timeout=None):
+        """
+        Runs fn(*args) on a worker and returns a concurrent.futures.Future.
+        fn and args must be picklable; fn must be importable by the workers.
+        """
+        return self._start().submit(self._run, fn, args, timeout)
+
+    def stats(self):
+        return {"workers": self.workers, "restarts": self.restarts, "memory_limit_mb": self.memory_limit_mb}
+
+
+isolated_pool = IsolatedPool(ISOLATED_WORKERS, NODE_MEMORY_LIMIT_MB)
+
+# The pool slots held by node executions (see node_resources) have the pools' sizes,
+# unless MEASNODE_RESOURCES sets them explicitly.
+for _name, _capacity in (("executor", EXECUTOR_WORKERS), ("isolated", ISOLATED_WORKERS)):
+    if _name not in RESOURCE_CAPACITIES:
+        resource_scheduler.set_capacity(_name, _capacity)
@@ -0,0 +1,413 @@
+"""
+Production server: the Flask app on an ASGI server (uvicorn), with the Server-Sent Event
+streams served natively on asyncio so that each open stream costs a coroutine, not a thread.
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import uvicorn
+except ImportError:  # uvicorn is optional (the "server" extra); it is only needed by "measnode serve".
+    uvicorn = None
+
+from werkzeug.wrappers import Request
+
+
+# ---------------- Server Settings ------------------
+# Threads running ordinary (non-streaming) requests through the Flask app.
+SERVER_THREADS = int(os.environ.get("MEASNODE_SERVER_THREADS", "16"))
+# Seconds a shutdown waits for running executions before exiting anyway.
+DRAIN_TIMEOUT = float(os.environ.get("MEASNODE_DRAIN_TIMEOUT", "60"))
+
+SSE_HEADERS = [(b"content-type", b"text/event-stream; charset=utf-8"), (b"cache-control", b"no-cache")]
+
+
+def load_app():
+    """
+    Imports the Flask app module (app.py in the working directory).
+    """
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    import app
+
+    return app
+
+
+# ---------------- WSGI Bridge ------------------
+def build_environ(scope, body):
+    """
+    Returns the WSGI environ for an ASGI HTTP scope and its request body.
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name, value = name.decode("latin-1"), value.decode("latin-1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # The body has been read completely, so its length is known even for chunked requests.
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return environ
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+# ---------------- SSE Streams ------------------
+class StreamConnection:
+    """
+    An open SSE stream. wakeup is set when its source has new data, when it has been
+    idle for a heartbeat interval and when the server shuts down. headers are the
+    response headers, which a source may extend before yielding its first item.
+    """
+
+    __slots__ = ("wakeup", "last_sent", "headers")
+
+    def __init__(self):
+        self.wakeup = asyncio.Event()
+        self.last_sent = time.monotonic()
+        self.headers = list(SSE_HEADERS)
+
+
+class StreamHub:
+    """
+    Tracks the open SSE streams of the event loop. A single heartbeat task wakes only
+    the streams that have been idle for the heartbeat interval, and a log bus publish
+    schedules one loop callback however many log streams are open.
+    """
+
+    def __init__(self, loop, log_bus, heartbeat):
+        self.loop = loop
+        self.heartbeat = heartbeat
+        self.log_streams = set()
+        self.job_streams = set()
+        self.closing = False
+        self._log_wakeup_pending = False
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        log_bus.add_listener(self._on_log_publish)
+        self._log_bus = log_bus
+
+    def _on_log_publish(self):
+        # Runs in the publishing thread: coalesce bursts into one loop callback.
+        if not self._log_wakeup_pending:
+            self._log_wakeup_pending = True
+            self.loop.call_soon_threadsafe(self._wake_log_streams)
+
+    def _wake_log_streams(self):
+        self._log_wakeup_pending = False
+        for connection in self.log_streams:
+            connection.wakeup.set()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat / 2)
+            idle_since = time.monotonic() - self.heartbeat
+            for connection in (*self.log_streams, *self.job_streams):
+                if connection.last_sent <= idle_since:
+                    connection.wakeup.set()
+
+    def close(self):
+        """
+        Ends the log streams; execution streams end once their jobs finish.
+        """
+        self.closing = True
+        for connection in self.log_streams:
+            connection.wakeup.set()
+
+    def shutdown(self):
+        self._heartbeat_task.cancel()
+        self._log_bus.remove_listener(self._on_log_publish)
+
+
+class MeasNodeASGI:
+    """
+    ASGI application: /api/logs and the execution streams are served on the event loop,
+    every other request runs through the Flask app on a thread pool.
+    """
+
+    def __init__(self, app_module, threads=SERVER_THREADS):
+        self.app_module = app_module
+        self.wsgi_app = app_module.app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="measnode-http")
+        self.loop = None
+        self.hub = None
+        self.shutdown_started = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        if self.hub is None:
+            self.loop = asyncio.get_running_loop()
+            self.hub = StreamHub(self.loop, self.app_module.log_bus, self.app_module.SSE_HEARTBEAT)
+        if scope["method"] == "GET" and scope["path"] == "/api/logs":
+            return await self.stream(scope, receive, send, self.log_events)
+        if scope["method"] == "GET" and scope["path"] == "/api/execute_stream":
+            return await self.stream(scope, receive, send, self.job_events)
+        if scope["method"] == "GET" and scope["path"] == "/api/execute_progress":
+            return await self.stream(scope, receive, send, self.progress_events)
+        return await self.call_wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.loop = asyncio.get_running_loop()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.hub is not None:
+                    self.hub.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def begin_shutdown(self):
+        """
+        Stops accepting executions and ends the log streams; called on the event loop
+        when the server receives a shutdown signal.
+        """
+        self.shutdown_started = time.monotonic()
+        self.app_module.job_manager.draining = True
+        if self.hub is not None:
+            self.hub.close()
+
+    async def call_wsgi(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, await read_body(receive))
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+        def call():
+            result = self.wsgi_app(environ, start_response)
+            iterator = iter(result)
+            return result, iterator, next(iterator, None)
+
+        result, iterator, chunk = await loop.run_in_executor(self.executor, call)
+        try:
+            await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+            while chunk is not None:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await loop.run_in_executor(self.executor, next, iterator, None)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                await loop.run_in_executor(self.executor, result.close)
+
+    async def stream(self, scope, receive, send, events):
+        request = Request(build_environ(scope, b""))
+        connection = StreamConnection()
+        try:
+            source = events(request, connection)
+            first = await anext(source)
+        except ValueError as e:
+            body = str(e).encode()
+            await send({"type": "http.response.start", "status": 400, "headers": [(b"content-type", b"text/plain")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def pump():
+            text = first
+            while True:
+                body = text if isinstance(text, bytes) else text.encode()
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+                connection.last_sent = time.monotonic()
+                text = await anext(source, None)
+                if text is None:
+                    return
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        await send({"type": "http.response.start", "status": 200, "headers": connection.headers})
+        pump_task = asyncio.ensure_future(pump())
+        disconnect_task = asyncio.ensure_future(disconnected())
+        try:
+            await asyncio.wait({pump_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            finished = pump_task.done() and not pump_task.cancelled() and pump_task.exception() is None
+            for task in (pump_task, disconnect_task):
+                task.cancel()
+            await asyncio.gather(pump_task, disconnect_task, return_exceptions=True)
+            await source.aclose()
+        if finished:
+            await send({"type": "http.response.body", "body": b""})
+
+    async def _wait(self, connection):
+        """
+        Waits for the next wakeup. Returns True if a keepalive is due.
+        """
+        await connection.wakeup.wait()
+        connection.wakeup.clear()
+        return time.monotonic() - connection.last_sent >= self.hub.heartbeat
+
+    async def log_events(self, request, connection):
+        """
+        Yields the SSE text of /api/logs (see app.stream_logs); the first item is
+        yielded immediately so that invalid parameters surface as ValueError.
+        """
+        app_module = self.app_module
+        min_level, node_filter, cursor = app_module.parse_log_stream_args(request.args, request.headers)
+        log_bus = app_module.log_bus
+        self.hub.log_streams.add(connection)
+        log_bus.subscribe()
+        try:
+            yield ": connected\n\n"
+            while not self.hub.closing:
+                connection.wakeup.clear()
+                entries, cursor, dropped = log_bus.read(cursor, timeout=0)
+                text = app_module.format_log_events(entries, dropped, min_level, node_filter)
+                if text:
+                    yield text
+                elif await self._wait(connection):
+                    yield ": keepalive\n\n"
+        finally:
+            self.hub.log_streams.discard(connection)
+            log_bus.unsubscribe()
+
+    async def job_events(self, request, connection):
+        """
+        Yields the SSE text of /api/execute_stream (see app.api_execute_stream).
+        """
+        app_module = self.app_module
+        job, position = app_module.parse_job_stream_args(request.args, request.headers)
+        loop = asyncio.get_running_loop()
+
+        def listener():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(connection.wakeup.set)
+
+        self.hub.job_streams.add(connection)
+        job.add_listener(listener)
+        try:
+            yield ": connected\n\n"
+            while True:
+                connection.wakeup.clear()
+                events, finished = job.wait_events(position, timeout=0)
+                if events:
+                    yield app_module.format_job_events(events, position)
+                    position += len(events)
+                elif finished:
+                    return
+                elif await self._wait(connection):
+                    yield ": keepalive\n\n"
+        finally:
+            job.remove_listener(listener)
+            self.hub.job_streams.discard(connection)
+
+    async def progress_events(self, request, connection):
+        """
+        Yields the (possibly gzipped) frames of /api/execute_progress (see
+        app.api_execute_progress); waiting out the interval between frames costs a timer.
+        """
+        app_module = self.app_module
+        job, position, interval, compress = app_module.parse_progress_args(request.args, request.headers)
+        encoder = app_module.ProgressEncoder(compress)
+        if compress:
+            connection.headers.append((b"content-encoding", b"gzip"))
+        loop = asyncio.get_running_loop()
+
+        def listener():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(connection.wakeup.set)
+
+        self.hub.job_streams.add(connection)
+        job.add_listener(listener)
+        try:
+            yield encoder.encode(": connected\n\n")
+            while True:
+                connection.wakeup.clear()
+                events, finished = job.wait_events(position, timeout=0)
+                if events:
+                    yield encoder.encode(app_module.format_progress_frame(job, events, position))
+                    position += len(events)
+                    if not finished:
+                        await asyncio.sleep(interval)
+                elif finished:
+                    yield encoder.finish()
+                    return
+                elif await self._wait(connection):
+                    yield encoder.encode(": keepalive\n\n")
+        finally:
+            job.remove_listener(listener)
+            self.hub.job_streams.discard(connection)
+
+
+# ---------------- Entry Point ------------------
+def serve(host="127.0.0.1", port=5000, threads=SERVER_THREADS, drain_timeout=DRAIN_TIMEOUT, log_level="info"):
+    """
+    Runs the production server until it receives SIGINT/SIGTERM, then drains:
+    new executions are refused, log streams are closed, and running executions
+    get up to drain_timeout seconds to finish. Returns the process exit status.
+    """
+    if uvicorn is None:
+        print("measnode serve: uvicorn is not installed (pip install 'measnode[server]')", file=sys.stderr)
+        return 2
+
+    app_module = load_app()
+    asgi_app = MeasNodeASGI(app_module, threads)
+
+    class DrainingServer(uvicorn.Server):
+        def handle_exit(self, sig, frame):
+            if not self.should_exit and asgi_app.loop is not None:
+                asgi_app.loop.call_soon_threadsafe(asgi_app.begin_shutdown)
+            super().handle_exit(sig, frame)
+
+    config = uvicorn.Config(
+        asgi_app,
+        host=host,
+        port=port,
+        log_level=log_level,
+        timeout_graceful_shutdown=drain_timeout,
+    )
+    DrainingServer(config).run()
+
+    # Executions without an open stream may still be running after the server stopped.
+    elapsed = time.monotonic() - (asgi_app.shutdown_started or time.monotonic())
+    remaining = app_module.job_manager.drain(max(0.0, drain_timeout - elapsed))
+    asgi_app.executor.shutdown(wait=False)
+    if remaining:
+        logging.warning(f"Shutting down with {remaining} executions still running")
+        return 1
+    return 0
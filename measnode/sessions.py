@@ -0,0 +1,213 @@
+"""
+Stateful workflow sessions for incremental re-execution.
+"""
+
+import os
+import uuid
+import json
+import threading
+from collections import OrderedDict
+
+from measnode.nodes import load_node_modules
+from measnode.payloads import encode_results
+from measnode.cache import project_cache_dir, result_cache
+from measnode.metrics import encode_profiles
+from measnode.history import run_history
+from measnode.optimizer import FOLD_CONSTANTS, OPTIMIZE_PLANS, coerce_parameters
+from measnode.scheduler import compile_plan, parse_connection, run_plan
+
+
+# ---------------- Execution Sessions ------------------
+# Maximum number of sessions kept alive; the least recently used one is dropped first.
+MAX_SESSIONS = int(os.environ.get("MEASNODE_MAX_SESSIONS", "32"))
+
+workflow_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+class WorkflowSession:
+    """
+    Keeps the graph and results of an executed workflow so that later runs only
+    re-execute the nodes affected by a graph diff and everything downstream of them.
+    Runs compile the graph like /api/execute does (see compile_plan), so pruning, cycle
+    checks, parameter coercion and folding apply, and cache keys match that path.
+    """
+
+    def __init__(self, workflow):
+        self.session_id = str(uuid.uuid4())
+        self.project = workflow.get("project")
+        self.workflow = workflow.get("workflow")  # File name recorded in the run history.
+        self.priority = workflow.get("priority")
+        self.lock = threading.Lock()  # Held while the session is executing.
+        node_classes = load_node_modules()
+        self.node_data = {}  # { node_id: {"type", "parameters", "connections"} }
+        for node_data in workflow.get("nodes", []):
+            self.node_data[node_data["id"]] = {
+                "type": node_data.get("type"),
+                "parameters": coerced_parameters(node_data, node_classes),
+                "connections": dict(node_data.get("connections", {})),
+            }
+        self.evaluated = {}
+        self.plan = None  # Compiled on the next run, reset by apply_diff().
+
+    def apply_diff(self, diff):
+        """
+        Applies a graph diff and invalidates the results of every changed node and
+        all of its downstream nodes. Returns the sorted list of invalidated node ids.
+
+        The diff may contain:
+          - parameters: { node_id: { name: value } } parameter changes
+          - addedNodes: [{ id, type, parameters, connections }]
+          - removedNodes: [node_id]
+          - addedWires: [{ fromNode, fromAnchor, toNode, toAnchor }]
+          - removedWires: [{ toNode, toAnchor }]
+          - workflow, priority: the workflow file name recorded in the run history and
+            the priority class of later runs (kept when missing)
+
+        A node id listed in both removedNodes and addedNodes (e.g. a node whose type
+        changed) is replaced in place: the connections of other nodes to it are kept.
+        Raises ValueError for invalid parameter values before changing anything.
+        """
+        node_classes = load_node_modules()
+        added = {node_data["id"]: node_data for node_data in diff.get("addedNodes", [])}
+        added_parameters = {node_id: coerced_parameters(data, node_classes) for node_id, data in added.items()}
+        parameters = {}
+        for node_id, values in diff.get("parameters", {}).items():
+            node_data = added.get(node_id) or self.node_data.get(node_id)
+            if node_data is not None:
+                parameters[node_id] = coerced_parameters(
+                    {"id": node_id, "type": node_data.get("type"), "parameters": values}, node_classes
+                )
+
+        changed = set()
+        self.plan = None
+        if "workflow" in diff:
+            self.workflow = diff["workflow"]
+        if "priority" in diff:
+            self.priority = diff["priority"]
+
+        for node_id in diff.get("removedNodes", []):
+            if self.node_data.pop(node_id, None) is not None:
+                self.evaluated.pop(node_id, None)
+                if node_id in added:
+                    continue
+                for other_id, data in self.node_data.items():
+                    for input_name, source in list(data["connections"].items()):
+                        if parse_connection(source)[0] == node_id:
+                            del data["connections"][input_name]
+                            changed.add(other_id)
+
+        for node_id, node_data in added.items():
+            self.node_data[node_id] = {
+                "type": node_data.get("type"),
+                "parameters": added_parameters[node_id],
+                "connections": dict(node_data.get("connections", {})),
+            }
+            changed.add(node_id)
+
+        for node_id, values in parameters.items():
+            self.node_data[node_id]["parameters"].update(values)
+            changed.add(node_id)
+
+        for wire in diff.get("removedWires", []):
+            data = self.node_data.get(wire.get("toNode"))
+            if data is not None and data["connections"].pop(wire.get("toAnchor"), None) is not None:
+                changed.add(wire["toNode"])
+
+        for wire in diff.get("addedWires", []):
+            data = self.node_data.get(wire.get("toNode"))
+            if data is not None:
+                if wire.get("fromAnchor"):
+                    source = {"node": wire.get("fromNode"), "output": wire["fromAnchor"]}
+                else:
+                    source = wire.get("fromNode")
+                data["connections"][wire.get("toAnchor")] = source
+                changed.add(wire["toNode"])
+
+        # Invalidate the changed nodes and everything downstream of them.
+        dependents = {}
+        for node_id, data in self.node_data.items():
+            for source in data["connections"].values():
+                dependents.setdefault(parse_connection(source)[0], []).append(node_id)
+        invalidated = set()
+        stack = [node_id for node_id in changed if node_id in self.node_data]
+        while stack:
+            node_id = stack.pop()
+            if node_id in invalidated:
+                continue
+            invalidated.add(node_id)
+            self.evaluated.pop(node_id, None)
+            stack.extend(dependents.get(node_id, []))
+        return sorted(invalidated)
+
+    def run(self):
+        """
+        Generator that re-runs the invalidated part of the graph and yields the same
+        PROCESSING/DONE/END SSE events as /api/execute. END carries the results of all nodes
+        and the profiles of the nodes that ran. Every run is recorded in the project's history.
+        """
+        with self.lock:
+            processing_order = []
+            profiles = {}
+            workflow = {
+                "project": self.project,
+                "workflow": self.workflow,
+                "nodes": [{"id": node_id, **data} for node_id, data in self.node_data.items()],
+            }
+            with run_history.recording(workflow, self.evaluated, profiles):
+                if self.plan is None:
+                    self.plan = compile_plan(workflow["nodes"], load_node_modules(), OPTIMIZE_PLANS and FOLD_CONSTANTS)
+                yield from run_plan(
+                    self.plan,
+                    self.evaluated,
+                    processing_order,
+                    result_cache,
+                    project_cache_dir(self.project),
+                    profiles,
+                    self.priority,
+                    self.project,
+                )
+            results = dict(self.evaluated)
+        end = {"order": processing_order, "results": encode_results(results), "profile": encode_profiles(profiles)}
+        yield f"data: END {json.dumps(end)}\n\n"
+
+
+def coerced_parameters(node_data, node_classes):
+    """
+    Returns the parameters of a workflow payload entry coerced to the types declared by
+    its node class (see coerce_parameters); raises ValueError for invalid values.
+    """
+    parameters = dict(node_data.get("parameters", {}))
+    NodeClass = node_classes.get(node_data.get("type"))
+    if NodeClass is None or not OPTIMIZE_PLANS:
+        return parameters
+    node = NodeClass(node_id=node_data.get("id"))
+    node.parameters.update(parameters)
+    coerce_parameters(node)
+    return {name: node.parameters[name] for name in parameters}
+
+
+def get_session(session_id):
+    """
+    Returns a session by id (marking it as recently used) or None.
+    """
+    with _sessions_lock:
+        session = workflow_sessions.get(session_id)
+        if session is not None:
+            workflow_sessions.move_to_end(session_id)
+        return session
+
+
+def add_session(session):
+    with _sessions_lock:
+        workflow_sessions[session.session_id] = session
+        while len(workflow_sessions) > MAX_SESSIONS:
+            workflow_sessions.popitem(last=False)
+
+
+def remove_session(session_id):
+    """
+    Drops a session and returns it, or None if it does not exist.
+    """
+    with _sessions_lock:
+        return workflow_sessions.pop(session_id, None)
@@ -0,0 +1,398 @@
+"""
+Workflow files: atomic writes, optional compact encodings and an append-only edit journal.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import uuid
+import logging
+import threading
+from pathlib import Path
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional (the "msgpack" extra); the "msgpack" format then falls back to "gzip".
+    msgpack = None
+
+
+# ---------------- Workflow Files ------------------
+# Encoding of saved workflows: "json" (indented), "compact" (JSON without whitespace),
+# "gzip" (compressed compact JSON) or "msgpack". Files keep their .json name whatever
+# the encoding, and the encoding is detected when reading, so formats can be mixed.
+WORKFLOW_FORMAT = os.environ.get("MEASNODE_WORKFLOW_FORMAT", "json")
+# A journal is folded into its workflow file once it grows larger than the file
+# (and at least this many bytes), so compaction cost is amortized over many edits.
+JOURNAL_MIN_BYTES = int(os.environ.get("MEASNODE_JOURNAL_MIN_BYTES", str(64 * 1024)))
+
+if WORKFLOW_FORMAT == "msgpack" and msgpack is None:
+    logging.warning(
+        "MEASNODE_WORKFLOW_FORMAT=msgpack but msgpack is not installed (pip install 'measnode[msgpack]'); using gzip"
+    )
+    WORKFLOW_FORMAT = "gzip"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+_path_locks = {}  # { resolved workflow path: lock serializing its writers }
+_path_locks_lock = threading.Lock()
+_heads = {}  # { resolved workflow path: (workflow_signature, revision, hash) }
+
+
+class WorkflowPatchError(ValueError):
+    pass
+
+
+class WorkflowConflict(Exception):
+    """
+    Raised when a save is based on an older revision than the stored workflow.
+    """
+
+    def __init__(self, revision, digest):
+        super().__init__(f"Workflow was saved elsewhere (now at revision {revision})")
+        self.revision = revision
+        self.hash = digest
+
+
+def valid_project_name(name):
+    """
+    True for project names made only of letters, digits, spaces, "_" and "-", so that
+    projects/<name> always names a folder directly inside projects/.
+    """
+    return isinstance(name, str) and name.replace("_", "").replace("-", "").replace(" ", "").isalnum()
+
+
+def check_project(name):
+    """
+    Raises ValueError unless name is None (no project) or a valid project name.
+    """
+    if name is not None and not valid_project_name(name):
+        raise ValueError(f"Invalid project name {name!r}")
+
+
+def _lock_for(path):
+    key = str(Path(path).resolve())
+    with _path_locks_lock:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.Lock()
+        return lock
+
+
+def atomic_write(path, data):
+    """
+    Writes bytes to path via a temporary file in the same directory and a rename,
+    so readers and crashes only ever see the old or the new content.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def encode_workflow(document, fmt=None):
+    fmt = fmt or WORKFLOW_FORMAT
+    if fmt == "json":
+        return json.dumps(document, indent=2).encode()
+    compact = json.dumps(document, separators=(",", ":")).encode()
+    if fmt == "compact":
+        return compact
+    if fmt == "gzip":
+        return gzip.compress(compact, compresslevel=6)
+    if fmt == "msgpack" and msgpack is not None:
+        return msgpack.packb(document)
+    raise ValueError(f"Unknown workflow format '{fmt}'")
+
+
+def decode_workflow(data):
+    """
+    Decodes a workflow file in any of the supported encodings.
+    """
+    if data.startswith(_GZIP_MAGIC):
+        data = gzip.decompress(data)
+    stripped = data.lstrip()
+    if not stripped or stripped[:1] in (b"{", b"["):
+        return json.loads(data) if stripped else {"nodes": [], "wires": []}
+    if msgpack is None:
+        raise ValueError(
+            "Workflow file is msgpack-encoded but msgpack is not installed (pip install 'measnode[msgpack]')"
+        )
+    return msgpack.unpackb(data)
+
+
+def journal_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".journal")
+
+
+def workflow_signature(path):
+    """
+    Returns (mtime_ns, size) of a workflow file followed by those of its journal
+    (zeros without journal); it changes whenever the stored workflow does.
+    """
+    path = Path(path)
+    stat = path.stat()
+    try:
+        journal_stat = journal_path(path).stat()
+    except FileNotFoundError:
+        return (stat.st_mtime_ns, stat.st_size, 0, 0)
+    return (stat.st_mtime_ns, stat.st_size, journal_stat.st_mtime_ns, journal_stat.st_size)
+
+
+# ---------------- Revisions ------------------
+# Every save stores a "revision" (incremented by each save) and a "hash" in the
+# workflow document. The hash of a full save is the content hash of the document;
+# an incremental save chains the previous hash with the applied edit, so both stay
+# O(size of the save). Saves may name the revision they are based on and are then
+# rejected with WorkflowConflict if the workflow was saved by someone else since.
+
+
+def document_hash(document):
+    canonical = {key: value for key, value in document.items() if key not in ("revision", "hash")}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+
+
+def _remember(path, revision, digest):
+    _heads[str(Path(path).resolve())] = (workflow_signature(path), revision, digest)
+
+
+def workflow_head(path):
+    """
+    Returns (revision, hash) of the workflow at path without reading it when it has
+    not changed since the last save or read through this module.
+    """
+    path = Path(path)
+    head = _heads.get(str(path.resolve()))
+    if head is not None and head[0] == workflow_signature(path):
+        return head[1], head[2]
+    document = read_workflow(path)
+    return document["revision"], document["hash"]
+
+
+def _next_revision(path, base_revision):
+    try:
+        revision, digest = workflow_head(path)
+    except FileNotFoundError:
+        revision, digest = 0, None
+    if base_revision is not None and base_revision != revision:
+        raise WorkflowConflict(revision, digest)
+    return revision, digest
+
+
+def read_workflow(path):
+    """
+    Returns the workflow document stored at path with its journal applied,
+    including its "revision" and "hash" (revision 0 for files saved before revisions).
+    """
+    path = Path(path)
+    signature = workflow_signature(path)
+    with open(path, "rb") as f:
+        document = decode_workflow(f.read())
+    for ops in _read_journal(journal_path(path)):
+        apply_ops(document, ops)
+    document.setdefault("revision", 0)
+    if not document.get("hash"):
+        document["hash"] = document_hash(document)
+    _heads[str(path.resolve())] = (signature, document["revision"], document["hash"])
+    return document
+
+
+def write_workflow(path, document, fmt=None, base_revision=None):
+    """
+    Atomically replaces the workflow at path with document and drops its journal.
+    Returns the (revision, hash) of the saved workflow.
+    """
+    path = Path(path)
+    with _lock_for(path):
+        revision, _ = _next_revision(path, base_revision)
+        digest = document_hash(document)
+        document = {**document, "revision": revision + 1, "hash": digest}
+        atomic_write(path, encode_workflow(document, fmt))
+        journal_path(path).unlink(missing_ok=True)
+        _remember(path, revision + 1, digest)
+    return revision + 1, digest
+
+
+def copy_workflow(source, target):
+    write_workflow(target, read_workflow(source))
+
+
+def rename_workflow(source, target):
+    source, target = Path(source), Path(target)
+    with _lock_for(source):
+        source.rename(target)
+        if journal_path(source).exists():
+            journal_path(source).rename(journal_path(target))
+
+
+def delete_workflow(path):
+    path = Path(path)
+    with _lock_for(path):
+        _heads.pop(str(path.resolve()), None)
+        path.unlink()
+        journal_path(path).unlink(missing_ok=True)
+
+
+# ---------------- Edit Journal ------------------
+def _read_journal(path):
+    """
+    Yields the op lists recorded in a journal. A torn last line (from a crash
+    during an append) is ignored.
+    """
+    try:
+        with open(path, "rb") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return
+    for number, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            if number == len(lines) - 1:
+                logging.warning(f"Ignoring incomplete last entry in {path}")
+                return
+            raise
+        yield entry["ops"]
+
+
+_RESERVED_KEYS = ("nodes", "wires", "revision", "hash")
+
+
+def _wire_key(wire):
+    return (wire.get("fromNode"), wire.get("fromAnchor"), wire.get("toNode"), wire.get("toAnchor"))
+
+
+def validate_ops(ops):
+    """
+    Checks the structure of a list of edit operations and raises WorkflowPatchError
+    if one is malformed. Supported operations:
+      - {"op": "upsert_node", "node": {...}}: adds a node or replaces the node with its id
+      - {"op": "update_node", "id": ..., "fields": {...}}: sets fields (e.g. position) of a node
+      - {"op": "remove_node", "id": ...}: removes a node and its wires
+      - {"op": "add_wire", "wire": {...}} / {"op": "remove_wire", "wire": {...}}
+      - {"op": "set", "key": ..., "value": ...}: sets another top-level field
+        (revision and hash are maintained by patch_workflow)
+    Every operation is idempotent, so replaying a journal twice is harmless.
+    """
+    if not isinstance(ops, list):
+        raise WorkflowPatchError("ops must be a list")
+    for op in ops:
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind == "upsert_node":
+            valid = isinstance(op.get("node"), dict) and "id" in op["node"]
+        elif kind == "update_node":
+            valid = "id" in op and isinstance(op.get("fields"), dict) and "id" not in op["fields"]
+        elif kind == "remove_node":
+            valid = "id" in op
+        elif kind in ("add_wire", "remove_wire"):
+            valid = isinstance(op.get("wire"), dict) and None not in _wire_key(op["wire"])
+        elif kind == "set":
+            valid = isinstance(op.get("key"), str) and op["key"] not in _RESERVED_KEYS and "value" in op
+        else:
+            raise WorkflowPatchError(f"Unknown operation: {kind!r}")
+        if not valid:
+            raise WorkflowPatchError(f"Malformed {kind} operation")
+
+
+def apply_ops(document, ops):
+    """
+    Applies edit operations (see validate_ops) to a workflow document in place.
+    """
+    nodes = document.setdefault("nodes", [])
+    wires = document.setdefault("wires", [])
+    index = {node.get("id"): i for i, node in enumerate(nodes)}
+    wire_keys = {_wire_key(wire) for wire in wires}
+
+    for op in ops:
+        kind = op["op"]
+        if kind == "upsert_node":
+            node = op["node"]
+            if node["id"] in index:
+                nodes[index[node["id"]]] = node
+            else:
+                index[node["id"]] = len(nodes)
+                nodes.append(node)
+        elif kind == "update_node":
+            if op["id"] in index:
+                nodes[index[op["id"]]].update(op["fields"])
+        elif kind == "remove_node":
+            if op["id"] in index:
+                del nodes[index.pop(op["id"])]
+                index = {node.get("id"): i for i, node in enumerate(nodes)}
+                wires[:] = [wire for wire in wires if op["id"] not in (wire.get("fromNode"), wire.get("toNode"))]
+                wire_keys = {_wire_key(wire) for wire in wires}
+        elif kind == "add_wire":
+            key = _wire_key(op["wire"])
+            if key not in wire_keys:
+                wire_keys.add(key)
+                wires.append(op["wire"])
+        elif kind == "remove_wire":
+            key = _wire_key(op["wire"])
+            if key in wire_keys:
+                wire_keys.discard(key)
+                wires[:] = [wire for wire in wires if _wire_key(wire) != key]
+        elif kind == "set":
+            document[op["key"]] = op["value"]
+    return document
+
+
+def patch_workflow(path, ops, base_revision=None):
+    """
+    Records edit operations for the workflow at path by appending them to its journal,
+    so the cost of a save follows the size of the edit rather than of the graph.
+    The journal is compacted into the workflow file once it outgrows it.
+    Returns { "revision", "hash", "journal_bytes": size after the append, "compacted": bool }.
+    """
+    validate_ops(ops)
+    path = Path(path)
+    journal = journal_path(path)
+    with _lock_for(path):
+        revision, digest = _next_revision(path, base_revision)
+        if not path.exists():
+            raise FileNotFoundError(path)
+        revision += 1
+        edit = json.dumps(ops, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(f"{digest}:{edit}".encode()).hexdigest()[:16]
+        ops = [*ops, {"op": "set", "key": "revision", "value": revision}, {"op": "set", "key": "hash", "value": digest}]
+        line = (json.dumps({"ops": ops}, separators=(",", ":")) + "\n").encode()
+        with open(journal, "ab+") as f:
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # The previous append was torn by a crash: drop the partial entry.
+                    f.seek(0)
+                    f.truncate(f.read().rfind(b"\n") + 1)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            journal_bytes = f.tell()
+        status = {"revision": revision, "hash": digest, "journal_bytes": journal_bytes, "compacted": False}
+        compact = journal_bytes > max(JOURNAL_MIN_BYTES, path.stat().st_size)
+        _remember(path, revision, digest)
+    if compact:
+        compact_workflow(path)
+        status.update(journal_bytes=0, compacted=True)
+    return status
+
+
+def compact_workflow(path):
+    """
+    Folds the journal of the workflow at path into the workflow file (called by
+    patch_workflow once the journal outgrows the file).
+    """
+    path = Path(path)
+    with _lock_for(path):
+        if journal_path(path).exists():
+            document = read_workflow(path)
+            atomic_write(path, encode_workflow(document))
+            journal_path(path).unlink()
+            _remember(path, document["revision"], document["hash"])
@@ -0,0 +1,267 @@
+"""
+Streaming dataflow execution.
+"""
+
+import os
+import inspect
+import json
+import time
+import queue
+import threading
+
+import numpy as np
+
+from measnode.payloads import encode_results
+from measnode.cache import result_cache
+from measnode.history import run_history
+from measnode.scheduler import async_runner, current_node_id, get_workflow_plan, node_sources, output_key, pick_output, schedule_nodes
+
+
+# ---------------- Streaming Execution ------------------
+# Chunks buffered on each wire before the producing node blocks (backpressure).
+STREAM_QUEUE_SIZE = int(os.environ.get("MEASNODE_STREAM_QUEUE", "8"))
+# Seconds between THROUGHPUT events.
+STREAM_REPORT_INTERVAL = float(os.environ.get("MEASNODE_STREAM_REPORT", "1.0"))
+
+_END_OF_STREAM = object()
+
+
+class StreamStopped(Exception):
+    """Raised inside a stream worker when the stream was stopped by another node's error."""
+
+
+def chunk_length(chunk):
+    if isinstance(chunk, dict):
+        # Multi-output chunk; its outputs all cover the same samples.
+        chunk = next(iter(chunk.values()), [])
+    try:
+        return len(chunk)
+    except TypeError:
+        return 1
+
+
+def _resolve(result):
+    if inspect.isawaitable(result):
+        return async_runner.submit(result).result()
+    return result
+
+
+def run_node_chunk(node, inputs):
+    """
+    Processes one chunk with a node, preferring its vectorized execute_batch.
+    Without it, execute() is called once per sample of the chunk.
+    """
+    if hasattr(type(node), "execute_batch"):
+        return _resolve(node.execute_batch(**inputs))
+    sized = [name for name, value in inputs.items() if isinstance(value, (list, tuple)) or getattr(value, "ndim", 0)]
+    if not sized:
+        return _resolve(node.execute(**inputs))
+    size = min(len(inputs[name]) for name in sized)
+    return [
+        _resolve(node.execute(**{name: value[i] if name in sized else value for name, value in inputs.items()}))
+        for i in range(size)
+    ]
+
+
+class StreamSummary:
+    """
+    Constant-memory summary of the chunks reaching a Result Node in streaming mode.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.last = None
+
+    def add(self, chunk):
+        values = np.asarray(chunk).ravel()
+        if values.size == 0:
+            return
+        low, high, total = values.min().item(), values.max().item(), values.sum().item()
+        self.samples += len(values)
+        self.total += total
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self.last = values[-1].item()
+
+    def as_dict(self):
+        return {
+            "samples": self.samples,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.samples if self.samples else None,
+            "last": self.last,
+        }
+
+
+def run_stream(workflow):
+    """
+    Generator for the streaming execution mode.
+
+    Nodes implementing execute_stream() are sources; they and every node downstream
+    of them run in their own thread, connected by bounded queues so that a slow
+    consumer throttles its producers. Other nodes are evaluated once up front and
+    their values are passed to every chunk. Result Nodes keep a running summary
+    instead of the samples, so long acquisitions run in constant memory.
+    Yields PROCESSING/DONE events, periodic THROUGHPUT events and a final END event.
+    The run is recorded in the project's history with the Result Node summaries.
+    """
+    evaluated = {}
+    with run_history.recording(workflow, evaluated, {}):
+        yield from _run_stream(workflow, evaluated)
+
+
+def _run_stream(workflow, static_values):
+    plan = get_workflow_plan(workflow, fold=False)
+    nodes = plan.nodes
+    result_nodes = plan.targets
+    order = plan.node_ids
+
+    streaming = set()
+    for node_id in order:
+        node = nodes[node_id]
+        if hasattr(type(node), "execute_stream") or any(src in streaming for src in node_sources(node)):
+            streaming.add(node_id)
+
+    # Evaluate the static part of the graph once.
+    processing_order = []
+    static_targets = [node_id for node_id in order if node_id not in streaming]
+    yield from schedule_nodes(nodes, static_targets, static_values, processing_order, result_cache)
+
+    # One bounded queue per streaming wire.
+    wires = {}  # { (consumer_id, input_name): queue }
+    consumers = {}  # { producer_id: [(queue, output key)] }
+    for node_id in order:
+        if node_id not in streaming:
+            continue
+        node = nodes[node_id]
+        for inp in node.inputs:
+            connection = node.input_connections.get(inp["name"])
+            if connection and connection[0].node_id in streaming:
+                source_node, output = connection
+                wire = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+                wires[(node_id, inp["name"])] = wire
+                consumers.setdefault(source_node.node_id, []).append((wire, output_key(source_node, output)))
+
+    events = queue.Queue()
+    stop = threading.Event()
+    closed = set()  # ids of wires whose consumer has finished
+    stats = {node_id: {"chunks": 0, "samples": 0} for node_id in streaming}
+    summaries = {node_id: StreamSummary() for node_id in streaming if node_id in result_nodes}
+    errors = []
+
+    def put(wire, item):
+        while id(wire) not in closed:
+            if stop.is_set():
+                raise StreamStopped()
+            try:
+                wire.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(wire):
+        while True:
+            if stop.is_set():
+                raise StreamStopped()
+            try:
+                return wire.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def worker(node_id):
+        node = nodes[node_id]
+        outputs = consumers.get(node_id, [])
+        events.put(f"data: PROCESSING {node_id}\n\n")
+        token = current_node_id.set(node_id)
+        try:
+            if hasattr(type(node), "execute_stream"):
+                chunks = node.execute_stream()
+            else:
+                chunks = stream_chunks(node)
+            for chunk in chunks:
+                stats[node_id]["chunks"] += 1
+                stats[node_id]["samples"] += chunk_length(chunk)
+                if node_id in summaries:
+                    summaries[node_id].add(chunk)
+                for wire, key in outputs:
+                    put(wire, pick_output(chunk, key))
+            for wire, _ in outputs:
+                put(wire, _END_OF_STREAM)
+            events.put(f"data: DONE {node_id}\n\n")
+        except StreamStopped:
+            pass
+        except Exception as e:
+            errors.append(f"{node_id}: {e}")
+            stop.set()
+        finally:
+            current_node_id.reset(token)
+
+    def stream_chunks(node):
+        while True:
+            inputs = {}
+            finished = False
+            for inp in node.inputs:
+                name = inp["name"]
+                wire = wires.get((node.node_id, name))
+                if wire is not None:
+                    item = get(wire)
+                    if item is _END_OF_STREAM:
+                        finished = True
+                    inputs[name] = item
+                elif name in node.input_connections:
+                    source_node, output = node.input_connections[name]
+                    inputs[name] = pick_output(static_values[source_node.node_id], output_key(source_node, output))
+                else:
+                    # Default value if no connection
+                    inputs[name] = 0
+            if finished:
+                # Unblock producers of the other inputs, which may still be running.
+                for inp in node.inputs:
+                    wire = wires.get((node.node_id, inp["name"]))
+                    if wire is not None:
+                        closed.add(id(wire))
+                return
+            yield run_node_chunk(node, inputs)
+
+    threads = [
+        threading.Thread(target=worker, args=(node_id,), name=f"measnode-stream-{node_id}", daemon=True)
+        for node_id in order
+        if node_id in streaming
+    ]
+    for thread in threads:
+        thread.start()
+
+    started = time.monotonic()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            deadline = time.monotonic() + STREAM_REPORT_INTERVAL
+            while time.monotonic() < deadline:
+                try:
+                    yield events.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            elapsed = time.monotonic() - started
+            throughput = {
+                node_id: {**counts, "samples_per_s": round(counts["samples"] / elapsed, 1) if elapsed else 0}
+                for node_id, counts in stats.items()
+            }
+            yield f"data: THROUGHPUT {json.dumps(throughput)}\n\n"
+    finally:
+        # Stop the workers if the stream failed or was abandoned.
+        if errors or any(thread.is_alive() for thread in threads):
+            stop.set()
+        for thread in threads:
+            thread.join()
+
+    while not events.empty():
+        yield events.get()
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+    results = encode_results(static_values)
+    for node_id, summary in summaries.items():
+        results[node_id] = static_values[node_id] = summary.as_dict()
+    yield f"data: END {json.dumps({'order': processing_order + sorted(streaming), 'results': results, 'throughput': stats})}\n\n"
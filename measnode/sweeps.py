@@ -0,0 +1,195 @@
+"""
+Vectorized parameter sweeps.
+"""
+
+import os
+import inspect
+import json
+
+import numpy as np
+
+from measnode.scheduler import async_runner, get_workflow_plan, output_key, submit_node
+from measnode.resources import resource_scheduler
+from measnode.history import run_history
+
+
+# ---------------- Parameter Sweeps ------------------
+# Number of sweep points evaluated (and streamed back) per chunk.
+SWEEP_CHUNK_SIZE = int(os.environ.get("MEASNODE_SWEEP_CHUNK", "4096"))
+
+
+def sweep_values(spec):
+    """
+    Expands a sweep specification into a list of values. Accepted forms:
+      - {"values": [...]}
+      - {"start": a, "stop": b, "step": s}  (stop excluded, like range())
+      - {"start": a, "stop": b, "num": n}   (stop included, like linspace())
+    """
+    if "values" in spec:
+        return list(spec["values"])
+    start = spec.get("start", 0)
+    stop = spec["stop"]
+    if "num" in spec:
+        num = int(spec["num"])
+        if num == 1:
+            return [start]
+        return [start + (stop - start) * i / (num - 1) for i in range(num)]
+    step = spec.get("step", 1)
+    if step == 0:
+        raise ValueError("Sweep step must not be zero")
+    count = max(0, -(-(stop - start) // step))
+    return [start + i * step for i in range(int(count))]
+
+
+def sweep_points(axes, mode, offset, size):
+    """
+    Returns one column of values per axis for points offset..offset+size of the sweep.
+    "grid" walks the cartesian product (last axis fastest), "zip" pairs values by index.
+    """
+    columns = [[] for _ in axes]
+    for index in range(offset, offset + size):
+        if mode == "zip":
+            for column, values in zip(columns, axes):
+                column.append(values[index])
+        else:
+            remainder = index
+            for axis in reversed(range(len(axes))):
+                remainder, position = divmod(remainder, len(axes[axis]))
+                columns[axis].append(axes[axis][position])
+    return columns
+
+
+def as_list(column):
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def pick_column(column, key):
+    """
+    Selects one output column from a node's sweep result: a dict of columns from
+    execute_batch, or a list of per-point result dicts from the fallback.
+    """
+    if key is None:
+        return column
+    if isinstance(column, dict):
+        return column[key]
+    return [point[key] for point in column]
+
+
+def broadcast_column(value, size):
+    column = np.asarray(value)
+    if column.shape != (size,):
+        column = np.broadcast_to(column, (size,))
+    return column
+
+
+def execute_node_batch(node, parameters, inputs, size, priority=None, project=None):
+    """
+    Evaluates one node over a chunk of sweep points and returns its output column.
+    Uses the node's vectorized execute_batch when it has one, otherwise
+    runs execute once per point on the shared executor. Either way the node's
+    resources are held through the resource scheduler, with the given priority
+    class and project.
+    """
+    NodeClass = type(node)
+    if hasattr(NodeClass, "execute_batch"):
+        batch_node = NodeClass(node_id=node.node_id)
+        batch_node.parameters.update(parameters)
+        batch_inputs = {
+            name: np.asarray(value) if isinstance(value, list) else value for name, value in inputs.items()
+        }
+        with resource_scheduler.hold(dict(batch_node.resources), priority, project):
+            if inspect.iscoroutinefunction(batch_node.execute_batch):
+                result = async_runner.submit(batch_node.execute_batch(**batch_inputs)).result()
+            else:
+                result = batch_node.execute_batch(**batch_inputs)
+        if isinstance(result, dict):
+            return {name: broadcast_column(value, size) for name, value in result.items()}
+        return broadcast_column(result, size)
+
+    inputs = {name: as_list(value) if hasattr(value, "tolist") else value for name, value in inputs.items()}
+    futures = []
+    for i in range(size):
+        point_node = NodeClass(node_id=node.node_id)
+        point_node.parameters.update(
+            {name: value[i] if isinstance(value, list) else value for name, value in parameters.items()}
+        )
+        point_inputs = {name: value[i] if isinstance(value, list) else value for name, value in inputs.items()}
+        futures.append(submit_node(point_node, point_inputs, priority=priority, project=project))
+    return [future.result() for future in futures]
+
+
+def run_sweep(workflow, sweeps, mode="grid", chunk_size=SWEEP_CHUNK_SIZE):
+    """
+    Generator that evaluates a workflow over a parameter sweep, chunk by chunk.
+    Each node runs once per chunk over whole columns of values. Yields
+    PROCESSING/DONE events per node, a CHUNK event per chunk carrying the swept
+    parameter columns and the Result Node output columns, and a final END event.
+
+    Args:
+        workflow: Workflow payload (same format as /api/execute)
+        sweeps: List of {"node", "parameter", ...sweep_values() spec}
+        mode: "grid" (cartesian product) or "zip" (values paired by index)
+        chunk_size: Number of points evaluated per chunk
+
+    The sweep is recorded as one run in the project's history, with the Result Node
+    output columns of its last chunk.
+    """
+    evaluated = {}
+    with run_history.recording(workflow, evaluated, {}):
+        yield from _run_sweep(workflow, sweeps, mode, chunk_size, evaluated)
+
+
+def _run_sweep(workflow, sweeps, mode, chunk_size, evaluated):
+    plan = get_workflow_plan(workflow, fold=False)
+    nodes = plan.nodes
+    axes = []
+    for sweep in sweeps:
+        if sweep.get("node") not in nodes:
+            raise ValueError(f"Unknown sweep node: {sweep.get('node')}")
+        axes.append(sweep_values(sweep))
+    if mode == "zip":
+        total = min((len(values) for values in axes), default=0)
+    else:
+        total = 1
+        for values in axes:
+            total *= len(values)
+
+    result_nodes = plan.targets
+    order = plan.node_ids
+    column_names = [f"{sweep['node']}.{sweep['parameter']}" for sweep in sweeps] + result_nodes
+
+    for offset in range(0, total, chunk_size):
+        size = min(chunk_size, total - offset)
+        point_columns = sweep_points(axes, mode, offset, size)
+        swept = {}
+        for sweep, column in zip(sweeps, point_columns):
+            swept.setdefault(sweep["node"], {})[sweep["parameter"]] = np.asarray(column)
+
+        outputs = {}
+        for node_id in order:
+            node = nodes[node_id]
+            parameters = dict(node.parameters)
+            for name, column in swept.get(node_id, {}).items():
+                parameters[name] = column if hasattr(type(node), "execute_batch") else as_list(column)
+            inputs = {}
+            for inp in node.inputs:
+                name = inp["name"]
+                if name in node.input_connections:
+                    source_node, output = node.input_connections[name]
+                    inputs[name] = pick_column(outputs[source_node.node_id], output_key(source_node, output))
+                else:
+                    # Default value if no connection
+                    inputs[name] = 0
+            yield f"data: PROCESSING {node_id}\n\n"
+            outputs[node_id] = execute_node_batch(
+                node, parameters, inputs, size, workflow.get("priority"), workflow.get("project")
+            )
+            yield f"data: DONE {node_id}\n\n"
+
+        columns = {name: as_list(column) for name, column in zip(column_names, point_columns)}
+        for node_id in result_nodes:
+            columns[node_id] = as_list(outputs[node_id])
+            evaluated[node_id] = columns[node_id]
+        yield f"data: CHUNK {json.dumps({'offset': offset, 'size': size, 'columns': columns}, default=str)}\n\n"
+
+    yield f"data: END {json.dumps({'order': order, 'size': total, 'columns': column_names})}\n\n"
@@ -1,9 +1,10 @@
-from app import BaseNode
-import time
+from measnode import BaseNode
+import asyncio
 
 class Node(BaseNode):
     title = "Debug Node"
     category = "Debug"         # New category attribute
+    cacheable = False          # Always execute, never serve from the result cache
     inputs = [
         {"name": "a", "type": "int"},
         {"name": "b", "type": "int"},
@@ -21,8 +22,8 @@ class Node(BaseNode):
         super().__init__(node_id)
         self.parameters["operation"] = "exp"
 
-    def execute(self, **inputs):
-        time.sleep(2)
+    async def execute(self, **inputs):
+        await asyncio.sleep(2)
         a = inputs.get("a", 0)
         b = inputs.get("b", 0)
         c = inputs.get("c", 0)
@@ -1,6 +1,8 @@
-from app import BaseNode
+from measnode import BaseNode
+import asyncio
 import logging
-import time
+
+import numpy as np
 
 
 class Node(BaseNode):
@@ -21,7 +23,7 @@ class Node(BaseNode):
         super().__init__(node_id)
         self.parameters["operation"] = "add"
 
-    def execute(self, **inputs):
+    async def execute(self, **inputs):
         logging.info(
             f"BasicMath Node {self.node_id} executing with values {inputs.get('a', 0)} and {inputs.get('b', 0)}"
         )
@@ -30,7 +32,7 @@ class Node(BaseNode):
         op = self.parameters.get("operation", "add")
         try:
             if op == "add":
-                time.sleep(3)
+                await asyncio.sleep(3)
                 return a + b
             elif op == "subtract":
                 return a - b
@@ -40,3 +42,21 @@ class Node(BaseNode):
                 return a / b if b != 0 else 0
         except Exception:
             return 0
+
+    async def execute_batch(self, **inputs):
+        a = np.asarray(inputs.get("a", 0))
+        b = np.asarray(inputs.get("b", 0))
+        op = self.parameters.get("operation", "add")
+        logging.info(f"BasicMath Node {self.node_id} executing batch of {max(a.size, b.size)} values")
+        if op == "add":
+            await asyncio.sleep(3)
+            return a + b
+        elif op == "subtract":
+            return a - b
+        elif op == "multiply":
+            return a * b
+        elif op == "divide":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(b != 0, a / np.where(b != 0, b, 1), 0)
+        # Unknown operations give no result, as in execute().
+        return None
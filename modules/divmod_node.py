@@ -0,0 +1,33 @@
+from measnode import BaseNode
+
+import numpy as np
+
+
+class Node(BaseNode):
+    title = "DivMod Node"
+    category = "Math"  # New category attribute
+    inputs = [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}]
+    outputs = [
+        {"name": "quotient", "type": "int"},
+        {"name": "remainder", "type": "int"},
+    ]
+    parameters_def = []
+    pure = True
+
+    def execute(self, **inputs):
+        a = inputs.get("a", 0)
+        b = inputs.get("b", 0)
+        if b == 0:
+            return {"quotient": 0, "remainder": 0}
+        quotient, remainder = divmod(a, b)
+        return {"quotient": quotient, "remainder": remainder}
+
+    def execute_batch(self, **inputs):
+        a = np.asarray(inputs.get("a", 0))
+        b = np.asarray(inputs.get("b", 0))
+        safe_b = np.where(b != 0, b, 1)
+        quotient, remainder = np.divmod(a, safe_b)
+        return {
+            "quotient": np.where(b != 0, quotient, 0),
+            "remainder": np.where(b != 0, remainder, 0),
+        }
@@ -1,4 +1,6 @@
-from app import BaseNode
+from measnode import BaseNode
+
+import numpy as np
 
 class Node(BaseNode):
     title = "Exp Math Node"
@@ -11,6 +13,9 @@ class Node(BaseNode):
     parameters_def = [
         {"name": "operation", "type": "dropdown", "options": ["exp"], "default": "exp"}
     ]
+    execution = "process"     # Big integer powers are CPU-bound; keep them off the server's GIL
+    timeout = 30
+    pure = True
 
     def __init__(self, node_id):
         super().__init__(node_id)
@@ -20,3 +25,9 @@ class Node(BaseNode):
         a = inputs.get("a", 0)
         b = inputs.get("b", 0)
         return a ** b
+
+    def execute_batch(self, **inputs):
+        # Object arrays keep Python's arbitrary-precision integer powers.
+        a = np.asarray(inputs.get("a", 0), dtype=object)
+        b = np.asarray(inputs.get("b", 0), dtype=object)
+        return a ** b
@@ -1,6 +1,8 @@
-from app import BaseNode
+from measnode import BaseNode
 import logging
 
+import numpy as np
+
 
 class Node(BaseNode):
     title = "Integer Node"
@@ -8,6 +10,7 @@ class Node(BaseNode):
     inputs = []  # No inputs.
     outputs = [{"name": "output", "type": "int"}]
     parameters_def = [{"name": "value", "type": "int", "default": 42}]
+    pure = True
 
     def __init__(self, node_id):
         super().__init__(node_id)
@@ -18,3 +21,8 @@ class Node(BaseNode):
             f"Integer Node {self.node_id} executing with value {self.parameters.get('value')}"
         )
         return int(self.parameters.get("value", 0))
+
+    def execute_batch(self):
+        values = np.asarray(self.parameters.get("value", 0))
+        logging.info(f"Integer Node {self.node_id} executing batch of {values.size} values")
+        return values.astype(np.int64)
@@ -0,0 +1,39 @@
+from measnode import BaseNode
+import logging
+import time
+
+import numpy as np
+
+
+class Node(BaseNode):
+    title = "Ramp Source Node"
+    category = "Input"  # New category attribute
+    inputs = []  # No inputs.
+    outputs = [{"name": "output", "type": "int"}]
+    parameters_def = [
+        {"name": "samples", "type": "int", "default": 10000},
+        {"name": "chunk", "type": "int", "default": 1000},
+        {"name": "interval", "type": "int", "default": 0},  # Milliseconds between chunks.
+    ]
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["samples"] = 10000
+        self.parameters["chunk"] = 1000
+        self.parameters["interval"] = 0
+
+    def execute(self):
+        # Non-streaming execution acquires the whole ramp at once.
+        samples = int(self.parameters.get("samples", 0))
+        return np.arange(samples)
+
+    def execute_stream(self):
+        samples = int(self.parameters.get("samples", 0))
+        chunk = max(1, int(self.parameters.get("chunk", 1000)))
+        interval = int(self.parameters.get("interval", 0)) / 1000
+        logging.info(f"Ramp Source Node {self.node_id} streaming {samples} samples in chunks of {chunk}")
+        for start in range(0, samples, chunk):
+            stop = min(start + chunk, samples)
+            yield np.arange(start, stop)
+            if interval:
+                time.sleep(interval)
@@ -1,4 +1,4 @@
-from app import BaseNode
+from measnode import BaseNode
 
 class Node(BaseNode):
     title = "Result Node"
@@ -6,7 +6,7 @@ class Node(BaseNode):
     inputs = [{"name": "input", "type": "int"}]
     outputs = []
     parameters_def = [
-        {"name": "result", "type": "int", "default": 0}
+        {"name": "result", "type": "int", "default": 0, "output": True}
     ]
 
     def __init__(self, node_id):
@@ -17,3 +17,6 @@ class Node(BaseNode):
         result = inputs.get("input", 0)
         self.parameters["result"] = result
         return result
+
+    def execute_batch(self, **inputs):
+        return inputs.get("input", 0)
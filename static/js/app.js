@@ -4,7 +4,7 @@ import { initWiring } from "./wiring.js";
 import { makeDraggable } from "./dragdrop.js";
 import { showContextMenu, showAnchorContextMenu, removeContextMenu } from "./contextMenu.js";
 import { updateWirePath, getCssVarNumber, getMouseWFCoordinates, clientToLogical, getAnchorCenter } from "./utils.js";
-import { initProject, hasUnsavedChanges } from "./project.js";
+import { initProject, hasUnsavedChanges, getCurrentProject, getCurrentWorkflow, markWorkflowChanged } from "./project.js";
 
 // Expose context menu functions globally
 window.showContextMenu = showContextMenu;
@@ -129,6 +129,7 @@ function restoreWorkflowState(state) {
   });
 
   updateWorkflowTransform();
+  markWorkflowChanged();
 }
 
 /**
@@ -175,6 +176,117 @@ function createWireFromData(wireData) {
   });
 }
 
+//////////////////////////////////////////////////////
+// --- Incremental Execution Sessions ---
+// Server-side session of the last execution and the workflow it was run with.
+let executionSession = null;
+
+/**
+ * Checks whether two input connections refer to the same node output
+ * @param {Object} a - Connection ({ node, output }) or undefined
+ * @param {Object} b - Connection ({ node, output }) or undefined
+ * @returns {boolean} True if both are equal or both are missing
+ */
+function sameConnection(a, b) {
+  if (!a || !b) return a === b;
+  return a.node === b.node && a.output === b.output;
+}
+
+/**
+ * Computes the diff between two executed workflows
+ * @param {Object} previous - Previously executed workflow
+ * @param {Object} workflow - Workflow about to be executed
+ * @returns {Object} Diff in the format accepted by /api/sessions/<id>/diff
+ */
+function computeWorkflowDiff(previous, workflow) {
+  // The workflow file and priority are always sent: the session records runs under
+  // them, and the user may have switched to another workflow of the same project.
+  let diff = {
+    workflow: workflow.workflow || null,
+    priority: workflow.priority || null,
+    parameters: {},
+    addedNodes: [],
+    removedNodes: [],
+    addedWires: [],
+    removedWires: []
+  };
+  let previousNodes = {};
+  previous.nodes.forEach(n => { previousNodes[n.id] = n; });
+  let currentIds = new Set(workflow.nodes.map(n => n.id));
+
+  previous.nodes.forEach(n => {
+    if (!currentIds.has(n.id)) diff.removedNodes.push(n.id);
+  });
+
+  workflow.nodes.forEach(n => {
+    let old = previousNodes[n.id];
+    if (!old || old.type !== n.type) {
+      if (old) diff.removedNodes.push(n.id);
+      diff.addedNodes.push(n);
+      return;
+    }
+    let changedParams = {};
+    for (let name in n.parameters) {
+      if (old.parameters[name] !== n.parameters[name]) changedParams[name] = n.parameters[name];
+    }
+    if (Object.keys(changedParams).length > 0) diff.parameters[n.id] = changedParams;
+
+    for (let anchor in old.connections) {
+      if (!sameConnection(n.connections[anchor], old.connections[anchor])) {
+        diff.removedWires.push({ toNode: n.id, toAnchor: anchor });
+      }
+    }
+    for (let anchor in n.connections) {
+      if (!sameConnection(n.connections[anchor], old.connections[anchor])) {
+        let source = n.connections[anchor];
+        diff.addedWires.push({ fromNode: source.node, fromAnchor: source.output, toNode: n.id, toAnchor: anchor });
+      }
+    }
+  });
+
+  return diff;
+}
+
+/**
+ * Posts JSON to the backend and resolves with the parsed response
+ * @param {string} url - Endpoint URL
+ * @param {Object} body - Request payload
+ * @returns {Promise<Object>} Parsed JSON response (status attached as _status)
+ */
+function postJson(url, body) {
+  return fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body)
+  }).then(response => response.json().then(data => ({ ...data, _status: response.status })));
+}
+
+/**
+ * Starts an execution, sending only the diff against the last executed workflow
+ * when a session exists, and falling back to a fresh session otherwise.
+ * @param {Object} workflow - Workflow to execute
+ * @returns {Promise<Object>} Response containing the stream token
+ */
+function submitExecution(workflow) {
+  const createSession = () => postJson("/api/sessions", workflow).then(data => {
+    if (data.error) throw new Error(data.error);
+    executionSession = { id: data.session, project: workflow.project, workflow: workflow };
+    return data;
+  });
+
+  if (!executionSession || executionSession.project !== workflow.project) {
+    return createSession();
+  }
+
+  const diff = computeWorkflowDiff(executionSession.workflow, workflow);
+  return postJson(`/api/sessions/${executionSession.id}/diff`, diff).then(data => {
+    if (data._status === 404) return createSession();
+    if (data.error) throw new Error(data.error);
+    executionSession.workflow = workflow;
+    return data;
+  });
+}
+
 // Keyboard event handler for undo/redo
 $(document).on("keydown", function(ev) {
   // Undo with Ctrl+Z
@@ -380,6 +492,7 @@ $(document).ready(function() {
           return true;
         });
         $(this).remove();
+        markWorkflowChanged();
       });
 
       console.log("Deletion event: Nodes deleted.");
@@ -400,15 +513,15 @@ $(document).ready(function() {
   $("#startBtn").on("click", function() {
     $(".node").removeClass("processing");
     
-    // Build workflow data structure
-    let workflow = { nodes: [] };
+    // Build workflow data structure (the project enables its on-disk result cache and run history)
+    let workflow = { project: getCurrentProject(), workflow: getCurrentWorkflow(), nodes: [] };
     let nodeConnections = {};
     
     window.wires.forEach(function(w) {
       if (!nodeConnections[w.toNode]) {
         nodeConnections[w.toNode] = {};
       }
-      nodeConnections[w.toNode][w.toAnchor] = w.fromNode;
+      nodeConnections[w.toNode][w.toAnchor] = { node: w.fromNode, output: w.fromAnchor };
     });
     
     $(".node").each(function() {
@@ -438,37 +551,68 @@ $(document).ready(function() {
     
     console.log("Workflow JSON:", workflow);
     
-    // Submit workflow to backend and handle streaming response
-    fetch("/api/execute", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(workflow)
-    })
-    .then(response => response.json())
+    // Large arrays arrive as payload handles; show a summary instead of the data.
+    // The data itself can be fetched from /api/payloads/<id> or its /preview.
+    function formatResult(value) {
+      if (value && typeof value === "object" && "$payload" in value) {
+        return `[${value.dtype} array, shape ${value.shape.join("x")}]`;
+      }
+      return value;
+    }
+    
+    function profileTitle(profile) {
+      return profile.cache === "hit"
+        ? "Cached result"
+        : profile.cache === "folded"
+        ? "Constant, computed when the workflow was compiled"
+        : `${profile.wall_ms} ms (CPU ${profile.cpu_ms} ms, queued ${profile.queue_ms} ms)`;
+    }
+    
+    // Submit workflow (or only its diff) to backend and handle streaming response
+    submitExecution(workflow)
     .then(data => {
       const token = data.token;
-      const eventSource = new EventSource(`/api/execute_stream?token=${token}`);
+      // Progress arrives in coalesced frames (at most one per interval), so large
+      // graphs do not flood the browser with one event per node state change.
+      const eventSource = new EventSource(`/api/execute_progress?token=${token}&compress=1`);
+      // Look the node elements up once instead of once per event.
+      const nodeElements = new Map();
+      $(".node").each(function() {
+        nodeElements.set($(this).attr("data-id"), this);
+      });
       
       eventSource.onmessage = function(e) {
-        console.log("SSE event:", e.data);
-        
-        if (e.data.startsWith("PROCESSING")) {
-          const parts = e.data.split(" ");
-          const nodeId = parts[1];
-          $(".node").removeClass("processing");
-          $(".node[data-id='" + nodeId + "']").addClass("processing");
-        } 
+        if (e.data.startsWith("PROGRESS")) {
+          const progress = JSON.parse(e.data.slice("PROGRESS ".length));
+          progress.p.forEach(nodeId => {
+            const node = nodeElements.get(nodeId);
+            if (node) node.classList.add("processing");
+          });
+          progress.d.forEach(nodeId => {
+            const node = nodeElements.get(nodeId);
+            if (node) node.classList.remove("processing");
+          });
+        }
         else if (e.data.startsWith("END")) {
-          try {
-            const endData = JSON.parse(e.data.replace("END ", ""));
+          eventSource.close();
+          $(".node.processing").removeClass("processing");
+          const end = JSON.parse(e.data.slice("END ".length));
+          if (end.error) {
+            console.error("Execution failed:", end.error);
+          }
+          // Results and profiles are fetched separately from the stream.
+          fetch(end.results)
+          .then(response => response.json())
+          .then(endData => {
             for (let nodeId in endData.results) {
-              $(`.node[data-id="${nodeId}"] .param-result`).val(endData.results[nodeId]);
+              $(nodeElements.get(nodeId)).find(".param-result").val(formatResult(endData.results[nodeId]));
             }
-          } catch (err) {
-            console.error("Error parsing END event:", err);
-          }
-          $(".node.processing").removeClass("processing");
-          eventSource.close();
+            for (let nodeId in endData.profile || {}) {
+              const node = nodeElements.get(nodeId);
+              if (node) node.title = profileTitle(endData.profile[nodeId]);
+            }
+          })
+          .catch(err => console.error("Error fetching results:", err));
         }
       };
       
@@ -477,6 +621,12 @@ $(document).ready(function() {
           console.log("SSE connection closed normally.");
           return;
         }
+        // The job keeps running on the server; let EventSource reconnect and
+        // resume from the last received event id.
+        if (eventSource.readyState === EventSource.CONNECTING) {
+          console.warn("SSE connection lost, reconnecting...");
+          return;
+        }
         console.error("SSE error:", err);
         eventSource.close();
       };
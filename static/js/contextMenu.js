@@ -1,4 +1,6 @@
 // contextMenu.js - Right-click context menu functionality
+import { markWorkflowChanged } from "./project.js";
+
 const $ = window.jQuery || window.$;
 
 /**
@@ -56,6 +58,7 @@ export function showAnchorContextMenu(x, y, $anchor, connection) {
       }
       return true;
     });
+    markWorkflowChanged();
     removeContextMenu();
   });
 }
@@ -81,6 +84,7 @@ function deleteNode($node) {
     return true;
   });
   $node.remove();
+  markWorkflowChanged();
 }
 
 // Close context menu when clicking outside
@@ -1,6 +1,7 @@
 // dragdrop.js - Node dragging functionality
 import { updateWiresForNode } from "./node.js";
 import { clientToLogical } from "./utils.js";
+import { markWorkflowChanged } from "./project.js";
 
 /**
  * Makes a node draggable.
@@ -64,7 +65,9 @@ export function makeDraggable($node) {
       groupInitialPositions[$(this).data("id")] = { x: leftVal, y: topVal };
     });
     
+    let moved = false;
     function onMouseMove(ev2) {
+      moved = true;
       // Get workflow boundaries
       const workflowWidth = $("#workflow").width();
       const workflowHeight = $("#workflow").height();
@@ -126,6 +129,7 @@ export function makeDraggable($node) {
     $(document).on("mousemove.nodeDrag", onMouseMove);
     $(document).on("mouseup.nodeDrag", function() {
       $(document).off("mousemove.nodeDrag mouseup.nodeDrag");
+      if (moved) markWorkflowChanged();
     });
     
     ev.preventDefault();
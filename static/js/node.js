@@ -5,6 +5,7 @@ import {
   getCssVarNumber, 
   computeFieldAreaHeight 
 } from "./utils.js";
+import { markWorkflowChanged } from "./project.js";
 
 // Ensure the global nodes object exists
 window.nodes = window.nodes || {};
@@ -114,6 +115,7 @@ function addNode(type, x, y) {
   // Append the node to the workflow container
   $("#workflow").append($node);
   window.nodes[nodeId] = $node;
+  markWorkflowChanged();
   
   // Attach event handlers
   $node.find(".anchor").on("mousedown", handleAnchorMouseDown);
@@ -4,7 +4,16 @@ const $ = window.jQuery || window.$;
 let currentProject = null;
 let currentWorkflow = null;
 let hasUnsavedChanges = false;
-let lastSavedState = null;
+let projectsEtag = null; // ETag of the project tree currently displayed
+
+// Revisioned document model: every edit bumps editRevision (see markWorkflowChanged),
+// so unsaved changes are detected by comparing it with the revision last saved.
+let editRevision = 0;
+let savedEditRevision = 0;
+let lastSavedData = null; // Workflow data as last saved or loaded, the base for incremental saves
+let lastSavedKey = null; // "<project>/<workflow>" that lastSavedData was saved to or loaded from
+let storedRevision = null; // Revision and hash of that stored workflow (from the server)
+let storedHash = null;
 
 /**
  * Initializes the project management system
@@ -113,8 +122,11 @@ function hideProjectPopup() {
  */
 async function loadProjects() {
   try {
-    const response = await fetch("/api/projects");
+    const headers = projectsEtag ? { "If-None-Match": projectsEtag } : {};
+    const response = await fetch("/api/projects", { headers, cache: "no-store" });
+    if (response.status === 304) return; // Tree is already up to date
     const projects = await response.json();
+    projectsEtag = response.headers.get("ETag");
     displayProjects(projects);
   } catch (error) {
     console.error("Error loading projects:", error);
@@ -317,10 +329,11 @@ async function createNewWorkflow() {
     });
 
     if (response.ok) {
+      const result = await response.json();
       // Clear current workflow
       clearWorkflow();
       currentWorkflow = workflowName.trim() + ".json";
-      saveCurrentState();
+      saveCurrentState(result.revision, result.hash);
 
       // Refresh project list but maintain selection
       await loadProjects();
@@ -356,21 +369,47 @@ async function saveCurrentWorkflow() {
   }
 
   const workflowData = getCurrentWorkflowData();
+  const savedRevision = editRevision;
+  const sameWorkflow = lastSavedKey === `${currentProject}/${workflowName}`;
+  const baseRevision = sameWorkflow ? storedRevision : null;
+
+  const saveFull = revision => fetch("/api/workflows/save", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      project: currentProject,
+      workflow: workflowName,
+      data: workflowData,
+      baseRevision: revision
+    })
+  });
 
   try {
-    const response = await fetch("/api/workflows/save", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({
-        project: currentProject,
-        workflow: workflowName,
-        data: workflowData
-      })
-    });
+    // Send only the edits when saving over the stored copy of this workflow
+    let response = null;
+    if (sameWorkflow) {
+      response = await fetch(`/api/workflows/${currentProject}/${workflowName}`, {
+        method: "PATCH",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ ops: diffWorkflowData(lastSavedData, workflowData), baseRevision })
+      });
+    }
+    if (!response || (!response.ok && response.status !== 409)) {
+      response = await saveFull(baseRevision);
+    }
+
+    // Someone else saved this workflow since it was loaded
+    if (response.status === 409) {
+      if (!confirm("This workflow was saved elsewhere since you opened it. Overwrite those changes?")) {
+        return;
+      }
+      response = await saveFull(null);
+    }
 
     if (response.ok) {
+      const result = await response.json();
       currentWorkflow = workflowName;
-      saveCurrentState();
+      markSaved(workflowData, savedRevision, result.revision, result.hash);
       updateLastWorkflow(currentProject, workflowName);
 
       // Refresh project list but maintain selection
@@ -405,11 +444,16 @@ async function loadSelectedWorkflow() {
   }
 
   try {
-    const response = await fetch(`/api/workflows/${currentProject}/${currentWorkflow}`);
-    if (response.ok) {
+    // Reopening the unchanged workflow that is already in the editor needs no reload
+    const isOpen = lastSavedKey === `${currentProject}/${currentWorkflow}` && !hasUnsavedChanges;
+    const headers = isOpen && storedHash ? { "If-None-Match": `"${storedHash}"` } : {};
+    const response = await fetch(`/api/workflows/${currentProject}/${currentWorkflow}`, { headers, cache: "no-store" });
+    if (response.status === 304) {
+      console.log("Workflow already loaded:", currentWorkflow);
+    } else if (response.ok) {
       const workflowData = await response.json();
       loadWorkflowData(workflowData);
-      saveCurrentState();
+      saveCurrentState(workflowData.revision, workflowData.hash);
       updateLastWorkflow(currentProject, currentWorkflow);
       console.log("Loaded workflow:", currentWorkflow);
     } else {
@@ -574,29 +618,72 @@ function trackWorkflowChanges() {
   // Save initial state
   saveCurrentState();
 
-  // Set up change detection
-  setInterval(checkForChanges, 1000);
+  // Parameter edits; structural edits call markWorkflowChanged() where they happen
+  $("#workflow").on("input change", ".parameters input, .parameters select", markWorkflowChanged);
+}
+
+/**
+ * Records an edit of the workflow in the editor
+ */
+function markWorkflowChanged() {
+  editRevision++;
+  if (!hasUnsavedChanges) {
+    hasUnsavedChanges = true;
+    updateTitle();
+  }
 }
 
 /**
  * Saves the current state for change detection
+ * @param {number|null} revision - Revision of the stored workflow (from the server)
+ * @param {string|null} hash - Hash of the stored workflow (from the server)
  */
-function saveCurrentState() {
-  lastSavedState = JSON.stringify(getCurrentWorkflowData());
-  hasUnsavedChanges = false;
+function saveCurrentState(revision = null, hash = null) {
+  markSaved(getCurrentWorkflowData(), editRevision, revision, hash);
 }
 
 /**
- * Checks for changes in the workflow
+ * Records that workflowData, the editor state at savedRevision, is stored on the server
  */
-function checkForChanges() {
-  const currentState = JSON.stringify(getCurrentWorkflowData());
-  const changed = currentState !== lastSavedState;
+function markSaved(workflowData, savedRevision, revision, hash) {
+  lastSavedData = workflowData;
+  lastSavedKey = currentWorkflow ? `${currentProject}/${currentWorkflow}` : null;
+  storedRevision = revision;
+  storedHash = hash;
+  savedEditRevision = savedRevision;
+  hasUnsavedChanges = editRevision !== savedEditRevision;
+  updateTitle();
+}
 
-  if (changed !== hasUnsavedChanges) {
-    hasUnsavedChanges = changed;
-    updateTitle();
-  }
+/**
+ * Returns the edit operations (see PATCH /api/workflows/<project>/<workflow>)
+ * that turn the saved workflow data into the current one
+ */
+function diffWorkflowData(saved, current) {
+  const ops = [];
+  const wireKey = wire => `${wire.fromNode}|${wire.fromAnchor}|${wire.toNode}|${wire.toAnchor}`;
+
+  const savedNodes = new Map(saved.nodes.map(node => [node.id, JSON.stringify(node)]));
+  const currentIds = new Set();
+  current.nodes.forEach(node => {
+    currentIds.add(node.id);
+    if (savedNodes.get(node.id) !== JSON.stringify(node)) {
+      ops.push({ op: "upsert_node", node });
+    }
+  });
+  savedNodes.forEach((_, id) => {
+    if (!currentIds.has(id)) ops.push({ op: "remove_node", id });
+  });
+
+  const savedWires = new Set(saved.wires.map(wireKey));
+  const currentWires = new Set(current.wires.map(wireKey));
+  saved.wires.forEach(wire => {
+    if (!currentWires.has(wireKey(wire))) ops.push({ op: "remove_wire", wire });
+  });
+  current.wires.forEach(wire => {
+    if (!savedWires.has(wireKey(wire))) ops.push({ op: "add_wire", wire });
+  });
+  return ops;
 }
 
 /**
@@ -634,7 +721,7 @@ async function loadLastWorkflow() {
         loadWorkflowData(workflowData);
         currentProject = lastProject;
         currentWorkflow = lastWorkflow;
-        saveCurrentState();
+        saveCurrentState(workflowData.revision, workflowData.hash);
         updateButtonStates();
         console.log("Loaded last workflow:", lastWorkflow, "from project:", lastProject);
       }
@@ -838,6 +925,7 @@ async function deleteItem() {
         // Deleted workflow, keep project selected
         currentWorkflow = null;
       }
+      lastSavedKey = null;
 
       await loadProjects();
       restoreSelectionState();
@@ -922,9 +1010,26 @@ async function renameItem() {
   }
 }
 
+/**
+ * Returns the name of the currently selected project (or null)
+ */
+function getCurrentProject() {
+  return currentProject;
+}
+
+/**
+ * Returns the file name of the currently open workflow (or null)
+ */
+function getCurrentWorkflow() {
+  return currentWorkflow;
+}
+
 // Export functions for use in other modules
 export {
   hasUnsavedChanges,
+  markWorkflowChanged,
+  getCurrentProject,
+  getCurrentWorkflow,
   saveCurrentState,
   getCurrentWorkflowData,
   loadWorkflowData,
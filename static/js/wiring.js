@@ -1,5 +1,6 @@
 // wiring.js - Wire connection management
 import { updateWirePath, getAnchorCenter, getMouseWFCoordinates } from "./utils.js";
+import { markWorkflowChanged } from "./project.js";
 
 /**
  * Initializes wiring functionality for the canvas.
@@ -52,6 +53,7 @@ export function initWiring() {
             lineStartX: window.currentWire.startX,
             lineStartY: window.currentWire.startY
           });
+          markWorkflowChanged();
           
           // Update the path with final positions
           window.currentWireLine.setAttribute(
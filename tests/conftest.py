@@ -0,0 +1,70 @@
+"""
+Shared fixtures. The engine reads its configuration from the environment at import
+time, so the test node modules are selected before anything imports measnode.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+TESTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TESTS_DIR.parent))
+os.environ["MEASNODE_MODULES"] = str(TESTS_DIR / "modules")
+os.environ["MEASNODE_HISTORY_FLUSH_INTERVAL"] = "0.01"
+os.environ["MEASNODE_STREAM_REPORT"] = "0.05"
+os.environ["MEASNODE_ISOLATED_WORKERS"] = "2"
+
+from measnode.cache import result_cache  # noqa: E402
+from measnode.catalog import project_catalog  # noqa: E402
+from measnode.history import run_history  # noqa: E402
+from measnode.nodes import load_node_modules  # noqa: E402
+from measnode.scheduler import _plan_cache  # noqa: E402
+
+
+def node(node_id, node_type, parameters=None, connections=None):
+    """
+    Returns a workflow payload entry.
+    """
+    return {"id": node_id, "type": node_type, "parameters": parameters or {}, "connections": connections or {}}
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs each test in an empty directory with a "projects" folder, with empty caches.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "projects").mkdir()
+    project_catalog.scan()
+    result_cache.clear()
+    _plan_cache.clear()
+    for cls in load_node_modules().values():
+        if "calls" in vars(cls):
+            cls.calls = 0
+    return tmp_path
+
+
+@pytest.fixture
+def project(workdir):
+    """
+    Creates the project "demo" and closes its history database afterwards.
+    """
+    (workdir / "projects" / "demo").mkdir()
+    yield "demo"
+    run_history.flush()
+    run_history.close("demo")
+
+
+@pytest.fixture
+def node_classes():
+    return load_node_modules()
+
+
+@pytest.fixture
+def client():
+    import app
+
+    app.app.config["TESTING"] = True
+    return app.app.test_client()
@@ -0,0 +1,18 @@
+from measnode import BaseNode
+
+import numpy as np
+
+
+class Node(BaseNode):
+    title = "Array Node"
+    category = "Test"
+    inputs = []
+    outputs = [{"name": "output", "type": "array"}]
+    parameters_def = [{"name": "size", "type": "int", "default": 10}]
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["size"] = 10
+
+    def execute(self):
+        return np.arange(int(self.parameters["size"]), dtype=np.float64)
@@ -0,0 +1,19 @@
+import asyncio
+
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Async Sleep Node"
+    category = "Test"
+    inputs = [{"name": "input", "type": "int"}]
+    outputs = [{"name": "output", "type": "int"}]
+    parameters_def = [{"name": "seconds", "type": "float", "default": 0.3}]
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["seconds"] = 0.3
+
+    async def execute(self, **inputs):
+        await asyncio.sleep(float(self.parameters["seconds"]))
+        return inputs.get("input", 0) + 1
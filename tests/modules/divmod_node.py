@@ -0,0 +1,13 @@
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "DivMod Node"
+    category = "Math"
+    inputs = [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}]
+    outputs = [{"name": "quotient", "type": "int"}, {"name": "remainder", "type": "int"}]
+    pure = True
+
+    def execute(self, **inputs):
+        quotient, remainder = divmod(inputs.get("a", 0), inputs.get("b", 1) or 1)
+        return {"quotient": quotient, "remainder": remainder}
@@ -0,0 +1,12 @@
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Fail Node"
+    category = "Test"
+    inputs = [{"name": "input", "type": "int"}]
+    outputs = [{"name": "output", "type": "int"}]
+    cacheable = False
+
+    def execute(self, **inputs):
+        raise RuntimeError("node failed")
@@ -0,0 +1,20 @@
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Integer Node"
+    category = "Input"
+    inputs = []
+    outputs = [{"name": "output", "type": "int"}]
+    parameters_def = [{"name": "value", "type": "int", "default": 0}]
+    pure = True
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["value"] = 0
+
+    def execute(self):
+        return int(self.parameters.get("value", 0))
+
+    def execute_batch(self):
+        return self.parameters.get("value", 0)
@@ -0,0 +1,13 @@
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Power Node"
+    category = "Test"
+    inputs = [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}]
+    outputs = [{"name": "output", "type": "int"}]
+    execution = "process"
+    pure = True
+
+    def execute(self, **inputs):
+        return inputs["a"] ** inputs["b"]
@@ -0,0 +1,27 @@
+import os
+import time
+
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Process Node"
+    category = "Test"
+    inputs = [{"name": "input", "type": "int"}]
+    outputs = [{"name": "output", "type": "int"}]
+    parameters_def = [{"name": "mode", "type": "str", "default": "pid"}]
+    execution = "process"
+    timeout = 2
+    cacheable = False
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["mode"] = "pid"
+
+    def execute(self, **inputs):
+        # "pid" returns the worker's process id, "crash" kills the worker, "hang" never returns in time.
+        if self.parameters["mode"] == "crash":
+            os._exit(3)
+        if self.parameters["mode"] == "hang":
+            time.sleep(60)
+        return os.getpid()
@@ -0,0 +1,27 @@
+import numpy as np
+
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Ramp Node"
+    category = "Test"
+    inputs = []
+    outputs = [{"name": "output", "type": "int"}]
+    parameters_def = [
+        {"name": "samples", "type": "int", "default": 10},
+        {"name": "chunk", "type": "int", "default": 4},
+    ]
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["samples"] = 10
+        self.parameters["chunk"] = 4
+
+    def execute(self):
+        return np.arange(int(self.parameters["samples"]))
+
+    def execute_stream(self):
+        samples, chunk = int(self.parameters["samples"]), int(self.parameters["chunk"])
+        for start in range(0, samples, chunk):
+            yield np.arange(start, min(start + chunk, samples))
@@ -0,0 +1,21 @@
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Result Node"
+    category = "Output"
+    inputs = [{"name": "input", "type": "int"}]
+    outputs = []
+    parameters_def = [{"name": "result", "type": "int", "default": 0, "output": True}]
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["result"] = 0
+
+    def execute(self, **inputs):
+        result = inputs.get("input", 0)
+        self.parameters["result"] = result
+        return result
+
+    def execute_batch(self, **inputs):
+        return inputs.get("input", 0)
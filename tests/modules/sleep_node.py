@@ -0,0 +1,21 @@
+import time
+
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Sleep Node"
+    category = "Test"
+    inputs = [{"name": "input", "type": "int"}]
+    outputs = [{"name": "output", "type": "int"}]
+    parameters_def = [{"name": "seconds", "type": "float", "default": 0.3}]
+    calls = 0
+
+    def __init__(self, node_id):
+        super().__init__(node_id)
+        self.parameters["seconds"] = 0.3
+
+    def execute(self, **inputs):
+        type(self).calls += 1
+        time.sleep(float(self.parameters["seconds"]))
+        return inputs.get("input", 0) + 1
@@ -0,0 +1,11 @@
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "Sum Node"
+    category = "Test"
+    inputs = [{"name": "input", "type": "array"}]
+    outputs = [{"name": "output", "type": "float"}]
+
+    def execute(self, **inputs):
+        return float(inputs["input"].sum())
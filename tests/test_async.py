@@ -0,0 +1,37 @@
+import time
+
+from conftest import node
+from measnode.runner import run_workflow
+from measnode.scheduler import EXECUTOR_WORKERS, submit_node
+
+
+def test_coroutine_nodes_are_not_limited_by_the_worker_threads():
+    count = EXECUTOR_WORKERS * 3
+    nodes = []
+    for i in range(count):
+        nodes.append(node(f"wait{i}", "Async Sleep Node", {"seconds": 0.3}))
+        nodes.append(node(f"result{i}", "Result Node", connections={"input": f"wait{i}"}))
+    started = time.perf_counter()
+    outcome = run_workflow({"nodes": nodes})
+
+    assert all(outcome["results"][f"result{i}"] == 1 for i in range(count))
+    assert time.perf_counter() - started < 0.9
+
+
+def test_coroutine_and_sync_nodes_can_be_chained():
+    workflow = {
+        "nodes": [
+            node("one", "Integer Node", {"value": 1}),
+            node("wait", "Async Sleep Node", {"seconds": 0}, {"input": "one"}),
+            node("step", "Sleep Node", {"seconds": 0}, {"input": "wait"}),
+            node("result", "Result Node", connections={"input": "step"}),
+        ]
+    }
+    assert run_workflow(workflow)["results"]["result"] == 3
+
+
+def test_submit_node_returns_a_future_for_coroutine_nodes(node_classes):
+    wait = node_classes["Async Sleep Node"](node_id="wait")
+    wait.parameters["seconds"] = 0
+
+    assert submit_node(wait, {"input": 41}).result(timeout=5) == 42
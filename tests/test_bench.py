@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+
+from conftest import node
+from measnode.bench import (
+    bench_engine,
+    chain_workflow,
+    compare_reports,
+    diamond_workflow,
+    fanout_workflow,
+    parse_cases,
+    random_workflow,
+    sleeps_stubbed,
+)
+from measnode.optimizer import check_cycles
+
+
+@pytest.mark.parametrize(
+    "workflow, nodes",
+    [(chain_workflow(10), 12), (fanout_workflow(10), 21), (diamond_workflow(10), 32), (random_workflow(100), None)],
+)
+def test_synthetic_graphs_are_acyclic_and_fully_connected(workflow, nodes):
+    ids = {entry["id"] for entry in workflow["nodes"]}
+
+    check_cycles(workflow["nodes"])
+    assert nodes is None or len(workflow["nodes"]) == nodes
+    assert all(source in ids for entry in workflow["nodes"] for source in entry["connections"].values())
+
+
+def test_random_graphs_depend_only_on_the_seed():
+    assert random_workflow(100) == random_workflow(100)
+    assert random_workflow(100, seed=1) != random_workflow(100)
+
+
+def test_sleeps_are_stubbed_only_inside_the_block():
+    real_sleep, real_async_sleep = time.sleep, asyncio.sleep
+    started = time.perf_counter()
+    with sleeps_stubbed():
+        time.sleep(1)
+        asyncio.run(asyncio.sleep(1))
+    assert time.perf_counter() - started < 0.5
+    assert time.sleep is real_sleep and asyncio.sleep is real_async_sleep
+
+
+def test_engine_measurements():
+    workflow = {"nodes": [node("one", "Integer Node", {"value": 1}), node("r", "Result Node", connections={"input": "one"})]}
+    result = bench_engine(workflow, repeat=2)
+
+    assert set(result) == {"compile_s", "run_s", "run_min_s", "per_node_us", "peak_mem_kb"}
+    assert result["run_min_s"] <= result["run_s"]
+
+
+def test_reports_flag_regressions_beyond_the_tolerance():
+    baseline = {"module_load_s": 1.0, "cases": [{"graph": "chain", "size": 10, "run_s": 1.0, "compile_s": 1.0}]}
+    current = {"module_load_s": 1.05, "cases": [{"graph": "chain", "size": 10, "run_s": 1.5, "compile_s": 0.5}]}
+    changes = {change["metric"]: change for change in compare_reports(baseline, current, tolerance=0.1)}
+
+    assert changes["run_s"]["regression"] and changes["run_s"]["change"] == 0.5
+    assert not changes["compile_s"]["regression"]
+    assert not changes["module_load_s"]["regression"]
+
+
+def test_cases_are_parsed():
+    assert parse_cases("chain:5, random") == [("chain", 5), ("random", 1000)]
+    with pytest.raises(ValueError, match="Unknown graph"):
+        parse_cases("ring:5")
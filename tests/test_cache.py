@@ -0,0 +1,71 @@
+import pytest
+
+import measnode.cache
+from conftest import node
+from measnode.cache import project_cache_dir, result_cache
+from measnode.runner import run_workflow
+
+
+def sum_workflow(project=None, value=1):
+    return {
+        "project": project,
+        "nodes": [
+            node("one", "Integer Node", {"value": value}),
+            node("sum", "Add Node", connections={"a": "one", "b": "one"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ],
+    }
+
+
+def test_unchanged_nodes_are_served_from_the_cache(node_classes):
+    run_workflow(sum_workflow(value=1))
+    outcome = run_workflow(sum_workflow(value=1))
+
+    assert outcome["profile"]["sum"]["cache"] == "hit"
+    assert node_classes["Add Node"].calls == 1
+
+    outcome = run_workflow(sum_workflow(value=2))
+    assert outcome["profile"]["sum"]["cache"] == "miss"
+    assert outcome["results"]["result"] == 4
+
+
+def test_disk_cache_survives_a_cleared_memory_cache(monkeypatch, project, node_classes):
+    monkeypatch.setattr(measnode.cache, "RESULT_CACHE_DISK", True)
+    run_workflow(sum_workflow(project))
+    result_cache.clear()
+
+    outcome = run_workflow(sum_workflow(project))
+
+    assert outcome["profile"]["sum"]["cache"] == "hit"
+    assert node_classes["Add Node"].calls == 1
+    assert any(project_cache_dir(project).glob("*.pkl"))
+
+
+@pytest.mark.parametrize("name", ["..", "../..", "a/b", "", 42])
+def test_invalid_project_names_have_no_cache_dir(monkeypatch, workdir, name):
+    monkeypatch.setattr(measnode.cache, "RESULT_CACHE_DISK", True)
+    (workdir / "projects" / "a" / "b").mkdir(parents=True)
+
+    assert project_cache_dir(name) is None
+
+
+@pytest.mark.parametrize(
+    "url, payload",
+    [
+        ("/api/execute", {"project": "..", "nodes": []}),
+        ("/api/sessions", {"project": "../..", "nodes": []}),
+        ("/api/sweep", {"workflow": {"project": ".."}, "sweeps": [{"node": "one", "parameter": "value", "values": [1]}]}),
+    ],
+)
+def test_endpoints_reject_invalid_project_names(client, url, payload):
+    response = client.post(url, json=payload)
+
+    assert response.status_code == 400
+    assert "Invalid project name" in response.get_json()["error"]
+
+
+def test_history_endpoints_reject_invalid_project_names(client):
+    assert client.get("/api/history/..").status_code == 400
+    assert client.get("/api/history/.../runs").status_code == 400
+    assert client.get("/api/history/.../runs/1").status_code == 400
+    assert client.post("/api/projects", json={"name": "../x"}).status_code == 400
@@ -0,0 +1,63 @@
+import pytest
+
+from measnode.catalog import ProjectCatalog
+from measnode.storage import write_workflow
+
+
+def save(workdir, project, name, *node_types):
+    folder = workdir / "projects" / project
+    folder.mkdir(exist_ok=True)
+    nodes = [{"id": str(i), "type": node_type} for i, node_type in enumerate(node_types)]
+    write_workflow(folder / name, {"nodes": nodes, "wires": []})
+
+
+@pytest.fixture
+def catalog(workdir):
+    save(workdir, "scope", "sweep.json", "Integer Node", "Result Node")
+    save(workdir, "scope", "fft.json", "Array Node", "Sum Node")
+    save(workdir, "dmm", "read.json", "Integer Node")
+    return ProjectCatalog(workdir / "projects", watch_interval=0)
+
+
+def test_projects_are_listed_from_memory(catalog):
+    assert catalog.projects() == [
+        {"name": "dmm", "workflows": ["read.json"]},
+        {"name": "scope", "workflows": ["fft.json", "sweep.json"]},
+    ]
+
+
+def test_search_matches_names_and_node_types(catalog):
+    total, page = catalog.search("scope integer")
+    assert total == 1 and page[0]["workflow"] == "sweep.json" and page[0]["node_count"] == 2
+
+    total, page = catalog.search(node_type="Integer Node", offset=1, limit=1)
+    assert total == 2 and [entry["project"] for entry in page] == ["scope"]
+
+
+def test_api_changes_are_picked_up_after_touch(catalog, workdir):
+    catalog.projects()
+    etag = catalog.etag
+    save(workdir, "dmm", "read.json", "Integer Node", "Add Node", "Result Node")
+    catalog.touch("dmm", "read.json")
+
+    assert catalog.etag != etag
+    assert catalog.search("read")[1][0]["node_count"] == 3
+
+
+def test_external_changes_are_picked_up_by_check(catalog, workdir):
+    catalog.projects()
+    save(workdir, "dmm", "extra.json", "Sum Node")
+    (workdir / "projects" / "new").mkdir()
+    catalog.check()
+
+    assert {"name": "new", "workflows": []} in catalog.projects()
+    assert catalog.search(node_type="Sum Node")[0] == 2
+
+
+def test_listing_endpoint_supports_conditional_requests(client):
+    assert client.post("/api/projects", json={"name": "dmm"}).status_code == 200
+    assert client.post("/api/workflows", json={"project": "dmm", "name": "read"}).status_code == 200
+    response = client.get("/api/catalog?q=dmm")
+
+    assert response.get_json()["total"] == 1
+    assert client.get("/api/catalog?q=dmm", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
@@ -0,0 +1,112 @@
+import os
+import socket
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import pytest
+
+from conftest import node
+from measnode.cluster import ClusterWorker, Coordinator, auth_key, parse_address
+from measnode.nodes import load_node_modules, node_registry
+from measnode.runner import run_workflow
+
+
+@pytest.fixture
+def coordinator(workdir):
+    coordinator = Coordinator(f"unix://{workdir}/cluster.sock")
+    coordinator.start()
+    yield coordinator
+    coordinator.stop()
+
+
+def connect(coordinator, name):
+    """
+    Connects an in-process worker to the coordinator; it serves until the coordinator drops it.
+    """
+    address, family = parse_address(coordinator.address)
+    worker = ClusterWorker(coordinator.address, name, slots=2)
+    conn = Client(address, family, authkey=auth_key(coordinator.address))
+    threading.Thread(target=worker._serve, args=(conn,), daemon=True).start()
+    return worker
+
+
+def workers_by_name(coordinator):
+    return {worker["name"]: worker for worker in coordinator.status()["workers"]}
+
+
+def test_addresses_and_keys(monkeypatch):
+    monkeypatch.delenv("MEASNODE_CLUSTER_KEY", raising=False)
+    assert parse_address("tcp://127.0.0.1:7000") == (("127.0.0.1", 7000), "AF_INET")
+    assert parse_address("unix:///tmp/measnode.sock") == ("/tmp/measnode.sock", "AF_UNIX")
+    assert auth_key("unix:///tmp/measnode.sock") == b"measnode"
+    with pytest.raises(ValueError, match="Invalid cluster address"):
+        parse_address("localhost:7000")
+    # Loopback addresses are reachable by every local user, so they need a key as well.
+    with pytest.raises(ValueError, match="MEASNODE_CLUSTER_KEY"):
+        auth_key("tcp://127.0.0.1:7000")
+    monkeypatch.setenv("MEASNODE_CLUSTER_KEY", "secret")
+    assert auth_key("tcp://127.0.0.1:7000") == b"secret"
+
+
+def test_tcp_coordinators_without_a_key_generate_one(monkeypatch):
+    monkeypatch.delenv("MEASNODE_CLUSTER_KEY", raising=False)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    coordinator = Coordinator(f"tcp://127.0.0.1:{port}")
+    coordinator.start()
+    try:
+        key = os.environ["MEASNODE_CLUSTER_KEY"]
+        assert len(key) == 64
+        with pytest.raises(AuthenticationError):
+            Client(("127.0.0.1", port), "AF_INET", authkey=b"measnode")
+        connect(coordinator, "local")
+        assert coordinator.wait_for_workers(1, timeout=5)
+    finally:
+        coordinator.stop()
+
+
+def test_nodes_run_on_workers_and_stay_with_their_inputs(coordinator):
+    connect(coordinator, "first")
+    connect(coordinator, "second")
+    assert coordinator.wait_for_workers(2, timeout=5)
+    workflow = {
+        "nodes": [
+            node("array", "Array Node", {"size": 20000}),
+            node("sum", "Sum Node", connections={"input": "array"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+
+    assert run_workflow(workflow)["results"]["result"] == sum(range(20000))
+    completed = sorted(worker["completed"] for worker in workers_by_name(coordinator).values())
+    # The large array is only referenced, so the sum runs where the array was produced.
+    assert completed[0] == 0 and completed[1] >= 2
+
+
+def test_lost_workers_nodes_are_dispatched_again(coordinator):
+    address, family = parse_address(coordinator.address)
+    conn = Client(address, family, authkey=auth_key(coordinator.address))
+    conn.send(("hello", {"name": "silent", "node_types": dict(node_registry.source_hashes)}))
+    assert coordinator.wait_for_workers(1, timeout=5)
+    node_instance = load_node_modules()["Integer Node"](node_id="one")
+    node_instance.parameters["value"] = 7
+
+    future = coordinator.submit(node_instance, {})
+    assert conn.recv()[0] == "run"
+    conn.close()
+
+    # No worker is left, so the node runs locally.
+    assert future.result(timeout=5) == 7
+    assert coordinator.status()["lost"] == 1 and coordinator.status()["redispatched"] == 1
+
+
+def test_nodes_no_worker_advertises_run_locally(coordinator):
+    address, family = parse_address(coordinator.address)
+    conn = Client(address, family, authkey=auth_key(coordinator.address))
+    conn.send(("hello", {"name": "empty", "node_types": {}}))
+    assert coordinator.wait_for_workers(1, timeout=5)
+
+    assert coordinator.submit(load_node_modules()["Integer Node"](node_id="one"), {}) is None
+    conn.close()
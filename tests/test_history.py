@@ -0,0 +1,93 @@
+import pytest
+
+from conftest import node
+from measnode.history import run_history
+from measnode.runner import run_workflow
+from measnode.sessions import WorkflowSession
+from measnode.streaming import run_stream
+from measnode.sweeps import run_sweep
+
+
+def sum_workflow(project, value=1):
+    return {
+        "project": project,
+        "workflow": "sum.json",
+        "nodes": [
+            node("one", "Integer Node", {"value": value}),
+            node("sum", "Add Node", connections={"a": "one", "b": "one"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ],
+    }
+
+
+def recorded_runs(project):
+    run_history.flush()
+    return run_history.runs(project)
+
+
+def test_runs_are_recorded_with_their_results(project):
+    run_workflow(sum_workflow(project, 1))
+    run_workflow(sum_workflow(project, 2))
+
+    runs = recorded_runs(project)
+    assert [run["status"] for run in runs] == ["ok", "ok"]
+    assert runs[0]["workflow"] == "sum.json"
+    run = run_history.run(project, runs[0]["run_id"])
+    assert run["nodes"]["result"]["value"] == 4
+    assert run["parameters"]["one"]["value"] == "2"
+
+    series = run_history.series(project, ["result"])["series"]["result"]
+    assert sorted(series["mean"]) == [2, 4]
+
+
+def test_failed_runs_are_recorded_as_errors(project):
+    workflow = {"project": project, "nodes": [node("bad", "Fail Node"), node("r", "Result Node", connections={"input": "bad"})]}
+    with pytest.raises(RuntimeError):
+        run_workflow(workflow)
+
+    (run,) = recorded_runs(project)
+    assert run["status"] == "error" and run["error"] == "node failed"
+
+
+def test_runs_without_a_project_are_not_recorded(project):
+    run_workflow(sum_workflow(None))
+
+    assert recorded_runs(project) == []
+
+
+def test_session_runs_are_recorded(project):
+    session = WorkflowSession(sum_workflow(project))
+    list(session.run())
+    session.apply_diff({"parameters": {"one": {"value": 3}}})
+    list(session.run())
+
+    runs = recorded_runs(project)
+    assert len(runs) == 2
+    assert run_history.run(project, runs[0]["run_id"])["nodes"]["result"]["value"] == 6
+
+
+def test_sweeps_and_streams_are_recorded(project):
+    list(run_sweep(sum_workflow(project), [{"node": "one", "parameter": "value", "values": [1, 2]}]))
+    stream = {
+        "project": project,
+        "nodes": [node("ramp", "Ramp Node"), node("result", "Result Node", connections={"input": "ramp"})],
+    }
+    list(run_stream(stream))
+
+    runs = recorded_runs(project)
+    assert [run["status"] for run in runs] == ["ok", "ok"]
+    assert run_history.run(project, runs[0]["run_id"])["nodes"]["result.samples"]["value"] == 10
+
+
+def test_session_diffs_switch_the_recorded_workflow(project, client):
+    import app
+
+    response = client.post("/api/sessions", json=sum_workflow(project)).get_json()
+    session_id = response["session"]
+    assert app.job_manager.get(response["token"]).wait_finished(10)
+    assert client.post(f"/api/sessions/{session_id}/diff", json={"priority": "urgent"}).status_code == 400
+    response = client.post(f"/api/sessions/{session_id}/diff", json={"workflow": "other.json", "priority": "high"})
+    assert app.job_manager.get(response.get_json()["token"]).wait_finished(10)
+
+    assert [run["workflow"] for run in recorded_runs(project)] == ["other.json", "sum.json"]
+    assert app.get_session(session_id).priority == "high"
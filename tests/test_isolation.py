@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from conftest import node
+from measnode.runner import run_workflow
+from measnode.scheduler import NodeTimeout, WorkerCrashed, isolated_pool
+
+
+def process_workflow(mode):
+    return {
+        "nodes": [
+            node("work", "Process Node", {"mode": mode}),
+            node("result", "Result Node", connections={"input": "work"}),
+        ]
+    }
+
+
+def test_process_nodes_run_in_a_worker_process():
+    pid = run_workflow(process_workflow("pid"))["results"]["result"]
+
+    assert pid != os.getpid()
+
+
+def test_crashed_workers_are_replaced():
+    restarts = isolated_pool.restarts
+    with pytest.raises(WorkerCrashed, match="exit code 3"):
+        run_workflow(process_workflow("crash"))
+
+    assert isolated_pool.restarts == restarts + 1
+    assert run_workflow(process_workflow("pid"))["results"]["result"] != os.getpid()
+
+
+def test_nodes_exceeding_their_timeout_are_stopped():
+    with pytest.raises(NodeTimeout, match="time limit of 2 s"):
+        run_workflow(process_workflow("hang"))
+
+    assert run_workflow(process_workflow("pid"))["results"]["result"] != os.getpid()
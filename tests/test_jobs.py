@@ -0,0 +1,80 @@
+import json
+import threading
+
+import pytest
+
+from conftest import node
+
+
+@pytest.fixture
+def app_module(client):
+    import app
+
+    return app
+
+
+def sum_workflow():
+    return {
+        "nodes": [
+            node("one", "Integer Node", {"value": 2}),
+            node("sum", "Add Node", connections={"a": "one", "b": "one"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+
+
+def execute(client, app_module, workflow):
+    token = client.post("/api/execute", json=workflow).get_json()["token"]
+    assert app_module.job_manager.get(token).wait_finished(10)
+    return token
+
+
+def stream_events(response):
+    return [block for block in response.get_data(as_text=True).split("\n\n") if block.startswith("id: ")]
+
+
+def test_jobs_run_without_a_subscriber(client, app_module):
+    token = execute(client, app_module, sum_workflow())
+
+    status = client.get(f"/api/jobs/{token}").get_json()
+    assert status["status"] == "finished"
+    assert json.loads(client.get(f"/api/jobs/{token}/results").data)["results"]["result"] == 4
+
+
+def test_streams_replay_from_an_offset_or_the_last_event_id(client, app_module):
+    token = execute(client, app_module, sum_workflow())
+
+    events = stream_events(client.get(f"/api/execute_stream?token={token}"))
+    assert events[0].startswith("id: 0\n") and "data: END " in events[-1]
+
+    resumed = stream_events(client.get(f"/api/execute_stream?token={token}", headers={"Last-Event-ID": "2"}))
+    assert resumed == events[3:]
+    assert stream_events(client.get(f"/api/execute_stream?token={token}&offset=1")) == events[1:]
+
+
+def test_unknown_tokens_are_rejected(client):
+    assert client.get("/api/execute_stream?token=missing").status_code == 400
+    assert client.get("/api/jobs/missing").status_code == 404
+
+
+def test_failing_jobs_end_with_an_error(client, app_module):
+    workflow = {"nodes": [node("bad", "Fail Node"), node("r", "Result Node", connections={"input": "bad"})]}
+    token = execute(client, app_module, workflow)
+
+    assert json.loads(client.get(f"/api/jobs/{token}/results").data)["error"] == "node failed"
+
+
+def test_full_queues_reject_new_jobs(app_module):
+    manager = app_module.JobManager(workers=1, queue_size=0, ttl=0)
+    release = threading.Event()
+
+    def blocking():
+        release.wait(5)
+        yield "data: END {}\n\n"
+
+    first = manager.submit("first", blocking())
+    assert manager.submit("second", blocking()) is None
+    release.set()
+    assert first.wait_finished(5)
+    # Finished jobs are evicted once their TTL has expired.
+    assert manager.get("first") is None
@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+
+from measnode.scheduler import current_node_id
+
+
+@pytest.fixture
+def app_module(client):
+    import app
+
+    return app
+
+
+def test_every_subscriber_reads_every_record(app_module):
+    bus = app_module.LogBus(4)
+    bus.publish({"levelno": logging.INFO, "node_id": None, "message": "first"})
+    bus.publish({"levelno": logging.INFO, "node_id": None, "message": "second"})
+
+    for _ in range(2):
+        entries, cursor, dropped = bus.read(0, timeout=0)
+        assert [entry["message"] for entry in entries] == ["first", "second"]
+        assert (cursor, dropped) == (2, 0)
+
+
+def test_slow_subscribers_skip_ahead_and_count_drops(app_module):
+    bus = app_module.LogBus(4)
+    for i in range(10):
+        bus.publish({"levelno": logging.INFO, "node_id": None, "message": str(i)})
+
+    entries, cursor, dropped = bus.read(0, timeout=0)
+    assert [entry["message"] for entry in entries] == ["6", "7", "8", "9"]
+    assert (cursor, dropped) == (10, 6)
+    assert bus.stats()["dropped"] == 6
+
+
+def test_records_carry_the_executing_node_and_can_be_filtered(app_module):
+    cursor = app_module.log_bus.next_seq
+    token = current_node_id.set("scope")
+    try:
+        logging.warning("from the node")
+    finally:
+        current_node_id.reset(token)
+    logging.info("from the server")
+
+    entries, _, dropped = app_module.log_bus.read(cursor, timeout=0)
+    assert [entry["node_id"] for entry in entries] == ["scope", None]
+    text = app_module.format_log_events(entries, dropped, logging.NOTSET, "scope")
+    assert "from the node" in text and "from the server" not in text
+    assert "from the server" not in app_module.format_log_events(entries, 0, logging.WARNING, None)
+    assert app_module.format_log_events(entries, 3, logging.NOTSET, None).startswith("data: [3 log messages dropped]")
+
+
+def test_invalid_log_stream_arguments_are_rejected(client):
+    assert client.get("/api/logs?level=LOUD").status_code == 400
+    assert client.get("/api/logs?since=soon").status_code == 400
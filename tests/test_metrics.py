@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+
+from conftest import node
+from measnode.metrics import NodeMetrics, NodeProfile, output_size
+from measnode.payloads import PayloadHandle
+from measnode.runner import run_workflow
+
+
+def test_profiles_separate_wall_and_cpu_time():
+    events = []
+    workflow = {
+        "nodes": [
+            node("wait", "Sleep Node", {"seconds": 0.2}),
+            node("result", "Result Node", connections={"input": "wait"}),
+        ]
+    }
+    outcome = run_workflow(workflow, on_event=lambda *event: events.append(event))
+
+    profile = outcome["profile"]["wait"]
+    assert profile["type"] == "Sleep Node"
+    assert profile["wall_ms"] >= 190 and profile["cpu_ms"] < 100
+    assert ("DONE", "wait", profile) in [(name, node_id, data) for name, node_id, data in events if data]
+
+
+def test_profile_json_matches_the_dict_form():
+    profile = NodeProfile('Quote " Node', cache="miss")
+    profile.start()
+    profile.stop()
+    profile.output_bytes = 12
+
+    assert json.loads(profile.as_json()) == profile.as_dict()
+
+
+def test_output_sizes():
+    assert output_size(np.zeros(10)) == 80
+    assert output_size(PayloadHandle("id", "<f4", (4, 5))) == 80
+    assert output_size({"a": np.zeros(2), "b": np.zeros(3)}) == 40
+
+
+def test_metrics_count_executions_hits_and_errors():
+    metrics = NodeMetrics()
+    for cache in ("miss", "hit", "skip"):
+        profile = NodeProfile("Add Node", cache)
+        profile.start()
+        profile.stop()
+        metrics.observe(profile)
+    metrics.observe_error("Add Node")
+
+    text = metrics.render()
+    assert 'measnode_node_executions_total{type="Add Node"} 2' in text
+    assert 'measnode_node_cache_hits_total{type="Add Node"} 1' in text
+    assert 'measnode_node_errors_total{type="Add Node"} 1' in text
+    assert 'measnode_node_wall_seconds_count{type="Add Node"} 2' in text
+
+
+def test_metrics_endpoint_includes_node_metrics(client):
+    run_workflow({"nodes": [node("one", "Integer Node"), node("r", "Result Node", connections={"input": "one"})]})
+
+    text = client.get("/api/metrics").get_data(as_text=True)
+    assert 'measnode_node_executions_total{type="Result Node"}' in text
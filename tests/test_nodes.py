@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from measnode.nodes import NodeRegistry
+from measnode.resources import resource_scheduler
+
+MODULE = """
+from measnode import BaseNode
+
+
+class Node(BaseNode):
+    title = "{title}"
+    outputs = [{{"name": "output", "type": "int"}}]
+"""
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    # A registry declares its resource capacities to the shared scheduler; restore them afterwards.
+    monkeypatch.setattr(resource_scheduler, "declared", dict(resource_scheduler.declared))
+    modules_dir = tmp_path / "modules"
+    modules_dir.mkdir()
+    return NodeRegistry(str(modules_dir), check_interval=0)
+
+
+def write_module(registry, name, title, mtime_ns):
+    path = os.path.join(registry.modules_dir, name)
+    with open(path, "w") as f:
+        f.write(MODULE.format(title=title))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_modules_are_imported_once_until_they_change(registry):
+    write_module(registry, "first.py", "First Node", 1_000_000_000)
+    registry.refresh()
+    cls, version, etag = registry.node_classes["First Node"], registry.version, registry.etag
+
+    registry.refresh()
+    assert registry.node_classes["First Node"] is cls
+    assert (registry.version, registry.etag) == (version, etag)
+
+    write_module(registry, "first.py", "Renamed Node", 2_000_000_000)
+    registry.refresh()
+    assert list(registry.node_classes) == ["Renamed Node"]
+    assert registry.version == version + 1 and registry.etag != etag
+
+
+def test_removed_modules_are_dropped(registry):
+    write_module(registry, "first.py", "First Node", 1_000_000_000)
+    write_module(registry, "second.py", "Second Node", 1_000_000_000)
+    registry.refresh()
+    os.remove(os.path.join(registry.modules_dir, "second.py"))
+    registry.refresh()
+
+    assert list(registry.node_classes) == ["First Node"]
+
+
+def test_scans_are_rate_limited(registry):
+    registry.check_interval = 60
+    registry.refresh()
+    write_module(registry, "first.py", "First Node", 1_000_000_000)
+
+    registry.refresh()
+    assert registry.node_classes == {}
+    registry.refresh(force=True)
+    assert list(registry.node_classes) == ["First Node"]
+
+
+def test_node_definitions_are_served_with_an_etag(client):
+    response = client.get("/api/nodes")
+    titles = [definition["title"] for definition in response.get_json()]
+
+    assert "Add Node" in titles
+    assert client.get("/api/nodes", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+import measnode.scheduler
+from conftest import node
+from measnode.runner import run_workflow
+from measnode.scheduler import get_workflow_plan
+
+
+def constant_sum_workflow():
+    return {
+        "nodes": [
+            node("one", "Integer Node", {"value": "1"}),
+            node("two", "Integer Node", {"value": "2"}),
+            node("sum", "Add Node", connections={"a": "one", "b": "two"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+
+
+def test_nodes_that_cannot_reach_a_result_are_pruned(node_classes):
+    workflow = constant_sum_workflow()
+    workflow["nodes"].append(node("dangling", "Sleep Node", {"seconds": 0}))
+
+    plan = get_workflow_plan(workflow)
+    run_workflow(workflow)
+
+    assert "dangling" not in plan.nodes
+    assert node_classes["Sleep Node"].calls == 0
+
+
+def test_cycles_are_reported_with_their_path():
+    workflow = {
+        "nodes": [
+            node("a", "Add Node", connections={"a": "b"}),
+            node("b", "Add Node", connections={"a": "a"}),
+            node("result", "Result Node", connections={"input": "a"}),
+        ]
+    }
+    with pytest.raises(ValueError, match="cycle"):
+        get_workflow_plan(workflow)
+
+
+def test_parameters_are_coerced_to_their_declared_type():
+    assert run_workflow(constant_sum_workflow())["results"]["result"] == 3
+
+    workflow = constant_sum_workflow()
+    workflow["nodes"][0]["parameters"]["value"] = "1.5"
+    with pytest.raises(ValueError, match="Invalid parameter 'value'"):
+        get_workflow_plan(workflow)
+
+
+def test_constants_are_not_folded_by_default(node_classes):
+    plan = get_workflow_plan(constant_sum_workflow())
+    outcome = run_workflow(constant_sum_workflow())
+
+    assert plan.constants == {}
+    assert node_classes["Add Node"].calls == 1
+    assert outcome["profile"]["sum"]["cache"] != "folded"
+
+
+def test_folding_evaluates_pure_constant_nodes_once(monkeypatch, node_classes):
+    monkeypatch.setattr(measnode.scheduler, "FOLD_CONSTANTS", True)
+
+    plan = get_workflow_plan(constant_sum_workflow())
+    outcome = run_workflow(constant_sum_workflow())
+
+    assert plan.constants == {"one": 1, "two": 2, "sum": 3}
+    assert outcome["results"]["result"] == 3
+    assert outcome["profile"]["sum"]["cache"] == "folded"
+    assert node_classes["Add Node"].calls == 1
+
+
+def test_folding_evaluates_process_nodes_on_the_isolated_pool(monkeypatch):
+    monkeypatch.setattr(measnode.scheduler, "FOLD_CONSTANTS", True)
+    workflow = {
+        "nodes": [
+            node("two", "Integer Node", {"value": "2"}),
+            node("ten", "Integer Node", {"value": "10"}),
+            node("power", "Power Node", connections={"a": "two", "b": "ten"}),
+            node("result", "Result Node", connections={"input": "power"}),
+        ]
+    }
+
+    plan = get_workflow_plan(workflow)
+    outcome = run_workflow(workflow)
+
+    assert plan.constants["power"] == 1024
+    assert outcome["results"]["result"] == 1024 and outcome["profile"]["power"]["cache"] == "folded"
+
+
+def test_folding_leaves_impure_branches_concurrent(monkeypatch):
+    monkeypatch.setattr(measnode.scheduler, "FOLD_CONSTANTS", True)
+    workflow = {
+        "nodes": [
+            node("one", "Integer Node", {"value": "1"}),
+            node("a", "Sleep Node", {"seconds": 0.4}, {"input": "one"}),
+            node("b", "Async Sleep Node", {"seconds": 0.4}, {"input": "one"}),
+            node("ra", "Result Node", connections={"input": "a"}),
+            node("rb", "Result Node", connections={"input": "b"}),
+        ]
+    }
+    started = time.perf_counter()
+    plan = get_workflow_plan(workflow)
+    run_workflow(workflow)
+
+    assert set(plan.constants) == {"one"}
+    assert time.perf_counter() - started < 0.7
@@ -0,0 +1,47 @@
+import json
+
+from conftest import node
+from measnode.runner import run_workflow
+from measnode.sweeps import run_sweep
+
+
+def divmod_workflow(a=17, b=5):
+    return {
+        "nodes": [
+            node("a", "Integer Node", {"value": a}),
+            node("b", "Integer Node", {"value": b}),
+            node("div", "DivMod Node", connections={"a": "a", "b": "b"}),
+            node("quotient", "Result Node", connections={"input": {"node": "div", "output": "quotient"}}),
+            node("remainder", "Result Node", connections={"input": {"node": "div", "output": "remainder"}}),
+            # A plain source id selects the first output.
+            node("first", "Result Node", connections={"input": "div"}),
+        ]
+    }
+
+
+def test_each_consumer_receives_its_output():
+    outcome = run_workflow(divmod_workflow())
+
+    results = outcome["results"]
+    assert (results["quotient"], results["remainder"], results["first"]) == (3, 2, 3)
+    assert results["div"] == {"quotient": 3, "remainder": 2}
+    assert outcome["order"].count("div") == 1
+
+
+def test_outputs_are_cached_separately():
+    run_workflow(divmod_workflow(17, 5))
+    outcome = run_workflow(divmod_workflow(19, 5))
+
+    # Only the remainder changed, so the quotient's consumers hit the cache.
+    assert outcome["profile"]["quotient"]["cache"] == "hit"
+    assert outcome["profile"]["first"]["cache"] == "hit"
+    assert outcome["profile"]["remainder"]["cache"] == "miss"
+    assert outcome["results"]["remainder"] == 4
+
+
+def test_sweeps_route_outputs_per_point():
+    events = list(run_sweep(divmod_workflow(), [{"node": "a", "parameter": "value", "values": [7, 8]}]))
+    (chunk,) = [json.loads(event[len("data: CHUNK ") :]) for event in events if event.startswith("data: CHUNK ")]
+
+    assert chunk["columns"]["quotient"] == [1, 1]
+    assert chunk["columns"]["remainder"] == [2, 3]
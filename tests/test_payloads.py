@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import measnode.payloads
+from conftest import node
+from measnode.payloads import PayloadHandle, encode_results, payload_store, resolve_payloads, store_large_payloads
+from measnode.runner import run_workflow
+
+
+@pytest.fixture(autouse=True)
+def small_payloads(monkeypatch, tmp_path):
+    """
+    Treats arrays of 64 bytes or more as large and keeps payload files in the test directory.
+    """
+    monkeypatch.setattr(measnode.payloads, "PAYLOAD_THRESHOLD", 64)
+    monkeypatch.setattr(payload_store, "directory", tmp_path / "payloads")
+
+
+def test_large_arrays_are_passed_by_handle():
+    array = np.arange(100.0)
+    handle = store_large_payloads(array)
+
+    assert isinstance(handle, PayloadHandle) and handle.shape == (100,)
+    loaded = resolve_payloads(handle)
+    assert np.array_equal(loaded, array) and not loaded.flags.writeable
+    # A loaded payload passed through a node is not stored again.
+    assert store_large_payloads(loaded).payload_id == handle.payload_id
+    assert store_large_payloads(np.arange(3.0)).tolist() == [0, 1, 2]
+
+
+def test_shared_arrays_are_encoded_once():
+    array = np.arange(100.0)
+    encoded = encode_results({"a": array, "b": array, "small": np.arange(2), "scalar": np.float64(1.5)})
+
+    assert encoded["a"] == encoded["b"] and encoded["a"]["shape"] == [100]
+    assert encoded["small"] == [0, 1] and encoded["scalar"] == 1.5
+
+
+def test_unknown_payloads_raise_key_error():
+    with pytest.raises(KeyError):
+        payload_store.load("missing")
+    with pytest.raises(KeyError):
+        payload_store.load("../etc/passwd")
+
+
+def test_payload_endpoints_serve_ranges_and_previews(client):
+    workflow = {
+        "nodes": [
+            node("array", "Array Node", {"size": 100}),
+            node("sum", "Sum Node", connections={"input": "array"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+    results = run_workflow(workflow)["results"]
+    assert results["result"] == 4950
+    payload_id = results["array"]["$payload"]
+
+    response = client.get(f"/api/payloads/{payload_id}?start=10&stop=13")
+    assert response.headers["X-Payload-Shape"] == "3"
+    assert np.frombuffer(response.data, dtype=response.headers["X-Payload-Dtype"]).tolist() == [10, 11, 12]
+
+    preview = client.get(f"/api/payloads/{payload_id}/preview?points=10").get_json()
+    assert preview["step"] == 10 and preview["min"][:2] == [0, 10] and preview["max"][-1] == 99
+    assert client.get("/api/payloads/missing").status_code == 404
@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+
+from conftest import node
+
+
+@pytest.fixture
+def app_module(client):
+    import app
+
+    return app
+
+
+def execute(client, app_module, workflow):
+    token = client.post("/api/execute", json=workflow).get_json()["token"]
+    assert app_module.job_manager.get(token).wait_finished(10)
+    return token
+
+
+def wide_workflow(count):
+    nodes = [node(f"n{i}", "Integer Node", {"value": i}) for i in range(count)]
+    nodes += [node(f"r{i}", "Result Node", connections={"input": f"n{i}"}) for i in range(count)]
+    return {"nodes": nodes}
+
+
+def test_frames_coalesce_node_state_changes(app_module):
+    job = app_module.Job("token", None)
+    events = [
+        "data: PROCESSING a\n\n",
+        "data: PROCESSING b\n\n",
+        'data: DONE a {"wall_ms": 1}\n\n',
+        "data: CHUNK b 1\n\n",
+        'data: END {"results": {}}\n\n',
+    ]
+
+    text = app_module.format_progress_frame(job, events, 10)
+
+    assert text == (
+        'data: PROGRESS {"p": ["b"], "d": ["a"]}\n\n'
+        "data: CHUNK b 1\n\n"
+        'id: 14\ndata: END {"results": "/api/jobs/token/results", "error": null}\n\n'
+    )
+
+
+def test_progress_arguments(client, app_module):
+    token = execute(client, app_module, wide_workflow(1))
+    job = app_module.job_manager.get(token)
+
+    assert app_module.parse_progress_args({"token": token}, {}) == (job, 0, app_module.PROGRESS_INTERVAL, False)
+    gzip_headers = {"Accept-Encoding": "gzip, deflate"}
+    args = {"token": token, "interval": "100", "compress": "1"}
+    assert app_module.parse_progress_args(args, gzip_headers) == (job, 0, 10.0, True)
+    # Clients that do not accept gzip get the stream uncompressed.
+    assert app_module.parse_progress_args(args, {})[3] is False
+    with pytest.raises(ValueError, match="Invalid interval"):
+        app_module.parse_progress_args({"token": token, "interval": "soon"}, {})
+
+
+def test_gzipped_progress_stream_and_results(client, app_module):
+    token = execute(client, app_module, wide_workflow(50))
+
+    response = client.get(
+        f"/api/execute_progress?token={token}&compress=1&interval=0.01", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    text = gzip.decompress(response.data).decode()
+    done = []
+    for line in text.splitlines():
+        if line.startswith("data: PROGRESS "):
+            done += json.loads(line[len("data: PROGRESS "):])["d"]
+    assert len(done) == len(set(done)) == 100
+    end = json.loads(text.rsplit("data: END ", 1)[1])
+    assert end == {"results": f"/api/jobs/{token}/results", "error": None}
+
+    response = client.get(end["results"], headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))["results"]["r49"] == 49
+
+
+def test_results_of_running_jobs_are_not_available(client, app_module):
+    workflow = {"nodes": [node("wait", "Sleep Node", {"seconds": 0.3})]}
+    token = client.post("/api/execute", json=workflow).get_json()["token"]
+
+    assert client.get(f"/api/jobs/{token}/results").status_code == 409
+    assert client.get("/api/jobs/missing/results").status_code == 404
+    assert client.get("/api/execute_progress?token=missing").status_code == 400
+    assert app_module.job_manager.get(token).wait_finished(10)
@@ -0,0 +1,120 @@
+import time
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from measnode.resources import ResourceScheduler, check_priority, parse_capacities
+
+
+class Executions:
+    """
+    Dispatch callables for a scheduler; each records its start and returns a future the test completes.
+    """
+
+    def __init__(self):
+        self.started = []
+        self.running = {}
+
+    def dispatch(self, name):
+        def start():
+            self.started.append(name)
+            future = self.running[name] = Future()
+            future.set_running_or_notify_cancel()
+            return future
+
+        return start
+
+    def finish(self, name, result=None):
+        self.running.pop(name).set_result(result)
+
+
+def test_capacities_and_priorities():
+    assert parse_capacities("scope=1, dmm=2,lock") == {"scope": 1, "dmm": 2, "lock": 1}
+    assert parse_capacities("") == {}
+    with pytest.raises(ValueError, match="Invalid resource capacity"):
+        parse_capacities("scope=many")
+    assert check_priority(None) == "normal" and check_priority("high") == "high"
+    with pytest.raises(ValueError, match="Invalid priority"):
+        check_priority("urgent")
+
+
+def test_resources_are_limited_to_their_capacity():
+    scheduler = ResourceScheduler({"dmm": 2})
+    executions = Executions()
+    futures = [scheduler.submit({"dmm": 1}, executions.dispatch(name)) for name in "abc"]
+
+    assert executions.started == ["a", "b"] and scheduler.stats()["resources"]["dmm"]["waiting"] == 1
+    executions.finish("a", 1)
+    assert futures[0].result() == 1 and executions.started == ["a", "b", "c"]
+    executions.finish("b", 2)
+    executions.finish("c", 3)
+    assert futures[2].result() == 3
+    stats = scheduler.stats()["resources"]["dmm"]
+    assert (stats["capacity"], stats["in_use"], stats["acquired"]) == (2, 0, 3)
+    with pytest.raises(ValueError, match="has capacity 2"):
+        scheduler.submit({"dmm": 3}, executions.dispatch("d"))
+
+
+def test_waiting_nodes_start_by_priority_then_fair_share():
+    scheduler = ResourceScheduler({"scope": 1})
+    executions = Executions()
+    scheduler.submit({"scope": 1}, executions.dispatch("first"), project="a")
+    scheduler.submit({"scope": 1}, executions.dispatch("a-low"), "low", "a")
+    scheduler.submit({"scope": 1}, executions.dispatch("a-1"), project="a")
+    scheduler.submit({"scope": 1}, executions.dispatch("a-2"), project="a")
+    scheduler.submit({"scope": 1}, executions.dispatch("b-1"), project="b")
+    scheduler.submit({"scope": 1}, executions.dispatch("a-high"), "high", "a")
+
+    waiting = scheduler.stats()["waiting"]
+    assert waiting["priority"] == {"high": 1, "normal": 3, "low": 1} and waiting["project"] == {"a": 4, "b": 1}
+    for name in ["first", "a-high", "b-1", "a-1", "a-2"]:
+        executions.finish(name)
+    # Project b started last, so project a goes next; low priority waits for all others.
+    assert executions.started == ["first", "a-high", "b-1", "a-1", "a-2", "a-low"]
+
+
+def test_cancelled_requests_are_withdrawn():
+    scheduler = ResourceScheduler({"scope": 1})
+    executions = Executions()
+    scheduler.submit({"scope": 1}, executions.dispatch("first"))
+    waiting = scheduler.submit({"scope": 1}, executions.dispatch("cancelled"))
+
+    assert waiting.cancel()
+    executions.finish("first")
+    assert executions.started == ["first"] and scheduler.waiting == 0
+
+
+def test_hold_blocks_until_the_resource_is_free():
+    scheduler = ResourceScheduler({"scope": 1})
+    entered, leave = threading.Event(), threading.Event()
+    order = []
+
+    def holder(name, event=None):
+        with scheduler.hold({"scope": 1}):
+            order.append(name)
+            if event is not None:
+                entered.set()
+                event.wait(5)
+
+    first = threading.Thread(target=holder, args=("first", leave))
+    first.start()
+    assert entered.wait(5)
+    second = threading.Thread(target=holder, args=("second",))
+    second.start()
+    while not scheduler.waiting:
+        time.sleep(0.01)
+
+    assert order == ["first"]
+    leave.set()
+    first.join(5)
+    second.join(5)
+    assert order == ["first", "second"] and scheduler.stats()["resources"]["scope"]["in_use"] == 0
+
+
+def test_resources_endpoint_and_invalid_priorities(client):
+    stats = client.get("/api/resources").get_json()
+
+    assert "executor" in stats["resources"] and set(stats["waiting"]["priority"]) == {"high", "normal", "low"}
+    response = client.post("/api/execute", json={"nodes": [], "priority": "urgent"})
+    assert response.status_code == 400 and "Invalid priority" in response.get_json()["error"]
@@ -0,0 +1,45 @@
+import measnode.storage
+from measnode.storage import document_hash, patch_workflow, workflow_head, write_workflow
+
+DOCUMENT = {"nodes": [{"id": "a", "type": "Integer Node"}], "wires": []}
+
+
+def test_full_saves_store_the_content_hash(workdir):
+    path = workdir / "flow.json"
+    revision, digest = write_workflow(path, DOCUMENT)
+
+    assert (revision, digest) == (1, document_hash(DOCUMENT))
+    assert write_workflow(path, DOCUMENT)[1] == digest
+
+
+def test_heads_are_answered_without_reading_unchanged_files(workdir, monkeypatch):
+    path = workdir / "flow.json"
+    write_workflow(path, DOCUMENT)
+    status = patch_workflow(path, [{"op": "set", "key": "name", "value": "x"}])
+
+    def fail(path):
+        raise AssertionError("workflow was read")
+
+    monkeypatch.setattr(measnode.storage, "read_workflow", fail)
+    assert workflow_head(path) == (2, status["hash"])
+
+
+def test_saves_from_an_old_revision_are_rejected(client, project):
+    save = {"project": project, "workflow": "flow", "data": DOCUMENT}
+    first = client.post("/api/workflows/save", json=save).get_json()
+    client.post("/api/workflows/save", json={**save, "baseRevision": first["revision"]})
+
+    response = client.post("/api/workflows/save", json={**save, "baseRevision": first["revision"]})
+    assert response.status_code == 409
+    assert response.get_json()["revision"] == first["revision"] + 1
+
+
+def test_unchanged_workflows_revalidate_with_304(client, project):
+    client.post("/api/workflows/save", json={"project": project, "workflow": "flow", "data": DOCUMENT})
+    response = client.get(f"/api/workflows/{project}/flow")
+    etag = response.headers["ETag"]
+
+    assert response.get_json()["hash"] in etag
+    assert client.get(f"/api/workflows/{project}/flow", headers={"If-None-Match": etag}).status_code == 304
+    client.patch(f"/api/workflows/{project}/flow", json={"ops": [{"op": "set", "key": "name", "value": "x"}]})
+    assert client.get(f"/api/workflows/{project}/flow", headers={"If-None-Match": etag}).status_code == 200
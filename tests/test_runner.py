@@ -0,0 +1,67 @@
+import json
+
+from measnode.cli import main
+from measnode.runner import run_workflow_file, run_workflow_files, workflow_from_document
+
+DOCUMENT = {
+    "nodes": [
+        {"id": "one", "type": "Integer Node", "parameters": {"value": 4}},
+        {"id": "sum", "type": "Add Node", "parameters": {}},
+        {"id": "result", "type": "Result Node", "parameters": {}},
+    ],
+    "wires": [
+        {"fromNode": "one", "fromAnchor": "output", "toNode": "sum", "toAnchor": "a"},
+        {"fromNode": "one", "fromAnchor": "output", "toNode": "sum", "toAnchor": "b"},
+        {"fromNode": "sum", "fromAnchor": "output", "toNode": "result", "toAnchor": "input"},
+    ],
+}
+
+
+def save_workflow(workdir, name="add.json", document=DOCUMENT):
+    folder = workdir / "projects" / "demo"
+    folder.mkdir(exist_ok=True)
+    (folder / name).write_text(json.dumps(document))
+    return folder / name
+
+
+def test_saved_wires_become_connections():
+    workflow = workflow_from_document(DOCUMENT, project="demo")
+
+    assert workflow["project"] == "demo"
+    assert workflow["nodes"][1]["connections"] == {
+        "a": {"node": "one", "output": "output"},
+        "b": {"node": "one", "output": "output"},
+    }
+
+
+def test_workflow_files_report_their_outcome(workdir):
+    record = run_workflow_file(save_workflow(workdir))
+    assert record["status"] == "ok" and record["results"]["result"] == 8
+
+    broken = {
+        "nodes": [{"id": "bad", "type": "Fail Node"}, {"id": "r", "type": "Result Node"}],
+        "wires": [{"fromNode": "bad", "fromAnchor": "output", "toNode": "r", "toAnchor": "input"}],
+    }
+    record = run_workflow_file(save_workflow(workdir, "broken.json", broken))
+    assert record["status"] == "error" and record["error"] == "node failed"
+
+
+def test_several_files_run_concurrently(workdir):
+    paths = [save_workflow(workdir, f"add{i}.json") for i in range(4)]
+    events = []
+    records = list(run_workflow_files(paths, jobs=2, on_event=lambda *event: events.append(event)))
+
+    assert sorted(record["workflow"] for record in records) == sorted(map(str, paths))
+    assert {event[0] for event in events} == set(map(str, paths))
+
+
+def test_cli_prints_one_line_per_workflow(workdir, capsys):
+    save_workflow(workdir)
+
+    assert main(["run", "demo/add.json", "missing.json"]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    # Paths that do not exist are looked up under ./projects.
+    assert {record["workflow"]: record["status"] for record in records} == {
+        "projects/demo/add.json": "ok",
+        "missing.json": "error",
+    }
@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import node
+from measnode.runner import run_workflow
+from measnode.scheduler import _plan_cache, get_workflow_plan
+
+
+def test_independent_branches_run_concurrently():
+    workflow = {
+        "nodes": [
+            node("a", "Sleep Node", {"seconds": 0.5}),
+            node("b", "Sleep Node", {"seconds": 0.5}),
+            node("ra", "Result Node", connections={"input": "a"}),
+            node("rb", "Result Node", connections={"input": "b"}),
+        ]
+    }
+    started = time.perf_counter()
+    outcome = run_workflow(workflow)
+    elapsed = time.perf_counter() - started
+
+    assert outcome["results"]["ra"] == 1 and outcome["results"]["rb"] == 1
+    assert elapsed < 0.9
+
+
+def test_dependencies_complete_before_their_dependents():
+    workflow = {
+        "nodes": [
+            node("one", "Integer Node", {"value": 1}),
+            node("first", "Sleep Node", {"seconds": 0.05}, {"input": "one"}),
+            node("second", "Sleep Node", {"seconds": 0}, {"input": "first"}),
+            node("sum", "Add Node", connections={"a": "second", "b": "one"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+    outcome = run_workflow(workflow)
+
+    order = outcome["order"]
+    assert outcome["results"]["result"] == 4
+    assert order.index("first") < order.index("second") < order.index("sum") < order.index("result")
+
+
+def test_unconnected_inputs_default_to_zero():
+    workflow = {"nodes": [node("sum", "Add Node"), node("result", "Result Node", connections={"input": "sum"})]}
+
+    assert run_workflow(workflow)["results"]["result"] == 0
+
+
+def test_node_error_fails_the_run():
+    workflow = {
+        "nodes": [
+            node("bad", "Fail Node"),
+            node("result", "Result Node", connections={"input": "bad"}),
+        ]
+    }
+    with pytest.raises(RuntimeError, match="node failed"):
+        run_workflow(workflow)
+
+
+def test_cached_plans_give_each_run_its_own_node_instances():
+    workflow = {
+        "nodes": [
+            node("one", "Integer Node", {"value": 2}),
+            node("sum", "Add Node", connections={"a": "one", "b": "one"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+    first, second = get_workflow_plan(workflow), get_workflow_plan(workflow)
+
+    assert first.slots[0] is not second.slots[0]
+    assert first.nodes["sum"].input_connections["a"][0] is first.nodes["one"]
+    with ThreadPoolExecutor(4) as pool:
+        outcomes = list(pool.map(lambda _: run_workflow(workflow), range(8)))
+
+    assert all(outcome["results"]["result"] == 4 for outcome in outcomes)
+    # Result Node writes its result parameter; the cached plan's instance stays untouched.
+    (cached,) = _plan_cache.values()
+    assert cached.nodes["result"].parameters["result"] == 0
@@ -0,0 +1,108 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+from conftest import node
+import measnode.server
+from measnode.server import MeasNodeASGI, build_environ, serve
+
+
+@pytest.fixture
+def asgi(client, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app.job_manager, "draining", False)
+    server = MeasNodeASGI(app, threads=4)
+    yield server
+    if server.hub is not None:
+        server.hub.shutdown()
+    server.executor.shutdown(wait=False)
+
+
+def scope(method, path, query=b"", headers=()):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    }
+
+
+async def call(asgi, request_scope, body=b""):
+    """
+    Sends one request to the ASGI app and returns (status, body). The client never disconnects.
+    """
+    received = False
+    messages = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi(request_scope, receive, send)
+    return messages[0]["status"], b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def test_build_environ_maps_the_scope():
+    environ = build_environ(
+        scope("POST", "/api/execute", b"a=1", [("content-type", "application/json"), ("x-token", "t")]), b"{}"
+    )
+
+    assert environ["PATH_INFO"] == "/api/execute" and environ["QUERY_STRING"] == "a=1"
+    assert environ["CONTENT_TYPE"] == "application/json" and environ["CONTENT_LENGTH"] == "2"
+    assert environ["HTTP_X_TOKEN"] == "t" and environ["wsgi.input"].read() == b"{}"
+
+
+def test_requests_and_execution_streams(asgi):
+    workflow = {"nodes": [node("one", "Integer Node", {"value": 3}), node("r", "Result Node", connections={"input": "one"})]}
+
+    async def run():
+        status, body = await call(asgi, scope("GET", "/api/nodes"))
+        assert status == 200 and "Add Node" in body.decode()
+
+        headers = [("content-type", "application/json")]
+        status, body = await call(asgi, scope("POST", "/api/execute", headers=headers), json.dumps(workflow).encode())
+        token = json.loads(body)["token"]
+        status, body = await call(asgi, scope("GET", "/api/execute_stream", f"token={token}".encode()))
+        return status, body.decode()
+
+    status, text = asyncio.run(run())
+    end = json.loads(text.rsplit("data: END ", 1)[1])
+    assert status == 200 and end["results"]["r"] == 3
+
+
+def test_invalid_stream_arguments_are_rejected(asgi):
+    status, body = asyncio.run(call(asgi, scope("GET", "/api/execute_stream", b"token=missing")))
+
+    assert (status, body) == (400, b"Invalid token")
+
+
+def test_log_streams_cost_no_threads_and_end_on_shutdown(asgi):
+    async def run():
+        streams = [asyncio.ensure_future(call(asgi, scope("GET", "/api/logs"))) for _ in range(50)]
+        while asgi.hub is None or len(asgi.hub.log_streams) < 50:
+            await asyncio.sleep(0.01)
+        threads = threading.active_count()
+        asgi.begin_shutdown()
+        results = await asyncio.wait_for(asyncio.gather(*streams), timeout=5)
+        return threads, results
+
+    threads, results = asyncio.run(run())
+    assert threads < 50
+    assert all(status == 200 and body.startswith(b": connected") for status, body in results)
+
+
+def test_serve_names_the_extra_when_uvicorn_is_missing(monkeypatch, capsys):
+    monkeypatch.setattr(measnode.server, "uvicorn", None)
+
+    assert serve() == 2
+    assert "measnode[server]" in capsys.readouterr().err
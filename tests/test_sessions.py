@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from conftest import node
+from measnode.runner import run_workflow
+from measnode.sessions import WorkflowSession
+
+
+def run_session(session):
+    """
+    Runs a session and returns the payload of its END event.
+    """
+    events = list(session.run())
+    return json.loads(events[-1].removeprefix("data: END "))
+
+
+def chain_workflow():
+    return {
+        "nodes": [
+            node("one", "Integer Node", {"value": 1}),
+            node("sum", "Add Node", connections={"a": "one", "b": "one"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+
+
+def test_parameter_change_reruns_only_downstream_nodes(node_classes):
+    session = WorkflowSession(chain_workflow())
+    assert run_session(session)["results"]["result"] == 2
+
+    invalidated = session.apply_diff({"parameters": {"one": {"value": 5}}})
+    end = run_session(session)
+
+    assert invalidated == ["one", "result", "sum"]
+    assert end["results"]["result"] == 10
+    assert node_classes["Add Node"].calls == 2
+
+
+def test_unchanged_session_reruns_nothing(node_classes):
+    session = WorkflowSession(chain_workflow())
+    run_session(session)
+
+    assert session.apply_diff({}) == []
+    assert run_session(session)["order"] == []
+    assert node_classes["Add Node"].calls == 1
+
+
+def test_type_change_keeps_downstream_wires():
+    session = WorkflowSession(chain_workflow())
+    run_session(session)
+
+    # The client reports a type change as removing and re-adding the same id.
+    replacement = node("sum", "Sleep Node", {"seconds": 0}, {"input": "one"})
+    invalidated = session.apply_diff({"removedNodes": ["sum"], "addedNodes": [replacement]})
+    end = run_session(session)
+
+    assert invalidated == ["result", "sum"]
+    assert session.node_data["result"]["connections"] == {"input": "sum"}
+    assert end["results"]["result"] == 2
+
+
+def test_removed_node_disconnects_its_dependents():
+    session = WorkflowSession(chain_workflow())
+    run_session(session)
+
+    invalidated = session.apply_diff({"removedNodes": ["sum"]})
+
+    assert invalidated == ["result"]
+    assert run_session(session)["results"]["result"] == 0
+
+
+def test_sessions_compile_like_executions(node_classes):
+    workflow = chain_workflow()
+    workflow["nodes"][0]["parameters"]["value"] = "1"
+    workflow["nodes"].append(node("dangling", "Sleep Node", {"seconds": 0}))
+    run_workflow(workflow)
+
+    session = WorkflowSession(workflow)
+    end = run_session(session)
+
+    # Coerced parameters give the same cache keys as /api/execute, and dead nodes never run.
+    assert end["profile"]["sum"]["cache"] == "hit" and end["results"]["result"] == 2
+    assert "dangling" not in session.plan.nodes
+    assert node_classes["Sleep Node"].calls == 0
+
+
+def test_invalid_diffs_leave_the_session_unchanged():
+    session = WorkflowSession(chain_workflow())
+    run_session(session)
+
+    with pytest.raises(ValueError, match="Invalid parameter 'value'"):
+        session.apply_diff({"parameters": {"one": {"value": "1.5"}}, "removedNodes": ["sum"]})
+    assert session.node_data["one"]["parameters"] == {"value": 1} and "sum" in session.node_data
+
+    session.apply_diff({"addedWires": [{"fromNode": "sum", "toNode": "sum", "toAnchor": "b"}]})
+    with pytest.raises(ValueError, match="cycle"):
+        run_session(session)
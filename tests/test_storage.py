@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+import measnode.storage
+from measnode.storage import (
+    WorkflowConflict,
+    WorkflowPatchError,
+    compact_workflow,
+    journal_path,
+    patch_workflow,
+    read_workflow,
+    write_workflow,
+)
+
+DOCUMENT = {"nodes": [{"id": "a", "type": "Integer Node"}, {"id": "b", "type": "Result Node"}], "wires": []}
+WIRE = {"fromNode": "a", "fromAnchor": "output", "toNode": "b", "toAnchor": "input"}
+
+
+@pytest.mark.parametrize("fmt", ["json", "compact", "gzip"])
+def test_every_format_reads_back(workdir, fmt):
+    path = workdir / "flow.json"
+    assert write_workflow(path, DOCUMENT, fmt)[0] == 1
+
+    document = read_workflow(path)
+    assert document["nodes"] == DOCUMENT["nodes"] and document["revision"] == 1
+    assert not list(workdir.glob(".*.tmp"))
+
+
+def test_msgpack_files_name_the_extra_when_msgpack_is_missing(workdir, monkeypatch):
+    monkeypatch.setattr(measnode.storage, "msgpack", None)
+    path = workdir / "flow.json"
+    path.write_bytes(b"\x81\xa5nodes\x90")  # msgpack for {"nodes": []}
+
+    with pytest.raises(ValueError, match=r"measnode\[msgpack\]"):
+        read_workflow(path)
+
+
+def test_edits_are_journaled_and_replayed(workdir):
+    path = workdir / "flow.json"
+    write_workflow(path, DOCUMENT)
+    size = path.stat().st_size
+    ops = [{"op": "add_wire", "wire": WIRE}, {"op": "update_node", "id": "a", "fields": {"x": 10}}]
+
+    status = patch_workflow(path, ops, base_revision=1)
+
+    assert status["revision"] == 2 and not status["compacted"]
+    assert path.stat().st_size == size
+    document = read_workflow(path)
+    assert document["wires"] == [WIRE] and document["nodes"][0]["x"] == 10
+    assert document["revision"] == 2 and document["hash"] == status["hash"]
+
+    compact_workflow(path)
+    assert not journal_path(path).exists()
+    assert read_workflow(path) == document
+
+
+def test_removing_a_node_removes_its_wires(workdir):
+    path = workdir / "flow.json"
+    write_workflow(path, {**DOCUMENT, "wires": [WIRE]})
+    patch_workflow(path, [{"op": "remove_node", "id": "a"}])
+
+    document = read_workflow(path)
+    assert [node["id"] for node in document["nodes"]] == ["b"] and document["wires"] == []
+
+
+def test_stale_saves_are_rejected(workdir):
+    path = workdir / "flow.json"
+    write_workflow(path, DOCUMENT)
+    write_workflow(path, DOCUMENT, base_revision=1)
+
+    with pytest.raises(WorkflowConflict) as conflict:
+        patch_workflow(path, [{"op": "set", "key": "name", "value": "x"}], base_revision=1)
+    assert conflict.value.revision == 2
+
+
+def test_malformed_ops_are_rejected(workdir):
+    path = workdir / "flow.json"
+    write_workflow(path, DOCUMENT)
+    with pytest.raises(WorkflowPatchError):
+        patch_workflow(path, [{"op": "explode"}])
+    with pytest.raises(WorkflowPatchError):
+        patch_workflow(path, [{"op": "set", "key": "nodes", "value": []}])
+
+
+def test_torn_journal_entries_are_ignored_and_dropped(workdir):
+    path = workdir / "flow.json"
+    write_workflow(path, DOCUMENT)
+    patch_workflow(path, [{"op": "set", "key": "name", "value": "first"}])
+    with open(journal_path(path), "a") as f:
+        f.write('{"ops": [{"op": "set", "key": "na')
+
+    assert read_workflow(path)["name"] == "first"
+    patch_workflow(path, [{"op": "set", "key": "name", "value": "second"}])
+    assert read_workflow(path)["name"] == "second"
+
+
+def test_large_journals_are_compacted(workdir, monkeypatch):
+    monkeypatch.setattr(measnode.storage, "JOURNAL_MIN_BYTES", 0)
+    path = workdir / "flow.json"
+    write_workflow(path, DOCUMENT, "compact")
+    node = {"id": "c", "type": "Integer Node", "parameters": {"value": "x" * 500}}
+
+    status = patch_workflow(path, [{"op": "upsert_node", "node": node}])
+
+    assert status["compacted"] and not journal_path(path).exists()
+    assert json.loads(path.read_bytes())["nodes"][-1] == node
+    document = read_workflow(path)
+    assert (document["revision"], document["hash"]) == (status["revision"], status["hash"])
+
+
+def test_patch_endpoint_reports_conflicts(client, project, workdir):
+    write_workflow(workdir / "projects" / project / "flow.json", DOCUMENT)
+    ops = [{"op": "add_wire", "wire": WIRE}]
+
+    response = client.patch(f"/api/workflows/{project}/flow", json={"ops": ops, "baseRevision": 1})
+    assert response.status_code == 200 and response.get_json()["revision"] == 2
+
+    response = client.patch(f"/api/workflows/{project}/flow", json={"ops": ops, "baseRevision": 1})
+    assert response.status_code == 409 and response.get_json()["revision"] == 2
+    assert client.patch(f"/api/workflows/{project}/flow", json={"ops": [{"op": "?"}]}).status_code == 400
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from conftest import node
+from measnode.streaming import StreamSummary, run_stream
+
+
+def stream_end(workflow):
+    """
+    Runs a workflow in streaming mode and returns its event names and END payload.
+    """
+    names, end = [], None
+    for event in run_stream(workflow):
+        name, _, payload = event[len("data: ") :].strip().partition(" ")
+        names.append(name)
+        if name == "END":
+            end = json.loads(payload)
+    return names, end
+
+
+def test_stream_nodes_combine_chunks_with_static_values():
+    workflow = {
+        "nodes": [
+            node("ramp", "Ramp Node", {"samples": 10, "chunk": 4}),
+            node("offset", "Integer Node", {"value": 5}),
+            node("sum", "Add Node", connections={"a": "ramp", "b": "offset"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+    names, end = stream_end(workflow)
+
+    assert end["results"]["result"] == {"samples": 10, "min": 5, "max": 14, "mean": 9.5, "last": 14}
+    assert end["results"]["offset"] == 5
+    assert end["throughput"]["ramp"] == {"chunks": 3, "samples": 10}
+    assert end["order"][0] == "offset"
+    assert names.count("PROCESSING") == names.count("DONE") == 4
+
+
+def test_stream_errors_stop_the_stream():
+    workflow = {
+        "nodes": [
+            node("ramp", "Ramp Node", {"samples": 1000, "chunk": 1}),
+            node("bad", "Fail Node", connections={"input": "ramp"}),
+            node("result", "Result Node", connections={"input": "bad"}),
+        ]
+    }
+    with pytest.raises(RuntimeError, match="bad: node failed"):
+        stream_end(workflow)
+
+
+def test_stream_summary_keeps_running_statistics():
+    summary = StreamSummary()
+    summary.add([3, 1])
+    summary.add([])
+    summary.add([8])
+
+    assert summary.as_dict() == {"samples": 3, "min": 1, "max": 8, "mean": 4.0, "last": 8}
@@ -0,0 +1,104 @@
+import json
+import asyncio
+
+import numpy as np
+import pytest
+
+from conftest import node
+from measnode.sweeps import run_sweep, sweep_values
+
+
+def sweep_chunks(workflow, sweeps, mode="grid", chunk_size=4096):
+    """
+    Runs a sweep and returns the payloads of its CHUNK events and of its END event.
+    """
+    chunks, end = [], None
+    for event in run_sweep(workflow, sweeps, mode, chunk_size):
+        kind, _, payload = event[len("data: ") :].strip().partition(" ")
+        if kind == "CHUNK":
+            chunks.append(json.loads(payload))
+        elif kind == "END":
+            end = json.loads(payload)
+    return chunks, end
+
+
+def sum_workflow():
+    return {
+        "nodes": [
+            node("x", "Integer Node"),
+            node("y", "Integer Node"),
+            node("sum", "Add Node", connections={"a": "x", "b": "y"}),
+            node("result", "Result Node", connections={"input": "sum"}),
+        ]
+    }
+
+
+def test_sweep_values_accepts_lists_ranges_and_linspaces():
+    assert sweep_values({"values": [3, 1]}) == [3, 1]
+    assert sweep_values({"start": 0, "stop": 5, "step": 2}) == [0, 2, 4]
+    assert sweep_values({"start": 0, "stop": 1, "num": 3}) == [0, 0.5, 1]
+    with pytest.raises(ValueError):
+        sweep_values({"start": 0, "stop": 1, "step": 0})
+
+
+def test_grid_sweep_runs_each_node_once_per_chunk(node_classes):
+    sweeps = [
+        {"node": "x", "parameter": "value", "values": [1, 2, 3]},
+        {"node": "y", "parameter": "value", "values": [10, 20]},
+    ]
+    chunks, end = sweep_chunks(sum_workflow(), sweeps, chunk_size=4)
+
+    assert end["size"] == 6
+    assert [chunk["size"] for chunk in chunks] == [4, 2]
+    assert sum((chunk["columns"]["result"] for chunk in chunks), []) == [11, 21, 12, 22, 13, 23]
+    # Add Node is vectorized, so its per-point execute() never runs.
+    assert node_classes["Add Node"].calls == 0
+
+
+def test_zip_sweep_pairs_values_by_index():
+    sweeps = [
+        {"node": "x", "parameter": "value", "values": [1, 2, 3]},
+        {"node": "y", "parameter": "value", "values": [10, 20]},
+    ]
+    (chunk,), end = sweep_chunks(sum_workflow(), sweeps, mode="zip")
+
+    assert end["size"] == 2
+    assert chunk["columns"]["x.value"] == [1, 2]
+    assert chunk["columns"]["result"] == [11, 22]
+
+
+def test_nodes_without_execute_batch_run_once_per_point(node_classes):
+    workflow = {
+        "nodes": [
+            node("x", "Integer Node"),
+            node("step", "Sleep Node", {"seconds": 0}, {"input": "x"}),
+            node("result", "Result Node", connections={"input": "step"}),
+        ]
+    }
+    (chunk,), _ = sweep_chunks(workflow, [{"node": "x", "parameter": "value", "start": 0, "stop": 3}])
+
+    assert chunk["columns"]["result"] == [1, 2, 3]
+    assert node_classes["Sleep Node"].calls == 3
+
+
+def test_bundled_batch_nodes_match_their_scalar_results(monkeypatch):
+    from pathlib import Path
+
+    from measnode.nodes import NodeRegistry
+    from measnode.resources import resource_scheduler
+
+    monkeypatch.setattr(resource_scheduler, "declared", dict(resource_scheduler.declared))
+    registry = NodeRegistry(str(Path(__file__).resolve().parent.parent / "modules"), check_interval=0)
+    registry.refresh()
+    basic_math = registry.node_classes["BasicMath Node"](node_id="math")
+    a, b = np.array([6, 8]), np.array([3, 0])
+
+    for operation in ["subtract", "multiply", "divide"]:
+        basic_math.parameters["operation"] = operation
+        batch = asyncio.run(basic_math.execute_batch(a=a, b=b))
+        assert batch.tolist() == [asyncio.run(basic_math.execute(a=int(x), b=int(y))) for x, y in zip(a, b)]
+
+    # Unknown operations give no result on either path.
+    basic_math.parameters["operation"] = "modulo"
+    assert asyncio.run(basic_math.execute_batch(a=a, b=b)) is None
+    assert asyncio.run(basic_math.execute(a=6, b=3)) is None